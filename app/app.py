@@ -1,216 +1,109 @@
-from flask import Flask, render_template, jsonify, request, current_app
-import json
-import os
-import ijson
-import requests
-from functools import lru_cache
+from flask import Flask, Response, render_template, jsonify, request, current_app
+from flask.json.provider import DefaultJSONProvider
+import atexit
 import logging
-import inspect
+import os
+import threading
+
+from src.services.async_bridge import AsyncBridge, JobLimitError, JobRegistry
+from src.services.curriculum import (
+    CCC_FALLBACK_BUDGET,
+    cached_json,
+    data_store,
+    ccc_items_for_lesson,
+    fetch_remote_ccc_item,
+    fetch_remote_ccc_items,
+    find_local_ccc_item,
+    find_local_ccc_items,
+    get_lesson,
+    lessons_for_standard,
+    load_curriculum_structure,
+    load_structure,
+    paginate_items,
+    question_filters,
+    random_question,
+    random_questions,
+    search,
+)
+from src.utils.http_cache import encode_json_body
+from src.utils.serialization import dumps, loads
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Route jsonify through orjson/msgspec when they are installed"""
+
+    def dumps(self, obj, **kwargs):
+        return dumps(obj).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps(obj), mimetype=self.mimetype)
+
 
 app = Flask(__name__)
+app.json = FastJSONProvider(app)
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Configure file paths - use the correct paths
-CONFIG = {
-    'curriculum': os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'curriculum_structure.json'),
-    'ccc': os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'ccc_structure.json')
-}
+VERIFY_TIMEOUT = float(os.getenv('INCEPT_VERIFY_TIMEOUT', '90'))
 
-# CCC API Configuration
-CCC_API_BASE_URL = "https://commoncrawl.alpha1edtech.com"
+# One event loop and grader shared by every verification request, created on
+# first use so importing the app starts no threads
+_async_bridge = None
+_verification_jobs = None
+_bridge_lock = threading.Lock()
 
-def get_json_path(file_key):
-    """Get the absolute path for a JSON file"""
-    path = CONFIG.get(file_key, '')
-    logger.info(f"Resolved path for {file_key}: {path}")
-    
-    # Try alternate locations if file doesn't exist
-    if not os.path.exists(path):
-        # Try directly in the project root
-        alt_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), f"{file_key}_structure.json")
-        logger.info(f"File not found at {path}, trying alternate path: {alt_path}")
-        if os.path.exists(alt_path):
-            return alt_path
-    
-    return path
+def get_async_bridge():
+    """The shared AsyncBridge, created (and stopped at exit) on first use"""
+    global _async_bridge, _verification_jobs
+    if _async_bridge is None:
+        with _bridge_lock:
+            if _async_bridge is None:
+                bridge = AsyncBridge()
+                _verification_jobs = JobRegistry(bridge)
+                atexit.register(bridge.stop)
+                _async_bridge = bridge
+    return _async_bridge
 
-@lru_cache(maxsize=1)
-def load_curriculum_structure():
-    """Load the curriculum structure from JSON file with caching"""
-    try:
-        file_path = get_json_path('curriculum')
-        logger.info(f"Loading curriculum structure from: {file_path}")
-        
-        if not os.path.exists(file_path):
-            # Search for curriculum_structure.json
-            root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-            for root, dirs, files in os.walk(root_dir):
-                if "curriculum_structure.json" in files:
-                    file_path = os.path.join(root, "curriculum_structure.json")
-                    logger.info(f"Found curriculum file at: {file_path}")
-                    break
-        
-        if not os.path.exists(file_path):
-            logger.error(f"Could not find curriculum_structure.json file")
-            return {}
-            
-        with open(file_path, 'r') as f:
-            data = json.load(f)
-            logger.info(f"Successfully loaded curriculum data")
-            
-            # Extract standards from the file
-            standards = []
-            
-            # Curriculum may be directly at the top level or nested under 'curriculum'
-            curriculum_data = data.get('curriculum', data)
-            
-            # Extract standards from lessons since they might not be separately listed
-            standard_map = {}
-            
-            # Process by grade level
-            if isinstance(curriculum_data, dict):
-                lessons = []
-                
-                for grade, grade_data in curriculum_data.items():
-                    logger.info(f"Processing grade: {grade}")
-                    
-                    # Grade data may contain lessons directly
-                    if isinstance(grade_data, dict) and 'lessons' in grade_data:
-                        grade_lessons = grade_data['lessons']
-                        logger.info(f"Found {len(grade_lessons)} lessons in grade {grade}")
-                        
-                        # Go through lessons to collect standards
-                        for i, lesson in enumerate(grade_lessons):
-                            # Add grade info to lesson
-                            lesson['grade'] = grade
-                            
-                            # Give the lesson an ID if it doesn't have one
-                            if 'id' not in lesson:
-                                lesson['id'] = f"{grade}-lesson-{i}"
-                                
-                            # Add to lessons collection
-                            lessons.append(lesson)
-                            
-                            # Extract standard info
-                            standard_code = lesson.get('standard_code')
-                            standard_description = lesson.get('standard_description')
-                            
-                            if standard_code and standard_code not in standard_map:
-                                standard_map[standard_code] = {
-                                    'code': standard_code,
-                                    'description': standard_description,
-                                    'grade': grade
-                                }
-                
-                # Convert standards map to list
-                for std_code, std_data in standard_map.items():
-                    standards.append(std_data)
-                
-                logger.info(f"Extracted {len(standards)} unique standards from lessons")
-                logger.info(f"Total lessons: {len(lessons)}")
-                
-                # Enhance lessons with sample questions if available
-                for lesson in lessons:
-                    # Make sure sample questions are easily accessible 
-                    if 'sample_questions' in lesson:
-                        lesson['question_count'] = len(lesson['sample_questions'])
-                    else:
-                        lesson['question_count'] = 0
-                
-                # Build the restructured data
-                restructured_data = {
-                    'standards': standards,
-                    'lessons': lessons
-                }
-                
-                return restructured_data
-            
-            else:
-                logger.warning(f"Unexpected curriculum data structure: {type(curriculum_data)}")
-                return {
-                    'standards': [],
-                    'lessons': []
-                }
-            
-    except Exception as e:
-        logger.error(f"Error loading curriculum structure: {str(e)}", exc_info=True)
-        print(f"ERROR loading curriculum structure: {str(e)}")
-        return {
-            'standards': [],
-            'lessons': []
-        }
-
-@lru_cache(maxsize=1)
-def load_ccc_structure():
-    """Load the CCC structure from JSON file with caching"""
-    try:
-        file_path = get_json_path('ccc')
-        logger.info(f"Loading CCC structure from: {file_path}")
-        
-        if not os.path.exists(file_path):
-            # Search for ccc_structure.json
-            root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-            for root, dirs, files in os.walk(root_dir):
-                if "ccc_structure.json" in files:
-                    file_path = os.path.join(root, "ccc_structure.json")
-                    logger.info(f"Found CCC file at: {file_path}")
-                    break
-        
-        if not os.path.exists(file_path):
-            logger.error(f"Could not find ccc_structure.json file")
-            return {
-                'items': []
-            }
-            
-        with open(file_path, 'r') as f:
-            data = json.load(f)
-            logger.info(f"Successfully loaded CCC data")
-            
-            # Handle different possible structures
-            if isinstance(data, dict):
-                if 'items' in data:
-                    logger.info(f"Found {len(data['items'])} items in CCC data")
-                    return data
-                elif 'content' in data:
-                    # Content structure from the file
-                    content_items = data['content']
-                    logger.info(f"Found {len(content_items)} content items in CCC data")
-                    
-                    # Process items to have consistent keys
-                    processed_items = []
-                    for item in content_items:
-                        # Map item fields to expected structure
-                        processed_item = {
-                            'id': item.get('id', ''),
-                            'title': item.get('source', 'Unnamed Item'),
-                            'type': item.get('content_type', 'article'),
-                            'standard_code': item.get('standard', ''),
-                            'lesson_id': item.get('lesson', ''),
-                            'content': item,  # Include original content
-                            'source': 'local'
-                        }
-                        processed_items.append(processed_item)
-                    
-                    return {'items': processed_items}
-                else:
-                    logger.warning(f"Unexpected CCC data structure with keys: {list(data.keys())}")
-            else:
-                logger.warning(f"Unexpected CCC data type: {type(data)}")
-            
-            # Return empty data structure if no valid data found
-            return {
-                'items': []
-            }
-            
-    except Exception as e:
-        logger.error(f"Error loading CCC structure: {str(e)}", exc_info=True)
-        print(f"ERROR loading CCC structure: {str(e)}")
-        return {
-            'items': []
-        }
+def get_verification_jobs():
+    """The JobRegistry of background verifications on the shared bridge"""
+    get_async_bridge()
+    return _verification_jobs
+
+@app.before_request
+def start_data_store():
+    """Watch the data files and hot-reload them off the request path (idempotent)"""
+    data_store.start()
+
+def json_response(body, memo=None):
+    """Serve an encoded JSON body with ETag revalidation and gzip/br compression"""
+    status, headers, payload = encode_json_body(
+        body,
+        request.headers.get('Accept-Encoding'),
+        request.headers.get('If-None-Match'),
+        memo
+    )
+    return Response(payload, status=status, headers=headers, mimetype='application/json')
+
+def cached_json_response(name, builder):
+    """Serve builder(snapshot)'s result from bytes encoded once per data snapshot"""
+    return json_response(*cached_json(name, builder))
+
+def listing_args():
+    """cursor/limit/fields query parameters, or None when none were given"""
+    args = {
+        'cursor': request.args.get('cursor'),
+        'limit': request.args.get('limit', type=int),
+        'fields': request.args.get('fields')
+    }
+    if all(value is None for value in args.values()):
+        return None
+    return args
 
 # Routes for UI pages
 @app.route('/')
@@ -243,42 +136,63 @@ def verification_view():
 def get_standards():
     """Returns a list of all standards"""
     try:
-        curriculum_data = load_curriculum_structure()
-        standards = curriculum_data.get('standards', [])
-        return jsonify(standards)
+        return cached_json_response('standards', lambda snapshot: snapshot['curriculum'].get('standards', []))
     except Exception as e:
         logger.error(f"Error fetching standards: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
 @app.route('/api/lessons', methods=['GET'])
 def get_lessons():
-    """Returns a list of all lessons, or lessons for a specific standard if standard_code is provided"""
+    """
+    Returns a list of all lessons, or lessons for a specific standard if standard_code is provided.
+    With cursor, limit or fields, returns one page as {items, next_cursor, total}.
+    """
     try:
         standard_code = request.args.get('standard_code')
+        listing = listing_args()
         
-        curriculum_data = load_curriculum_structure()
-        all_lessons = curriculum_data.get('lessons', [])
-        
+        if listing is not None:
+            if standard_code:
+                lessons = lessons_for_standard(standard_code)
+            else:
+                lessons = load_curriculum_structure().get('lessons', [])
+            return json_response(dumps(paginate_items(lessons, **listing)))
         if standard_code:
-            filtered_lessons = [lesson for lesson in all_lessons if lesson.get('standard_code') == standard_code]
-            return jsonify(filtered_lessons)
+            return json_response(dumps(lessons_for_standard(standard_code)))
         else:
-            return jsonify(all_lessons)
+            return cached_json_response('lessons', lambda snapshot: snapshot['curriculum'].get('lessons', []))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         logger.error(f"Error fetching lessons: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
+@app.route('/api/lessons/<lesson_id>', methods=['GET'])
+def get_lesson_detail(lesson_id):
+    """Returns a single lesson by ID"""
+    try:
+        lesson = get_lesson(lesson_id)
+        if lesson is None:
+            return jsonify({"error": "Lesson not found"}), 404
+        return jsonify(lesson)
+    except Exception as e:
+        logger.error(f"Error fetching lesson {lesson_id}: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/lessons/<lesson_id>/ccc-content', methods=['GET'])
+def get_lesson_ccc_content(lesson_id):
+    """Returns the CCC items joined to a lesson"""
+    try:
+        return jsonify(ccc_items_for_lesson(lesson_id))
+    except Exception as e:
+        logger.error(f"Error fetching CCC content for lesson {lesson_id}: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
 @app.route('/api/standards/<standard_code>/lessons', methods=['GET'])
 def get_standard_lessons(standard_code):
     """Returns lessons for a specific standard"""
     try:
-        curriculum_data = load_curriculum_structure()
-        all_lessons = curriculum_data.get('lessons', [])
-        
-        # Filter lessons by standard code
-        standard_lessons = [lesson for lesson in all_lessons if lesson.get('standard_code') == standard_code]
-        
-        return jsonify(standard_lessons)
+        return jsonify(lessons_for_standard(standard_code))
     except Exception as e:
         logger.error(f"Error fetching lessons for standard {standard_code}: {str(e)}")
         return jsonify({"error": str(e)}), 500
@@ -288,94 +202,33 @@ def get_ccc_content():
     try:
         standard_code = request.args.get('standard_code')
         lesson_id = request.args.get('lesson_id')
+        narrowing = {key: request.args.get(key) for key in ('content_type', 'difficulty', 'interaction_type')}
         
         logger.info(f"Fetching CCC content for standard_code={standard_code}, lesson_id={lesson_id}")
         
         # Try to use local data first
-        ccc_data = load_ccc_structure()
-        filtered_items = []
+        filtered_items = find_local_ccc_items(standard_code, lesson_id, **narrowing)
         
-        # Log the size of the CCC data
-        logger.info(f"Loaded CCC data with {len(ccc_data.get('items', []))} items")
-        
-        if ccc_data and 'items' in ccc_data:
-            # Log a sample item to see its structure
-            if ccc_data.get('items') and len(ccc_data.get('items')) > 0:
-                sample_item = ccc_data.get('items')[0]
-                logger.info(f"Sample CCC item keys: {list(sample_item.keys())}")
-            
-            # Filter by standard code or lesson ID if provided
-            for item in ccc_data.get('items', []):
-                # Check various possible field names for standard code
-                item_standard = item.get('standard') or item.get('standard_code') or item.get('CFItemId') or item.get('humanCodingScheme')
-                
-                if standard_code and (item_standard == standard_code):
-                    logger.info(f"Found matching item for standard {standard_code}: {item.get('id')} - {item.get('title')}")
-                    filtered_items.append(item)
-                elif lesson_id and str(item.get('lesson')) == str(lesson_id):
-                    filtered_items.append(item)
-            
-            if not standard_code and not lesson_id:
-                # If no filters provided, return all items (limited to avoid large responses)
-                filtered_items = ccc_data.get('items', [])[:100]
-        
-        logger.info(f"Found {len(filtered_items)} items in local CCC data")
-        
-        # If we don't have enough local data, try the CCC API
-        if not filtered_items and standard_code:
+        # If we don't have local data, try the CCC API within the request budget
+        partial = False
+        if not filtered_items and standard_code and not any(narrowing.values()):
             logger.info(f"No local data found, trying CCC API for standard {standard_code}")
-            try:
-                # Use the CCC API to get content for this standard
-                api_url = f"{CCC_API_BASE_URL}/standards/items?keyword={standard_code}"
-                logger.info(f"Calling CCC API: {api_url}")
-                
-                response = requests.get(api_url, timeout=10)
-                logger.info(f"CCC API response status: {response.status_code}")
-                
-                if response.status_code == 200:
-                    standards_data = response.json()
-                    logger.info(f"Found {len(standards_data)} standards from CCC API")
-                    
-                    # If we got standards data, log a sample
-                    if standards_data and len(standards_data) > 0:
-                        sample_standard = standards_data[0]
-                        logger.info(f"Sample standard from API: {sample_standard.get('id')} - {sample_standard.get('humanCodingScheme')}")
-                    
-                    # For each standard found, get associated content
-                    for standard in standards_data:
-                        if 'id' in standard:
-                            content_url = f"{CCC_API_BASE_URL}/sources/content?CFItemId={standard['id']}"
-                            logger.info(f"Fetching content for standard ID {standard['id']}")
-                            
-                            content_response = requests.get(content_url, timeout=10)
-                            logger.info(f"Content API response status: {content_response.status_code}")
-                            
-                            if content_response.status_code == 200:
-                                content_items = content_response.json()
-                                logger.info(f"Found {len(content_items)} content items for standard")
-                                
-                                # If we got content items, log a sample
-                                if content_items and len(content_items) > 0:
-                                    sample_content = content_items[0]
-                                    logger.info(f"Sample content from API: {sample_content.get('id')} - {sample_content.get('name')} - Type: {sample_content.get('type')}")
-                                
-                                # Transform items to our expected format
-                                for item in content_items:
-                                    filtered_items.append({
-                                        'id': item.get('id', ''),
-                                        'title': item.get('name', ''),
-                                        'type': item.get('type', ''),
-                                        'standard_code': standard_code,
-                                        'content': item.get('content', {}),
-                                        'source': 'CCC API'
-                                    })
-            except Exception as api_err:
-                logger.error(f"Error fetching from CCC API: {str(api_err)}")
-                # Log the full exception for debugging
-                logger.exception("CCC API exception details:")
+            filtered_items, partial = get_async_bridge().run(
+                fetch_remote_ccc_items(get_ccc_client(), standard_code),
+                timeout=CCC_FALLBACK_BUDGET + 1
+            )
         
         logger.info(f"Returning {len(filtered_items)} CCC content items")
-        return jsonify(filtered_items)
+        listing = listing_args()
+        if listing is not None:
+            response = json_response(dumps(paginate_items(filtered_items, **listing)))
+        else:
+            response = json_response(dumps(filtered_items))
+        if partial:
+            response.headers['X-Partial-Results'] = 'true'
+        return response
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         logger.error(f"Error fetching CCC content: {str(e)}")
         return jsonify({"error": str(e)}), 500
@@ -387,13 +240,10 @@ def api_ccc_item(item_id):
         logger.info(f"Fetching CCC item {item_id}")
         
         # First check our local cache/file
-        ccc_data = load_ccc_structure()
-        if ccc_data and 'items' in ccc_data:
-            for item in ccc_data['items']:
-                if str(item.get('id')) == str(item_id):
-                    logger.info(f"Found item {item_id} in local data")
-                    # Found the item in our local data
-                    return jsonify(item)
+        item = find_local_ccc_item(item_id)
+        if item is not None:
+            logger.info(f"Found item {item_id} in local data")
+            return jsonify(item)
         
         # If not found locally, try using the CCC API
         # First we need to find which standard this item might be associated with
@@ -402,15 +252,15 @@ def api_ccc_item(item_id):
         # Instead, make a direct attempt if we have a cfItemId
         if item_id.startswith("CFItem-"):
             cf_item_id = item_id.replace("CFItem-", "")
-            api_url = f"{CCC_API_BASE_URL}/sources/content?CFItemId={cf_item_id}"
-            logger.info(f"Trying direct CCC API lookup: {api_url}")
+            logger.info(f"Trying direct CCC API lookup for {cf_item_id}")
             
-            response = requests.get(api_url, timeout=10)
-            if response.status_code == 200:
-                api_data = response.json()
-                if api_data:
-                    logger.info(f"Found item in CCC API")
-                    return jsonify(api_data[0] if len(api_data) > 0 else {})
+            item = get_async_bridge().run(
+                fetch_remote_ccc_item(get_ccc_client(), cf_item_id),
+                timeout=CCC_FALLBACK_BUDGET + 1
+            )
+            if item is not None:
+                logger.info(f"Found item in CCC API")
+                return jsonify(item)
         
         # If we get here, item wasn't found
         logger.warning(f"Item {item_id} not found in local data or CCC API")
@@ -419,111 +269,64 @@ def api_ccc_item(item_id):
         logger.error(f"Error in CCC item API: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
+@app.route('/api/data-status')
+def get_data_status():
+    """Version and rebuild timing of the loaded data snapshot"""
+    return jsonify(data_store.status())
+
 @app.route('/api/structure')
 def get_structure():
     try:
         print("Fetching curriculum and CCC data for structure...")
         curriculum_data = load_curriculum_structure()
-        ccc_data = load_ccc_structure()
-        
-        print("Building structure data...")
         
         # Validate curriculum data structure
         if not curriculum_data or 'standards' not in curriculum_data or 'lessons' not in curriculum_data:
             return jsonify({'error': 'Invalid curriculum data structure'}), 400
         
-        # Extract standards and lessons
-        standards = curriculum_data.get('standards', [])
-        lessons = curriculum_data.get('lessons', [])
-        print(f"Found {len(standards)} standards and {len(lessons)} lessons")
-        
-        # Prepare data structures
-        nodes = []
-        links = []
-        added_node_ids = set()
-        
-        # Process standards
-        for standard in standards:
-            # Use the standard code directly as the ID to ensure consistency
-            standard_id = standard.get('code', '').replace('.', '_')
-            
-            if not standard_id:
-                continue
-                
-            # Add standard node if not already added
-            if standard_id not in added_node_ids:
-                nodes.append({
-                    'id': standard_id,
-                    'type': 'standard',
-                    'data': standard
-                })
-                added_node_ids.add(standard_id)
-        
-        # Process lessons
-        for lesson in lessons:
-            lesson_id = lesson.get('id') or f"lesson-{len(added_node_ids)}"
-            
-            # Add lesson node
-            if lesson_id not in added_node_ids:
-                nodes.append({
-                    'id': lesson_id,
-                    'type': 'lesson',
-                    'data': lesson
-                })
-                added_node_ids.add(lesson_id)
-            
-            # Link lesson to its standard
-            standard_code = lesson.get('standard_code', '')
-            if standard_code:
-                # Convert the standard code to match the format used for node IDs
-                standard_id = standard_code.replace('.', '_')
-                
-                # Add link from standard to lesson
-                links.append({
-                    'source': standard_id,
-                    'target': lesson_id,
-                    'type': 'standard-lesson'
-                })
-        
-        # Add content items from CCC data (limit to 100 to avoid overwhelming visualization)
-        if ccc_data and 'content_items' in ccc_data:
-            content_items = ccc_data.get('content_items', [])[:100]
-            
-            for item in content_items:
-                item_id = item.get('id') or f"content-{len(added_node_ids)}"
-                
-                # Add content item node
-                if item_id not in added_node_ids:
-                    item_type = item.get('type', 'article')
-                    nodes.append({
-                        'id': item_id,
-                        'type': item_type,
-                        'data': item
-                    })
-                    added_node_ids.add(item_id)
-                
-                # Link content to lessons or standards
-                related_lessons = item.get('related_lessons', [])
-                for lesson_id in related_lessons:
-                    if lesson_id in added_node_ids:
-                        links.append({
-                            'source': item_id,
-                            'target': lesson_id,
-                            'type': 'content-lesson'
-                        })
-        
-        result = {
-            'nodes': nodes,
-            'links': links
-        }
-        
-        print(f"Returning structure with {len(nodes)} nodes and {len(links)} links")
-        return jsonify(result)
+        return cached_json_response('structure', lambda snapshot: snapshot['structure'].to_dict())
         
     except Exception as e:
         print(f"Error in get_structure: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/structure/overview')
+def get_structure_overview():
+    """Collapsed graph: the standards only, to be expanded node by node"""
+    try:
+        return cached_json_response('structure:overview', lambda snapshot: snapshot['structure'].overview())
+    except Exception as e:
+        logger.error(f"Error in get_structure_overview: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/structure/nodes/<path:node_id>')
+def get_structure_node(node_id):
+    """A node's neighbours and the links to them (limit=<count>, default 200)"""
+    try:
+        neighbourhood = load_structure().neighbourhood(node_id, request.args.get('limit', type=int))
+        if neighbourhood is None:
+            return jsonify({'error': 'Node not found'}), 404
+        return json_response(dumps(neighbourhood))
+    except Exception as e:
+        logger.error(f"Error in get_structure_node: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/search', methods=['GET'])
+def search_curriculum():
+    """
+    Typeahead search over lessons, standards, sample questions and CCC items
+    Parameters:
+    - q: query; the last word matches as a prefix
+    - type: comma-separated kinds to return (lesson, standard, ccc_item)
+    - limit: number of results (default 10, at most 50)
+    """
+    try:
+        kinds = [kind for kind in request.args.get('type', '').split(',') if kind] or None
+        return jsonify(search(request.args.get('q', ''), request.args.get('limit', 10, type=int), kinds))
+    except Exception as e:
+        logger.error(f"Error searching: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/available-question-filters', methods=['GET'])
 def get_available_question_filters():
     """
@@ -531,51 +334,9 @@ def get_available_question_filters():
     This helps the user know what options will actually return results
     """
     try:
-        # Load curriculum structure from file
-        curriculum_file = os.path.join(
-            os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 
-            'data', 
-            'curriculum_structure.json'
-        )
-        
-        # Check if file exists
-        if not os.path.exists(curriculum_file):
-            return jsonify({'error': 'Curriculum file not found'}), 404
-            
-        # Load curriculum data
-        with open(curriculum_file, 'r') as f:
-            curriculum_data = json.load(f)
-        
-        # Extract unique standards, lessons, and a default difficulty
-        standards = set()
-        lessons = {}  # Map standard_code -> list of lessons
-        
-        # Process all grades in the curriculum
-        for grade, grade_data in curriculum_data.get('curriculum', {}).items():
-            for lesson in grade_data.get('lessons', []):
-                standard_code = lesson.get('standard_code')
-                if standard_code:
-                    standards.add(standard_code)
-                    
-                    # Add this lesson to the standard
-                    if standard_code not in lessons:
-                        lessons[standard_code] = []
-                    
-                    lesson_info = {
-                        'id': lesson.get('title'),  # Use title as ID since that's what we'll filter by
-                        'title': lesson.get('title')
-                    }
-                    lessons[standard_code].append(lesson_info)
-        
-        # We'll use fixed difficulties since they're not explicitly in the curriculum
-        difficulties = ['easy', 'medium', 'hard']
-        
-        return jsonify({
-            'standards': sorted(list(standards)),
-            'lessons': lessons,
-            'difficulties': difficulties
-        })
-    
+        return jsonify(question_filters())
+    except FileNotFoundError as e:
+        return jsonify({'error': str(e)}), 404
     except Exception as e:
         logger.error(f"Error retrieving question filters: {str(e)}")
         return jsonify({'error': str(e)}), 500
@@ -588,113 +349,78 @@ def get_random_question():
     - standard: NGSS standard code
     - lesson: lesson title
     - difficulty: easy, medium, hard (not used in current version)
+    With n=<count>, returns a list of up to count distinct questions instead
     """
     try:
         # Get filter parameters
         standard = request.args.get('standard')
         lesson = request.args.get('lesson')
         difficulty = request.args.get('difficulty')  # Not used for filtering currently
+        n = request.args.get('n', type=int)
         
-        # Load curriculum structure from file
-        curriculum_file = os.path.join(
-            os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 
-            'data', 
-            'curriculum_structure.json'
-        )
+        if n is not None:
+            questions = random_questions(n, standard, lesson)
+            if not questions:
+                return jsonify({'error': 'No questions match the specified filters'}), 404
+            return jsonify(questions)
         
-        # Check if file exists
-        if not os.path.exists(curriculum_file):
-            return jsonify({'error': 'Curriculum file not found'}), 404
-            
-        # Load curriculum data
-        with open(curriculum_file, 'r') as f:
-            curriculum_data = json.load(f)
-        
-        # Collect all matching questions based on filters
-        matching_questions = []
-        
-        # Iterate through all grades and lessons
-        for grade, grade_data in curriculum_data.get('curriculum', {}).items():
-            for lesson_data in grade_data.get('lessons', []):
-                # Check if standard and lesson match our filters
-                if standard and lesson_data.get('standard_code') != standard:
-                    continue
-                    
-                if lesson and lesson_data.get('title') != lesson:
-                    continue
-                
-                # If we got here, this lesson matches our filters
-                # Add all sample questions from this lesson
-                for question_text in lesson_data.get('sample_questions', []):
-                    # Create a question object with the available information
-                    question = {
-                        'question_text': question_text,
-                        'standard_code': lesson_data.get('standard_code'),
-                        'standard_description': lesson_data.get('standard_description'),
-                        'lesson_title': lesson_data.get('title'),
-                        'grade': grade
-                    }
-                    matching_questions.append(question)
+        question = random_question(standard, lesson)
         
         # Check if we have any questions after filtering
-        if not matching_questions:
+        if question is None:
             return jsonify({'error': 'No questions match the specified filters'}), 404
-            
-        # Select a random question
-        import random
-        question = random.choice(matching_questions)
         
         return jsonify(question)
     
+    except FileNotFoundError as e:
+        return jsonify({'error': str(e)}), 404
     except Exception as e:
         logger.error(f"Error fetching random question: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
+def get_ccc_client():
+    """CCC client with a pooled HTTP session, shared on the async bridge"""
+    from src.services.ccc_client import CCCClient
+    
+    return get_async_bridge().shared('ccc_client', CCCClient)
+
+def get_grader():
+    """The question grader shared by every verification on the async bridge"""
+    from src.services.grader import QuestionGrader
+    
+    return get_async_bridge().shared('grader', QuestionGrader)
+
+def question_from_request():
+    """JSON body of a verification request, or an (error response, status) pair"""
+    question_data = request.get_json(silent=True)
+    if not question_data:
+        return None, (jsonify({'error': 'No question data provided'}), 400)
+    return question_data, None
+
 @app.route('/api/verify-question', methods=['POST'])
 def verify_question():
     """
     Verify a question using the question grader.
+    Waits up to INCEPT_VERIFY_TIMEOUT seconds; use /api/verify-question/jobs for slow gradings.
     """
     try:
-        # Get question data from request
-        question_data = request.get_json()
-        
-        if not question_data:
-            return jsonify({'error': 'No question data provided'}), 400
-            
-        # Import the QuestionGrader
-        from src.services.grader import QuestionGrader
+        question_data, error = question_from_request()
+        if error:
+            return error
         
-        # Debug print to verify the QuestionGrader's actual file path
-        print(f"QuestionGrader imported from: {inspect.getfile(QuestionGrader)}")
-        
-        # Initialize grader
-        # Make sure we're using the fixed version without proxies
         try:
-            grader = QuestionGrader()
-            print("QuestionGrader initialized successfully")
+            grader = get_grader()
         except Exception as init_error:
-            import traceback
-            print(f"Error initializing QuestionGrader: {str(init_error)}")
-            print(traceback.format_exc())
+            logger.exception("Error initializing QuestionGrader")
             return jsonify({'error': f"Failed to initialize question grader: {str(init_error)}"}), 500
         
-        # Grade the question
-        # This is an async function, so we need to run it in an event loop
-        import asyncio
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
         try:
-            print("Starting question grading...")
-            result = loop.run_until_complete(grader.grade_question(question_data))
-            print("Question graded successfully")
+            result = get_async_bridge().run(grader.grade_question(question_data), timeout=VERIFY_TIMEOUT)
+        except TimeoutError:
+            return jsonify({'error': f"Grading did not finish within {VERIFY_TIMEOUT:g}s"}), 504
         except Exception as grading_error:
-            import traceback
-            print(f"Error during question grading: {str(grading_error)}")
-            print(traceback.format_exc())
-            loop.close()
+            logger.exception("Error during question grading")
             return jsonify({'error': f"Grading failed: {str(grading_error)}"}), 500
-        loop.close()
         
         return jsonify(result)
         
@@ -702,5 +428,39 @@ def verify_question():
         logger.error(f"Error verifying question: {str(e)}")
         return jsonify({'error': f"Verification failed: {str(e)}"}), 500
 
+@app.route('/api/verify-question/jobs', methods=['POST'])
+def submit_verification():
+    """Start grading a question in the background; poll the returned job for the result"""
+    try:
+        question_data, error = question_from_request()
+        if error:
+            return error
+        
+        job_id = get_verification_jobs().submit(get_grader().grade_question(question_data), timeout=VERIFY_TIMEOUT)
+        response = jsonify({'job_id': job_id, 'status': 'running'})
+        response.status_code = 202
+        response.headers['Location'] = f'/api/verify-question/jobs/{job_id}'
+        return response
+    except JobLimitError as e:
+        return jsonify({'error': str(e)}), 503
+    except Exception as e:
+        logger.error(f"Error submitting verification: {str(e)}")
+        return jsonify({'error': f"Verification failed: {str(e)}"}), 500
+
+@app.route('/api/verify-question/jobs/<job_id>', methods=['GET'])
+def get_verification(job_id):
+    """Status of a verification job: running, done (with result), failed or cancelled"""
+    status = get_verification_jobs().status(job_id)
+    if status is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(status)
+
+@app.route('/api/verify-question/jobs/<job_id>', methods=['DELETE'])
+def cancel_verification(job_id):
+    """Cancel a running verification job"""
+    if get_verification_jobs().status(job_id) is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify({'job_id': job_id, 'cancelled': get_verification_jobs().cancel(job_id)})
+
 if __name__ == '__main__':
     app.run(debug=True, port=5001) 
\ No newline at end of file
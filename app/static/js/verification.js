@@ -37,6 +37,11 @@ document.addEventListener('DOMContentLoaded', function() {
     // Current question data
     let currentQuestion = null;
     
+    // Prefetched questions for the current filters, refilled in batches
+    const PREFETCH_BATCH_SIZE = 5;
+    let prefetchedQuestions = [];
+    let prefetchedFilterKey = null;
+    
     // Initialize
     initializeApp();
     
@@ -145,19 +150,30 @@ document.addEventListener('DOMContentLoaded', function() {
             if (lessonFilter.value) params.append('lesson', lessonFilter.value);
             if (difficultyFilter.value) params.append('difficulty', difficultyFilter.value);
             
-            // Fetch random question
-            const response = await fetch(`/api/random-question?${params.toString()}`);
-            if (!response.ok) {
-                if (response.status === 404) {
-                    // Specific error for when no questions match filters
-                    questionText.textContent = 'No questions found matching your filter criteria. Try selecting different filters or removing some constraints.';
-                    showLoading(false);
-                    return;
+            // Drop prefetched questions when the filters change
+            const filterKey = params.toString();
+            if (filterKey !== prefetchedFilterKey) {
+                prefetchedQuestions = [];
+                prefetchedFilterKey = filterKey;
+            }
+            
+            if (prefetchedQuestions.length === 0) {
+                // Fetch a batch of random questions in one round trip
+                params.append('n', PREFETCH_BATCH_SIZE);
+                const response = await fetch(`/api/random-question?${params.toString()}`);
+                if (!response.ok) {
+                    if (response.status === 404) {
+                        // Specific error for when no questions match filters
+                        questionText.textContent = 'No questions found matching your filter criteria. Try selecting different filters or removing some constraints.';
+                        showLoading(false);
+                        return;
+                    }
+                    throw new Error(`Failed to fetch random question: ${response.status} ${response.statusText}`);
                 }
-                throw new Error(`Failed to fetch random question: ${response.status} ${response.statusText}`);
+                prefetchedQuestions = await response.json();
             }
             
-            currentQuestion = await response.json();
+            currentQuestion = prefetchedQuestions.shift();
             displayQuestion(currentQuestion);
             
             showLoading(false);
@@ -3,6 +3,12 @@
  * 
  * This file contains functions to create and interact with the
  * force-directed graph visualization of curriculum relationships.
+ *
+ * The graph starts with the collapsed standards from /api/structure/overview;
+ * clicking a node loads its neighbours from /api/structure/nodes/<id> and
+ * clicking it again collapses them, so large curricula are never loaded or
+ * simulated all at once. Node positions are computed by the server; the
+ * force simulation only places nodes that arrive without one.
  */
 
 // Global variables for the visualization
@@ -12,6 +18,15 @@ let simulation;
 let svg;
 let link;
 let node;
+let zoomBehavior;
+
+// Level-of-detail state
+const nodeIndex = new Map();      // node id -> node
+const expandedNodes = new Set();  // ids of nodes whose neighbours are shown
+const addedBy = new Map();        // node id -> id of the node whose expansion added it
+
+// Above this many nodes only standards keep their labels
+const LABEL_NODE_LIMIT = 1500;
 
 // Colors for different node types
 const nodeColors = {
@@ -66,12 +81,13 @@ function initVisualization() {
     document.getElementById('visualization').style.display = 'none';
     document.getElementById('error-message').style.display = 'none';
     
-    // Fetch data
-    fetchFromAPI('/api/structure')
+    // Fetch the collapsed graph; neighbourhoods are loaded on demand
+    fetchFromAPI('/api/structure/overview')
         .then(data => {
             console.log('Received structure data:', { 
                 nodeCount: data.nodes ? data.nodes.length : 0, 
-                linkCount: data.links ? data.links.length : 0 
+                totalNodes: data.total_nodes,
+                totalLinks: data.total_links
             });
             
             if (!data || !data.nodes || !data.links) {
@@ -81,6 +97,10 @@ function initVisualization() {
             // Store data
             nodes = data.nodes;
             links = data.links;
+            nodes.forEach(n => {
+                pinToLayout(n);
+                nodeIndex.set(n.id, n);
+            });
             
             // Populate filters
             populateFilters(nodes);
@@ -162,6 +182,15 @@ function applyFilters() {
     
     console.log(`Filters: standard=${standardFilter}, grade=${gradeFilter}`);
     
+    // Load the selected standard's lessons before filtering to them
+    if (standardFilter) {
+        const standardNode = nodes.find(n => n.type === 'standard' && n.data && n.data.code === standardFilter);
+        if (standardNode && standardNode.degree && !expandedNodes.has(standardNode.id)) {
+            expandNode(standardNode).then(applyFilters);
+            return;
+        }
+    }
+    
     // Create a filtered set of nodes
     let filteredNodes = nodes;
     
@@ -202,6 +231,147 @@ function applyFilters() {
     updateVisualization(filteredNodes, filteredLinks);
 }
 
+/**
+ * Fix a node at its server-computed position, if it has one
+ * @param {Object} n - The node data
+ */
+function pinToLayout(n) {
+    if (typeof n.x === 'number' && typeof n.y === 'number') {
+        n.fx = n.x;
+        n.fy = n.y;
+        n.pinned = true;
+    }
+}
+
+/**
+ * Zoom so that every positioned node is visible
+ * @param {Array} nodes - The array of node data
+ * @param {number} width - Width of the visualization
+ * @param {number} height - Height of the visualization
+ */
+function fitToView(nodes, width, height) {
+    const placed = nodes.filter(n => typeof n.x === 'number' && typeof n.y === 'number');
+    if (placed.length === 0) return;
+    
+    const [minX, maxX] = d3.extent(placed, n => n.x);
+    const [minY, maxY] = d3.extent(placed, n => n.y);
+    const scale = Math.min(2, 0.9 / Math.max((maxX - minX) / width, (maxY - minY) / height, 1e-6));
+    const transform = d3.zoomIdentity
+        .translate(width / 2, height / 2)
+        .scale(scale)
+        .translate(-(minX + maxX) / 2, -(minY + maxY) / 2);
+    svg.call(zoomBehavior.transform, transform);
+}
+
+/**
+ * Key identifying a link regardless of whether d3 has resolved its ends
+ * @param {Object} l - The link data
+ * @returns {string} - The link key
+ */
+function linkKey(l) {
+    const source = typeof l.source === 'object' ? l.source.id : l.source;
+    const target = typeof l.target === 'object' ? l.target.id : l.target;
+    return `${source}-${target}`;
+}
+
+/**
+ * Load a node's neighbours from the server and add them to the graph
+ * @param {Object} d - The node to expand
+ * @returns {Promise} - Resolves once the graph has been updated
+ */
+function expandNode(d) {
+    if (!d.degree || expandedNodes.has(d.id)) {
+        return Promise.resolve();
+    }
+    
+    return fetchFromAPI(`/api/structure/nodes/${encodeURIComponent(d.id)}`)
+        .then(data => {
+            expandedNodes.add(d.id);
+            
+            data.nodes.forEach(n => {
+                if (!nodeIndex.has(n.id)) {
+                    pinToLayout(n);
+                    if (!n.pinned) {
+                        // Start next to the expanded node so only the new part of the layout moves
+                        n.x = d.x;
+                        n.y = d.y;
+                    }
+                    nodes.push(n);
+                    nodeIndex.set(n.id, n);
+                    addedBy.set(n.id, d.id);
+                }
+            });
+            
+            const existingLinks = new Set(links.map(linkKey));
+            data.links.forEach(l => {
+                if (!existingLinks.has(linkKey(l))) {
+                    links.push(l);
+                }
+            });
+            
+            if (data.total > data.nodes.length) {
+                console.log(`Showing ${data.nodes.length} of ${data.total} neighbours of ${d.id}`);
+            }
+            
+            updateVisualization(nodes, links, 0.3);
+        })
+        .catch(error => {
+            console.error(`Error expanding node ${d.id}:`, error);
+        });
+}
+
+/**
+ * Remove the nodes added by expanding a node, and everything they added in turn
+ * @param {Object} d - The node to collapse
+ */
+function collapseNode(d) {
+    expandedNodes.delete(d.id);
+    
+    const children = new Map();
+    addedBy.forEach((parent, child) => {
+        if (!children.has(parent)) children.set(parent, []);
+        children.get(parent).push(child);
+    });
+    
+    const removed = new Set();
+    const stack = [d.id];
+    while (stack.length > 0) {
+        (children.get(stack.pop()) || []).forEach(child => {
+            removed.add(child);
+            expandedNodes.delete(child);
+            stack.push(child);
+        });
+    }
+    
+    removed.forEach(id => {
+        nodeIndex.delete(id);
+        addedBy.delete(id);
+    });
+    nodes = nodes.filter(n => !removed.has(n.id));
+    links = links.filter(l => {
+        const source = typeof l.source === 'object' ? l.source.id : l.source;
+        const target = typeof l.target === 'object' ? l.target.id : l.target;
+        return !removed.has(source) && !removed.has(target);
+    });
+    
+    updateVisualization(nodes, links, 0.3);
+}
+
+/**
+ * Show a node's details and toggle its neighbourhood
+ * @param {Object} event - The click event
+ * @param {Object} d - The node data
+ */
+function onNodeClick(event, d) {
+    showNodeDetails(event, d);
+    
+    if (expandedNodes.has(d.id)) {
+        collapseNode(d);
+    } else {
+        expandNode(d);
+    }
+}
+
 /**
  * Reset filters
  */
@@ -211,7 +381,7 @@ function resetFilters() {
     document.getElementById('filter-standard').value = '';
     document.getElementById('filter-grade').value = '';
     
-    // Reset to full dataset
+    // Reset to everything loaded so far
     updateVisualization(nodes, links);
 }
 
@@ -241,42 +411,47 @@ function createVisualization(nodes, links) {
         .attr('viewBox', [0, 0, width, height])
         .classed('visualization-svg', true);
     
+    // Zooming transforms one root group instead of every node
+    const root = svg.append('g').attr('class', 'graph-root');
+    
     // Create the simulation first
     simulation = d3.forceSimulation()
         .force('link', d3.forceLink().id(d => d.id).distance(100))
         .force('charge', d3.forceManyBody().strength(-300))
-        .force('center', d3.forceCenter(width / 2, height / 2))
+        .force('center', d3.forceCenter(0, 0))
         .force('collision', d3.forceCollide().radius(30));
     
     // Create container for links
-    link = svg.append('g')
+    link = root.append('g')
         .attr('class', 'links')
         .selectAll('line');
     
     // Create container for nodes
-    node = svg.append('g')
+    node = root.append('g')
         .attr('class', 'nodes')
         .selectAll('g');
     
     // Update the visualization with the data
     updateVisualization(nodes, links);
     
-    // Add zoom behavior
-    svg.call(d3.zoom()
+    // Add zoom behavior; server layouts of large graphs need to zoom far out
+    zoomBehavior = d3.zoom()
         .extent([[0, 0], [width, height]])
-        .scaleExtent([0.1, 8])
+        .scaleExtent([0.001, 8])
         .on('zoom', (event) => {
-            svg.selectAll('g').attr('transform', event.transform);
-        })
-    );
+            root.attr('transform', event.transform);
+        });
+    svg.call(zoomBehavior);
+    fitToView(nodes, width, height);
 }
 
 /**
  * Update the visualization with new data
  * @param {Array} nodes - The array of node data
  * @param {Array} links - The array of link data
+ * @param {number} alpha - Simulation energy; lower values only settle new nodes
  */
-function updateVisualization(nodes, links) {
+function updateVisualization(nodes, links, alpha = 1) {
     console.log(`Updating visualization with ${nodes.length} nodes and ${links.length} links`);
     
     // Process links to ensure source and target are objects
@@ -310,11 +485,11 @@ function updateVisualization(nodes, links) {
             .on('start', dragStarted)
             .on('drag', dragged)
             .on('end', dragEnded))
-        .on('click', showNodeDetails);
+        .on('click', onNodeClick);
     
     // Add circles for the nodes
     nodeEnter.append('circle')
-        .attr('r', d => d.type === 'standard' ? 10 : 7)
+        .attr('r', d => d.type === 'standard' ? 10 + Math.min(10, Math.sqrt(d.degree || 0)) : 7)
         .attr('fill', d => nodeColors[d.type] || '#999')
         .attr('stroke', '#fff')
         .attr('stroke-width', 1.5);
@@ -329,6 +504,11 @@ function updateVisualization(nodes, links) {
     
     node = nodeEnter.merge(node);
     
+    // Labels are the most expensive part to draw; drop them on very large graphs
+    const showAllLabels = nodes.length <= LABEL_NODE_LIMIT;
+    node.select('text')
+        .attr('display', d => showAllLabels || d.type === 'standard' ? null : 'none');
+    
     // Update simulation
     simulation.nodes(nodes)
         .on('tick', ticked);
@@ -336,8 +516,13 @@ function updateVisualization(nodes, links) {
     simulation.force('link')
         .links(processedLinks);
     
-    // Restart simulation
-    simulation.alpha(1).restart();
+    // With every node at its precomputed position there is nothing to simulate
+    if (nodes.every(n => n.pinned)) {
+        simulation.stop();
+        ticked();
+    } else {
+        simulation.alpha(alpha).restart();
+    }
     
     // Function to handle simulation ticks
     function ticked() {
@@ -468,6 +653,9 @@ function dragged(event, d) {
 
 function dragEnded(event, d) {
     if (!event.active) simulation.alphaTarget(0);
-    d.fx = null;
-    d.fy = null;
+    // Laid-out nodes stay where they were dropped
+    if (!d.pinned) {
+        d.fx = null;
+        d.fy = null;
+    }
 } 
\ No newline at end of file
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Benchmark near-duplicate clustering (src.services.dedup) over synthetic
+questions: a share of distinct questions, each followed by copies with
+other numbers, reordered choices or a swapped word. Reports questions per
+second, clusters found, how many planted duplicates joined their
+original's cluster, distinct originals merged by mistake, and peak RSS.
+
+Usage:
+    python benchmarks/bench_dedup.py --count 1000000 --distinct 0.4 --jobs 8
+"""
+
+import argparse
+import itertools
+import os
+import random
+import resource
+import sys
+import time
+from array import array
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.services.dedup import DedupIndex, cluster_questions
+
+VOCABULARY = (
+    "force motion newton friction gravity mass acceleration velocity energy magnet "
+    "field charge balanced unbalanced push pull object speed distance collision "
+    "momentum inertia reaction weight planet orbit electric current circuit"
+).split() + [f"word{i}" for i in range(5000)]
+ZIPF_WEIGHTS = list(itertools.accumulate(1 / rank for rank in range(1, len(VOCABULARY) + 1)))
+
+
+def make_questions(count, distinct, origins, seed=5):
+    """
+    Yield count questions; origins[i] receives the position of the distinct
+    question that question i was derived from.
+    """
+    rng = random.Random(seed)
+    base = None
+    for position in range(count):
+        if base is None or rng.random() < distinct:
+            words = rng.choices(VOCABULARY, cum_weights=ZIPF_WEIGHTS, k=24)
+            base = (position, words, [" ".join(rng.choices(VOCABULARY, cum_weights=ZIPF_WEIGHTS, k=3)) for _ in range(4)])
+            words, choices = base[1], base[2]
+        else:
+            words, choices = list(base[1]), list(base[2])
+            variant = rng.randrange(3)
+            if variant == 1:
+                rng.shuffle(choices)
+            elif variant == 2:
+                words[rng.randrange(len(words))] = rng.choice(VOCABULARY)
+        origins.append(base[0])
+        number = rng.randrange(1, 500)
+        yield {
+            'prompt': f"A {number} kg cart: " + " ".join(words) + "?",
+            'choices': [{'text': f"{text} {number * (i + 1)} N"} for i, text in enumerate(choices)]
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--count', type=int, default=1_000_000)
+    parser.add_argument('--distinct', type=float, default=0.4, help='Share of questions that start a new original')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    origins = array('I')
+    start = time.perf_counter()
+    index = cluster_questions(make_questions(args.count, args.distinct, origins), index=DedupIndex(), jobs=args.jobs)
+    elapsed = time.perf_counter() - start
+
+    cluster_of = index.cluster_of
+    planted = joined = 0
+    clusters_of_origin = {}
+    for position, origin in enumerate(origins):
+        if origin != position:
+            planted += 1
+            joined += cluster_of(position) == cluster_of(origin)
+        else:
+            clusters_of_origin.setdefault(cluster_of(position), 0)
+            clusters_of_origin[cluster_of(position)] += 1
+    merged = sum(count - 1 for count in clusters_of_origin.values())
+
+    stats = index.stats()
+    print(f"{args.count:,} questions with {args.jobs} job(s) in {elapsed:.1f}s ({args.count / elapsed:,.0f} questions/s)")
+    print(f"clusters: {stats['clusters']:,}  exact duplicates: {stats['exact_duplicates']:,}  comparisons: {stats['comparisons']:,}")
+    print(f"planted duplicates clustered with their original: {joined:,}/{planted:,} ({joined / max(planted, 1):.1%})")
+    print(f"distinct originals merged into another cluster: {merged:,}")
+    print(f"peak RSS: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:,.0f} MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Benchmark time to the first valid generated question: drafting and grading
+one candidate at a time against QuestionGenerator racing k candidates.
+Model and grader calls are simulated with log-normal latencies (seconds,
+divided by --speedup) and fixed pass rates, so no API key is needed.
+
+Usage:
+    python benchmarks/bench_generation.py --requests 200 --candidates 4 --speedup 100
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models.question import Choice, Question, Solution
+from src.services import generator as generator_module
+from src.services.generator import QuestionGenerator, check_question
+
+TEMPLATE = Question(
+    prompt="A student pushes a 10 kg box with 50 N against 30 N of friction. What is the net force on the box?",
+    interaction_type="multiple_choice",
+    choices=[
+        Choice(text="20 N", is_correct=True, explanation="Push minus friction."),
+        Choice(text="80 N", is_correct=False, explanation="Adds the forces."),
+        Choice(text="50 N", is_correct=False, explanation="Ignores friction.")
+    ],
+    correct_answer="20 N",
+    solution=Solution(steps=["Subtract friction from the push"], explanation="Opposing forces subtract."),
+    subject="science", grade=8, standard="MS-PS2-2", difficulty=2
+)
+
+
+class SimulatedModel:
+    def __init__(self, args, rng):
+        self.args = args
+        self.rng = rng
+        self.calls = 0
+
+    def latency(self, median):
+        return self.rng.lognormvariate(0, 0.5) * median / self.args.speedup
+
+    async def draft(self, template, context, index):
+        self.calls += 1
+        await asyncio.sleep(self.latency(self.args.draft_seconds))
+        number = self.rng.randrange(10_000)
+        # Some drafts mark the wrong choice, which the deterministic checks catch
+        correct = "20 N" if self.rng.random() >= self.args.malformed else "80 N"
+        return template.model_copy(update={"prompt": f"A sled on snow #{number}: which force slows it down?", "correct_answer": correct})
+
+
+class SimulatedGrader:
+    def __init__(self, args, rng, model):
+        self.args = args
+        self.rng = rng
+        self.model = model
+        self.calls = 0
+
+    async def grade_question(self, question):
+        self.calls += 1
+        await asyncio.sleep(self.model.latency(self.args.grade_seconds))
+        return {"passed": self.rng.random() < self.args.pass_rate, "feedback": "simulated failure", "scorecard": {}}
+
+
+async def sequential(model, grader):
+    """Draft, check and grade one candidate at a time until one passes."""
+    start = time.perf_counter()
+    index = 0
+    while True:
+        question = await model.draft(TEMPLATE, {}, index)
+        index += 1
+        if check_question(question, TEMPLATE):
+            continue
+        if (await grader.grade_question(question.model_dump(mode="json")))["passed"]:
+            return time.perf_counter() - start
+
+
+async def raced(generator):
+    start = time.perf_counter()
+    while (await generator.generate(TEMPLATE))["question"] is None:
+        pass
+    return time.perf_counter() - start
+
+
+def report(label, times, speedup, calls):
+    times = sorted(t * speedup for t in times)
+    print(f"{label:<28} p50 {statistics.median(times):6.2f}s  p95 {times[int(len(times) * 0.95)]:6.2f}s  "
+          f"model+grader calls/question {calls / len(times):.2f}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--candidates', type=int, default=4)
+    parser.add_argument('--draft-seconds', type=float, default=6.0, help='Median model latency per draft')
+    parser.add_argument('--grade-seconds', type=float, default=4.0, help='Median grader latency')
+    parser.add_argument('--pass-rate', type=float, default=0.6, help='Share of well-formed drafts the grader passes')
+    parser.add_argument('--malformed', type=float, default=0.15, help='Share of drafts failing the deterministic checks')
+    parser.add_argument('--speedup', type=float, default=100.0, help='Divide simulated latencies by this')
+    args = parser.parse_args()
+    generator_module.generation_context = lambda template: {'standard_description': None, 'lessons': [], 'sample_questions': []}
+
+    rng = random.Random(3)
+    model = SimulatedModel(args, rng)
+    grader = SimulatedGrader(args, rng, model)
+    times = [await sequential(model, grader) for _ in range(args.requests)]
+    report("sequential draft + grade", times, args.speedup, model.calls + grader.calls)
+
+    model = SimulatedModel(args, rng)
+    grader = SimulatedGrader(args, rng, model)
+    generator = QuestionGenerator(grader, candidates=args.candidates)
+    generator._draft = model.draft
+    times = [await raced(generator) for _ in range(args.requests)]
+    report(f"raced, k={args.candidates}", times, args.speedup, model.calls + grader.calls)
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Cold-start import benchmark based on ``python -X importtime``.
+
+Imports each entry-point module in a fresh interpreter, reports the
+cumulative import time and the heaviest dependencies, and exits non-zero
+when a module blows its budget or eagerly imports a dependency that should
+only load on first use.
+
+Usage:
+    python benchmarks/bench_import_time.py
+    python benchmarks/bench_import_time.py --runs 5 --top 15
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Cumulative import budget (ms) per entry point, best of --runs
+BUDGETS_MS = {
+    'src.api.main': 600,
+    'src.services.grader': 150,
+    'src.services.ccc_client': 300,
+    'app.app': 400,
+}
+
+# Dependencies that must not load at import time of the listed module
+DEFERRED = {
+    'src.api.main': ['openai', 'httpx', 'dotenv'],
+    'src.services.grader': ['openai', 'httpx'],
+    'src.services.ccc_client': ['openai', 'httpx', 'dotenv'],
+    'app.app': ['openai', 'httpx', 'requests', 'ijson'],
+}
+
+
+def profile_import(module):
+    """Import module in a fresh interpreter and return (total_us, [(cumulative_us, name)], loaded)"""
+    check = f"import sys, {module}; print(','.join(sorted(sys.modules)))"
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', check],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{proc.stderr.strip().splitlines()[-1]}")
+
+    entries = []
+    for line in proc.stderr.splitlines():
+        fields = line[len('import time:'):].split('|')
+        if not line.startswith('import time:') or len(fields) != 3 or not fields[1].strip().isdigit():
+            continue
+        # Drop the column separator space; what is left is indented two spaces per nesting level
+        entries.append((int(fields[1]), fields[2][1:]))
+
+    # Top-level imports of our own package, each including its nested dependencies
+    package = module.split('.')[0]
+    total = sum(
+        us for us, name in entries
+        if not name.startswith(' ') and name.split('.')[0] == package
+    )
+    loaded = set(proc.stdout.strip().split(','))
+    return total, entries, loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('modules', nargs='*', default=list(BUDGETS_MS))
+    parser.add_argument('--runs', type=int, default=3, help='Fresh interpreters per module (best is kept)')
+    parser.add_argument('--top', type=int, default=10, help='Heaviest imports to list per module')
+    args = parser.parse_args()
+
+    failures = []
+    for module in args.modules:
+        try:
+            runs = [profile_import(module) for _ in range(args.runs)]
+        except RuntimeError as e:
+            print(f"{module}: skipped ({e})")
+            continue
+
+        total, entries, loaded = min(runs, key=lambda run: run[0])
+        budget = BUDGETS_MS.get(module)
+        status = 'ok' if budget is None or total / 1000 <= budget else 'OVER BUDGET'
+        print(f"\n{module}: {total / 1000:.1f} ms (budget {budget} ms) {status}")
+        for us, name in sorted(entries, reverse=True)[:args.top]:
+            print(f"  {us / 1000:8.1f} ms  {name.strip()}")
+
+        if status != 'ok':
+            failures.append(f"{module} took {total / 1000:.1f} ms, budget is {budget} ms")
+        eager = [dep for dep in DEFERRED.get(module, []) if dep in loaded]
+        if eager:
+            failures.append(f"{module} eagerly imports {', '.join(eager)}")
+
+    if failures:
+        print('\nImport-time regressions:')
+        for failure in failures:
+            print(f"  - {failure}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
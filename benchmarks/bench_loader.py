@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Benchmark peak memory and load time of the curriculum/CCC readers: the
+json.load path against the ijson streaming path.
+
+A synthetic CCC file of the requested size is written first (streamed, so
+generating 1 GB does not need 1 GB of RAM); each reader then runs in a fresh
+interpreter so peak RSS is measured per reader.
+
+Usage:
+    python benchmarks/bench_loader.py --size-mb 1024
+    python benchmarks/bench_loader.py --size-mb 200 --kind curriculum
+"""
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+QUESTION = (
+    "```markdown\nA cart of mass {m} kg is pushed with a force of {f} N. "
+    "Friction is {r} N. What is the net force on the cart?\n\n- {a} N\n- {b} N\n- {c} N\n```"
+)
+
+READER = r"""
+import json, os, resource, sys, time
+sys.path.insert(0, {root!r})
+os.environ['INCEPT_STREAMING_LOAD'] = {mode!r}
+from src.services import curriculum
+curriculum.CONFIG[{kind!r}] = {path!r}
+started = time.perf_counter()
+data = curriculum.read_{kind}_structure(strict=True)
+elapsed = time.perf_counter() - started
+records = len(data.get('items') or data.get('lessons') or [])
+print(json.dumps({{'seconds': elapsed, 'peak_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 'records': records}}))
+"""
+
+
+def write_ccc(path, size_bytes, seed=11):
+    rng = random.Random(seed)
+    written = 0
+    with open(path, 'w') as f:
+        f.write('{"content": [')
+        i = 0
+        while written < size_bytes:
+            item = {
+                'id': str(i),
+                'content_type': rng.choice(['question', 'article', 'video']),
+                'source': f"CCC item {i}",
+                'standard': f"MS-PS{rng.randint(1, 4)}-{rng.randint(1, 6)}",
+                'lesson': f"Lesson {rng.randint(1, 400)}",
+                'difficulty': rng.choice(['easy', 'medium', 'hard']),
+                'subject': "['science']",
+                'body': QUESTION.format(m=rng.randint(1, 50), f=rng.randint(1, 99), r=rng.randint(1, 20),
+                                        a=rng.randint(1, 99), b=rng.randint(1, 99), c=rng.randint(1, 99)) * 3
+            }
+            chunk = (',' if i else '') + json.dumps(item)
+            f.write(chunk)
+            written += len(chunk)
+            i += 1
+        f.write(']}')
+
+
+def write_curriculum(path, size_bytes, seed=11):
+    rng = random.Random(seed)
+    written = 0
+    with open(path, 'w') as f:
+        f.write('{"curriculum": {"8": {"lessons": [')
+        i = 0
+        while written < size_bytes:
+            lesson = {
+                'title': f"Lesson {i}",
+                'standard_code': f"MS-PS{rng.randint(1, 4)}-{rng.randint(1, 6)}",
+                'standard_description': "Apply Newton's Third Law to design a solution to a problem involving the motion of two colliding objects.",
+                'sample_questions': [
+                    QUESTION.format(m=rng.randint(1, 50), f=rng.randint(1, 99), r=rng.randint(1, 20),
+                                    a=rng.randint(1, 99), b=rng.randint(1, 99), c=rng.randint(1, 99))
+                    for _ in range(5)
+                ]
+            }
+            chunk = (',' if i else '') + json.dumps(lesson)
+            f.write(chunk)
+            written += len(chunk)
+            i += 1
+        f.write(']}}}')
+
+
+def run_reader(kind, path, mode):
+    script = READER.format(root=ROOT, mode=mode, kind=kind, path=path)
+    proc = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, check=True)
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size-mb', type=int, default=1024)
+    parser.add_argument('--kind', choices=['ccc', 'curriculum'], default='ccc')
+    parser.add_argument('--keep', help='Write the synthetic file here and keep it')
+    args = parser.parse_args()
+
+    path = args.keep or os.path.join(tempfile.gettempdir(), f"bench_{args.kind}_{args.size_mb}mb.json")
+    if not os.path.exists(path):
+        print(f"Writing {args.size_mb} MB synthetic {args.kind} file to {path}")
+        (write_ccc if args.kind == 'ccc' else write_curriculum)(path, args.size_mb * 1024 * 1024)
+    size_mb = os.path.getsize(path) / 1024 / 1024
+
+    try:
+        for mode, label in (('0', 'json.load'), ('1', 'streaming')):
+            result = run_reader(args.kind, path, mode)
+            print(f"{label:>10}: {result['seconds']:7.2f} s  peak RSS {result['peak_mb']:8.1f} MB "
+                  f"({result['peak_mb'] / size_mb:.2f}x file)  {result['records']} records")
+    finally:
+        if not args.keep:
+            os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Benchmark the slotted question records (src.models.records) against the
+pydantic Question model: objects per second to build, convert and encode,
+and bytes per object in memory and encoded.
+
+Usage:
+    python benchmarks/bench_records.py --count 1000000 --memory-sample 100000
+"""
+
+import argparse
+import gc
+import io
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models.question import Question
+from src.models.records import QuestionRecord, encode, decode, iter_records, write_records
+
+
+def question_dict(i):
+    """A distinct question shaped like Question.model_dump() output"""
+    return {
+        'prompt': f"A student pushes a {i % 50 + 1} kg box with a constant force of 50 N against 30 N of friction. "
+                  f"What is the net force on the box? (#{i})",
+        'stimuli': None,
+        'images': None,
+        'interaction_type': 'multiple_choice',
+        'choices': [
+            {'text': f"{n} N", 'is_correct': n == 20, 'explanation': f"Net force is push minus friction ({i})."}
+            for n in (20, 80, 50, 30)
+        ],
+        'correct_answer': '20 N',
+        'solution': {'steps': ["Identify the forces", "Subtract friction", f"50 N - 30 N = 20 N ({i})"],
+                     'explanation': "The net force is the sum of all forces."},
+        'grading_criteria': None,
+        'subject': 'science',
+        'grade': 8,
+        'standard': 'MS-PS2-2',
+        'lesson': f"Net force {i % 100}",
+        'difficulty': 2,
+    }
+
+
+def timed(label, count, fn):
+    gc.collect()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<44} {count / elapsed:>12,.0f} objects/s  ({elapsed:.2f}s)")
+    return result
+
+
+def bytes_per_object(build, count):
+    """Bytes allocated per object by build(), measured with tracemalloc (sources excluded)"""
+    sources = [question_dict(i) for i in range(count)]
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = build(sources)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del objects
+    return (after - before) / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--count', type=int, default=1_000_000, help="Questions per run (default 1,000,000)")
+    parser.add_argument('--memory-sample', type=int, default=100_000, help="Questions measured with tracemalloc")
+    args = parser.parse_args()
+    count = args.count
+
+    print(f"{count:,} questions\n")
+    records = timed("records: from_dict", count, lambda: [QuestionRecord.from_dict(question_dict(i)) for i in range(count)])
+    baseline = timed("(building the source dicts alone)", count, lambda: [question_dict(i) for i in range(count)])
+    del baseline
+    models = timed("pydantic: Question.model_validate", count, lambda: [Question.model_validate(question_dict(i)) for i in range(count)])
+    del models
+    models = timed("records -> pydantic (to_model)", count, lambda: [record.to_model() for record in records])
+    timed("pydantic -> records (from_model)", count, lambda: [QuestionRecord.from_model(model) for model in models])
+    timed("pydantic: model_dump", count, lambda: [model.model_dump() for model in models])
+    json_bytes = timed("pydantic: model_dump_json", count, lambda: sum(len(model.model_dump_json()) for model in models))
+    del models
+
+    encoded = timed("records: encode", count, lambda: encode(records))
+    decoded = timed("records: decode", count, lambda: decode(encoded))
+    assert decoded == records
+    del decoded
+    stream = io.BytesIO()
+    timed("records: write_records (framed stream)", count, lambda: write_records(stream, records))
+    stream.seek(0)
+    timed("records: iter_records", count, lambda: sum(1 for _ in iter_records(stream)))
+
+    sample = min(args.memory_sample, count)
+    print(f"\nBytes per object ({sample:,} measured in memory)")
+    print(f"{'pydantic Question in memory':<44} {bytes_per_object(lambda s: [Question.model_validate(d) for d in s], sample):>12,.0f}")
+    print(f"{'QuestionRecord in memory':<44} {bytes_per_object(lambda s: [QuestionRecord.from_dict(d) for d in s], sample):>12,.0f}")
+    print(f"{'JSON (model_dump_json)':<44} {json_bytes / count:>12,.0f}")
+    print(f"{'binary records (encode)':<44} {len(encoded) / count:>12,.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Benchmark /api/search: index build time and typeahead latency over a
+synthetic curriculum, typing each query one character at a time.
+
+Usage:
+    python benchmarks/bench_search.py --lessons 20000 --items 20000
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.services.curriculum import build_search_index
+
+WORDS = (
+    "force motion newton friction gravity mass acceleration velocity energy magnet "
+    "field charge balanced unbalanced push pull object speed distance collision "
+    "momentum inertia reaction weight planet orbit electric current circuit"
+).split()
+
+QUERIES = ["newton third", "friction force", "magnetic field", "MS-PS2", "balanced forces", "gravity planet orbit"]
+
+# Real text has a long tail of rarer words; draw from a Zipf-like distribution over
+# the physics words followed by synthetic ones
+VOCABULARY = WORDS + [f"word{i}" for i in range(5000)]
+ZIPF_WEIGHTS = [1 / rank for rank in range(1, len(VOCABULARY) + 1)]
+
+
+def sentence(rng, words=12):
+    return " ".join(rng.choices(VOCABULARY, ZIPF_WEIGHTS, k=words)).capitalize() + "?"
+
+
+def make_data(lessons, items, seed=7):
+    rng = random.Random(seed)
+    standards = [{'code': f"MS-PS{s % 4 + 1}-{s}", 'description': sentence(rng, 20), 'grade': '8'} for s in range(200)]
+    curriculum = {
+        'standards': standards,
+        'lessons': [
+            {
+                'id': f"8-lesson-{i}",
+                'title': sentence(rng, 4),
+                'standard_code': standards[i % len(standards)]['code'],
+                'standard_description': standards[i % len(standards)]['description'],
+                'sample_questions': [f"```markdown\n{sentence(rng)}\n\n- A\n- B\n```" for _ in range(5)]
+            }
+            for i in range(lessons)
+        ]
+    }
+    ccc = {'items': [{'id': str(i), 'title': sentence(rng, 5), 'standard_code': standards[i % 200]['code']} for i in range(items)]}
+    return curriculum, ccc
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--lessons', type=int, default=20000)
+    parser.add_argument('--items', type=int, default=20000)
+    args = parser.parse_args()
+
+    curriculum, ccc = make_data(args.lessons, args.items)
+    started = time.perf_counter()
+    index = build_search_index(curriculum, ccc)
+    print(f"Indexed {len(index)} documents ({len(index.terms)} terms) in {time.perf_counter() - started:.2f}s")
+
+    timings = []
+    for query in QUERIES:
+        for end in range(1, len(query) + 1):
+            started = time.perf_counter()
+            index.search(query[:end])
+            timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    print(f"Typeahead over {len(timings)} keystrokes: "
+          f"median {statistics.median(timings):.2f} ms, "
+          f"p95 {timings[int(len(timings) * 0.95)]:.2f} ms, max {timings[-1]:.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Benchmark large-response JSON serialization: stdlib json vs the fast path in
+src.utils.serialization (orjson/msgspec when installed).
+
+Usage:
+    python benchmarks/bench_serialization.py --lessons 20000 --repeat 5
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.services.curriculum import cached_json
+from src.utils import serialization
+
+SAMPLE_QUESTION = (
+    "A student pushes a 10 kg box across a rough floor with a constant force of 50 N.\n"
+    "If the force of friction is 30 N, what is the net force on the box?\n\n"
+    "- 20 N\n- 80 N\n- 50 N\n- 30 N"
+)
+
+
+def make_lessons(count):
+    """Lessons shaped like the /api/lessons payload"""
+    return [
+        {
+            'id': f"8-lesson-{i}",
+            'title': f"Forces and motion lesson {i}",
+            'grade': '8',
+            'third_party_code': f"MS-PS2-{i % 5 + 1}",
+            'ixl_skill_code': f"X{i:05d}",
+            'order': str(i),
+            'video_url': f"https://example.com/videos/{i}",
+            'standard_code': f"MS-PS2-{i % 5 + 1}",
+            'standard_description': "Apply Newton's Third Law to design a solution to a problem " * 2,
+            'sample_questions': [SAMPLE_QUESTION] * 4,
+            'question_count': 4,
+        }
+        for i in range(count)
+    ]
+
+
+def make_structure(lessons):
+    """Node/link graph shaped like the /api/structure payload"""
+    nodes = [{'id': f"MS-PS2-{i}", 'type': 'standard', 'data': {'code': f"MS-PS2-{i}"}} for i in range(1, 6)]
+    nodes += [{'id': lesson['id'], 'type': 'lesson', 'data': lesson} for lesson in lessons]
+    links = [
+        {'source': lesson['standard_code'], 'target': lesson['id'], 'type': 'standard-lesson'}
+        for lesson in lessons
+    ]
+    return {'nodes': nodes, 'links': links}
+
+
+def make_questions(count):
+    """Question dicts shaped like Question.model_dump() output"""
+    return [
+        {
+            'prompt': SAMPLE_QUESTION,
+            'stimuli': None,
+            'images': None,
+            'interaction_type': 'multiple_choice',
+            'choices': [
+                {'text': f"{n} N", 'is_correct': n == 20, 'explanation': "Net force is push minus friction."}
+                for n in (20, 80, 50, 30)
+            ],
+            'correct_answer': '20 N',
+            'solution': {'steps': ["Identify the forces", "Subtract friction", "50 N - 30 N = 20 N"],
+                         'explanation': "The net force is the sum of all forces."},
+            'grading_criteria': None,
+            'subject': 'science',
+            'grade': 8,
+            'standard': 'MS-PS2-2',
+            'lesson': f"Net force {i}",
+            'difficulty': 2,
+        }
+        for i in range(count)
+    ]
+
+
+def stdlib_dumps(obj):
+    # What jsonify/JSONResponse did before the fast path
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode('utf-8')
+
+
+def measure(encode, payload, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        encode(payload)
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    body = encode(payload)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak, len(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--lessons', type=int, default=20000)
+    parser.add_argument('--questions', type=int, default=50000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    lessons = make_lessons(args.lessons)
+    payloads = {
+        '/api/lessons': lessons,
+        '/api/structure': make_structure(lessons),
+        'Question list': make_questions(args.questions),
+    }
+
+    print(f"Fast serializer backend: {serialization.BACKEND}")
+    print(f"{'payload':<16}{'encoder':<10}{'time (ms)':>12}{'peak (MiB)':>12}{'size (MiB)':>12}")
+    for name, payload in payloads.items():
+        for label, encode in (('stdlib', stdlib_dumps), (serialization.BACKEND, serialization.dumps)):
+            elapsed, peak, size = measure(encode, payload, args.repeat)
+            print(f"{name:<16}{label:<10}{elapsed * 1000:>12.1f}{peak / 2**20:>12.1f}{size / 2**20:>12.1f}")
+
+    # Bodies are encoded once per data snapshot and reused until the data changes
+    cached_json('bench:lessons', lambda snapshot: lessons)
+    start = time.perf_counter()
+    cached_json('bench:lessons', lambda snapshot: lessons)
+    print(f"\nPer-snapshot cached body hit for /api/lessons: {(time.perf_counter() - start) * 1e6:.1f} us")
+
+
+if __name__ == '__main__':
+    main()
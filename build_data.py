@@ -0,0 +1,100 @@
+"""
+Build the data files from the CSV exports, redoing only what changed.
+
+Usage:
+    python build_data.py [--curriculum IXL.csv ...] [--ccc ccc.csv ...] [--data-dir data]
+                         [--jobs N] [--on-conflict first|last|error] [--force]
+
+Converts the curriculum and CCC exports to the JSON files the services read
+and compiles the visualizer's snapshot from them. Each of --curriculum and
+--ccc takes files, directories (every *.csv below them) or glob patterns;
+the files are converted in parallel and merged in path order, and a lesson
+or item found in several files is kept from the first (or last) of them.
+
+A manifest of input and row hashes is kept in the data directory
+(build_manifest.json): unchanged exports are skipped, unchanged rows of a
+changed export are copied from the previous output, and the snapshot and
+its graph layout are rebuilt only when their inputs changed. --force
+rebuilds everything.
+"""
+
+import argparse
+import os
+
+from src.services import curriculum
+from src.services.data_build import (
+    CONFLICT_POLICIES, MANIFEST_NAME, BuildConflict, build_snapshot, expand_inputs, load_manifest, run_stage, save_manifest
+)
+
+OUTPUT_NAMES = {
+    'curriculum': 'curriculum_structure.json',
+    'ccc': 'ccc_structure.json'
+}
+
+
+def describe(name, result):
+    if result['status'] == 'unchanged':
+        return f"{name}: unchanged"
+    if 'records' not in result:
+        return f"{name}: built in {result['seconds']}s"
+    if 'converted' not in result:
+        return f"{name}: {result['records']} records in {result['seconds']}s"
+    return (f"{name}: {result['records']} records ({result['converted']} converted, "
+            f"{result['reused']} reused) in {result['seconds']}s")
+
+
+def report(name, result):
+    print(describe(name, result))
+    if result['status'] == 'unchanged':
+        return
+    files = result['files']
+    if len(files) > 1:
+        for run in files:
+            print(f"  {describe(run['path'], run)}")
+    if result['duplicates']:
+        print(f"  {result['duplicates']} records repeated identically across files")
+    if result['conflicts']:
+        print(f"  {result['conflicts']} conflicting records across files:")
+        for conflict in result['conflict_examples'][:10]:
+            kept = f", kept from {conflict['kept']}" if conflict['kept'] else ''
+            print(f"    {conflict['kind']} {conflict['key']} in {', '.join(conflict['files'])}{kept}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Incrementally build the data files from the CSV exports")
+    parser.add_argument('--curriculum', nargs='+', default=['IXL.csv'], help="Curriculum CSV exports, directories or globs (default IXL.csv)")
+    parser.add_argument('--ccc', nargs='+', default=['ccc.csv'], help="CCC CSV exports, directories or globs (default ccc.csv)")
+    parser.add_argument('--data-dir', default=os.path.join(curriculum.PROJECT_ROOT, 'data'), help="Where the JSON files, snapshot and manifest go")
+    parser.add_argument('--no-snapshot', action='store_true', help="Do not compile the visualizer's snapshot")
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1, help="Worker processes (default: one per core)")
+    parser.add_argument('--on-conflict', choices=CONFLICT_POLICIES, default='first',
+                        help="Which file a lesson or item found in several files is kept from, or fail (default first)")
+    parser.add_argument('--force', action='store_true', help="Rebuild everything, ignoring the manifest")
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.data_dir, exist_ok=True)
+    for name, filename in OUTPUT_NAMES.items():
+        curriculum.CONFIG[name] = os.path.join(args.data_dir, filename)
+    if 'INCEPT_SNAPSHOT_PATH' not in os.environ:
+        curriculum.CONFIG['snapshot'] = os.path.join(args.data_dir, 'snapshot.sqlite3')
+
+    manifest_path = os.path.join(args.data_dir, MANIFEST_NAME)
+    manifest = load_manifest(manifest_path)
+    try:
+        for name, specs in (('curriculum', args.curriculum), ('ccc', args.ccc)):
+            inputs = [path for path in expand_inputs(specs) if os.path.exists(path)]
+            if not inputs:
+                print(f"{name}: no files match {' '.join(specs)}, skipped")
+                continue
+            report(name, run_stage(manifest, name, inputs, curriculum.CONFIG[name], args.force, args.jobs, args.on_conflict))
+    except BuildConflict as e:
+        parser.exit(1, f"{e}\n")
+    finally:
+        save_manifest(manifest_path, manifest)
+
+    if not args.no_snapshot:
+        print(describe('snapshot', build_snapshot(args.force)))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,42 +1,48 @@
-import csv
-import json
-import ast  # For safely evaluating the array strings
+"""
+Convert the CCC export (CSV) into ccc_structure.json.
+
+Usage:
+    python ccc.py [ccc.csv] [-o ccc_structure.json] [--sqlite ccc.sqlite3] [--no-snapshot]
+
+This always converts every row; build_data.py converts only what changed.
+With --sqlite the items are also written to an SQLite database with a typed
+column and an index per filterable field (see src/services/ccc_store.py).
+"""
+
+import argparse
+import os
+
+from src.services.ccc_store import write_ccc_database
+from src.services.data_build import convert, iter_records
 
 # Define the input and output files
 input_csv = 'ccc.csv'
 output_json = 'ccc_structure.json'
 
-# Initialize the data structure
-ccc_data = {
-    "content": []
-}
-
-# Read the CSV file
-with open(input_csv, 'r', encoding='utf-8') as csvfile:
-    reader = csv.DictReader(csvfile)
-    
-    for row in reader:
-        # Parse the subject field which is a string representation of a list
-        try:
-            subject = ast.literal_eval(row['subject'])
-        except:
-            subject = row['subject']  # Keep as is if parsing fails
-            
-        # Add to our data structure
-        ccc_data["content"].append({
-            "id": row['id'],
-            "content_type": row['content type'],
-            "source": row['source'],
-            "subject": subject,
-            "grade": row['grade'],
-            "standard": row['standard'],
-            "lesson": row['lesson'],
-            "difficulty": row['difficulty'],
-            "interaction_type": row['interaction type']
-        })
-
-# Write to JSON file
-with open(output_json, 'w', encoding='utf-8') as jsonfile:
-    json.dump(ccc_data, jsonfile, indent=2)
-
-print(f"Converted {len(ccc_data['content'])} items to JSON")
\ No newline at end of file
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert the CCC CSV export to ccc_structure.json")
+    parser.add_argument('input', nargs='?', default=input_csv, help=f"CSV export (default {input_csv})")
+    parser.add_argument('-o', '--output', default=output_json, help=f"JSON file to write (default {output_json})")
+    parser.add_argument('--sqlite', metavar='PATH', help="Also write the items to an SQLite database at PATH")
+    parser.add_argument('--no-snapshot', action='store_true', help="Do not compile the visualizer's snapshot afterwards")
+    args = parser.parse_args(argv)
+
+    entry = convert('ccc', args.input, args.output)
+    print(f"Converted {entry['last_run']['records']} items to JSON")
+    if args.sqlite:
+        count = write_ccc_database(args.sqlite, (item for _, item in iter_records('ccc', args.input)))
+        print(f"Wrote {count} items to {args.sqlite}")
+
+    if args.no_snapshot:
+        return
+    # Compile the snapshot the visualizer starts from (it falls back to the JSON without one)
+    from src.services.curriculum import compile_snapshot, get_json_path
+    if os.path.abspath(args.output) != os.path.abspath(get_json_path('ccc')):
+        print(f"Not compiling a snapshot: the visualizer reads {get_json_path('ccc')}")
+        return
+    print(f"Compiled snapshot to {compile_snapshot()}")
+
+
+if __name__ == '__main__':
+    main()
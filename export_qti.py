@@ -0,0 +1,66 @@
+"""
+Export questions as QTI 3.0 assessment items (and their stimuli as shared
+stimuli) to files or to the QTI API.
+
+Usage:
+    python export_qti.py questions.jsonl -o qti/ [--format json|xml]
+    python export_qti.py questions.qrec --upload [URL] [--concurrency 8]
+
+The input is JSON Lines of Question.model_dump() objects or a question
+record stream written by src.models.records.write_records (.qrec). Both are
+read one question at a time, so a corpus of any size exports in constant
+memory; see src/services/qti_export.py.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+
+from src.services.qti_export import FORMATS, QTI_API_URL, QTIUploader, iter_documents, write_documents
+
+
+def read_questions(path):
+    """Questions from a .jsonl or .qrec file, one at a time."""
+    if path.endswith('.qrec'):
+        from src.models.records import iter_records
+
+        with open(path, 'rb') as f:
+            yield from iter_records(f)
+        return
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export questions as QTI assessment items")
+    parser.add_argument('input', help="Questions as JSON Lines (.jsonl) or question records (.qrec)")
+    parser.add_argument('-o', '--output', help="Directory (or .jsonl file for JSON) to write the documents to")
+    parser.add_argument('--upload', nargs='?', const=QTI_API_URL, metavar='URL', help=f"Upload to the QTI API (default {QTI_API_URL})")
+    parser.add_argument('--format', choices=FORMATS, default='json', help="Document format (default json)")
+    parser.add_argument('--concurrency', type=int, default=8, help="Uploads in flight (default 8)")
+    args = parser.parse_args(argv)
+    if bool(args.output) == bool(args.upload):
+        parser.error("give exactly one of --output and --upload")
+
+    started = time.perf_counter()
+    documents = iter_documents(read_questions(args.input))
+    if args.output:
+        counts = write_documents(documents, args.output, args.format)
+    else:
+        uploader = QTIUploader(args.upload, format=args.format, concurrency=args.concurrency)
+        counts = asyncio.run(uploader.upload(documents))
+    elapsed = time.perf_counter() - started
+
+    print(f"Exported {counts['item']} items and {counts['stimulus']} stimuli in {elapsed:.1f}s")
+    failed = counts.get('failed')
+    if failed:
+        print(f"{len(failed)} documents failed (after {counts['retries']} retries), e.g. {failed[0][0]}: {failed[0][1]}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -3,6 +3,7 @@ import asyncio
 import json
 from dotenv import load_dotenv
 from src.services.ccc_client import CCCClient
+from src.services.dedup import cluster_questions
 from src.services.grader import QuestionGrader
 
 async def main():
@@ -27,6 +28,7 @@ async def main():
         "total": 0,
         "passed": 0,
         "failed": 0,
+        "duplicates": 0,
         "failures_by_category": {}
     }
     
@@ -53,13 +55,25 @@ async def main():
                 print("No questions found to grade.")
                 continue
                 
+            # Grade one representative per cluster of near-duplicates
+            index = cluster_questions(questions)
+            results = {}
+            print(f"{index.cluster_count} distinct questions after removing near-duplicates")
+            
             # Convert Pydantic models to dictionaries for the grader
             for i, question in enumerate(questions):
-                question_dict = question.dict()
-                print(f"\n--- Grading Question {i+1}/{len(questions)} for {standard} ---")
-                
-                # Grade the question
-                result = await grader.grade_question(question_dict)
+                representative = index.representative_of(i)
+                if representative != i:
+                    print(f"\n--- Question {i+1}/{len(questions)} duplicates question {representative+1}, reusing its grade ---")
+                    result = results[representative]
+                    stats["duplicates"] += 1
+                else:
+                    question_dict = question.dict()
+                    print(f"\n--- Grading Question {i+1}/{len(questions)} for {standard} ---")
+                    
+                    # Grade the question
+                    result = await grader.grade_question(question_dict)
+                    results[i] = result
                 
                 # Update statistics
                 stats["total"] += 1
@@ -83,6 +97,7 @@ async def main():
     # Print summary statistics
     print("\n=== GRADING SUMMARY ===")
     print(f"Total questions graded: {stats['total']}")
+    print(f"Near-duplicates given their representative's grade: {stats['duplicates']}")
     
     if stats['total'] > 0:
         passed_pct = stats['passed']/stats['total']*100
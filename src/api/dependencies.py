@@ -0,0 +1,37 @@
+from fastapi import Request
+
+from src.services.cache import TieredCache
+from src.services.ccc_client import CCCClient
+from src.services.tag_memo import TagMemo
+
+
+def get_ccc_client(request: Request) -> CCCClient:
+    return request.app.state.ccc_client
+
+
+def get_tag_cache(request: Request) -> TieredCache:
+    return request.app.state.tag_cache
+
+
+def get_tag_memo(request: Request) -> TagMemo:
+    return request.app.state.tag_memo
+
+
+def get_grader(request: Request):
+    """Shared QuestionGrader, built on first use so openai is not imported at startup."""
+    state = request.app.state
+    if getattr(state, "grader", None) is None:
+        from src.services.grader import QuestionGrader
+
+        state.grader = QuestionGrader()
+    return state.grader
+
+
+def get_generator(request: Request):
+    """Shared QuestionGenerator, grading with the shared grader."""
+    state = request.app.state
+    if getattr(state, "generator", None) is None:
+        from src.services.generator import QuestionGenerator
+
+        state.generator = QuestionGenerator(get_grader(request))
+    return state.generator
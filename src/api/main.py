@@ -1,18 +1,75 @@
-from fastapi import FastAPI, HTTPException
+import os
+from contextlib import asynccontextmanager
+
+from fastapi import Depends, FastAPI, HTTPException, Request, Response
 from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
 from typing import List, Optional
 
+from src.api.dependencies import get_ccc_client, get_generator, get_tag_cache, get_tag_memo
+from src.api.responses import FastJSONResponse
+from src.api.visualizer import router as visualizer_router
 from src.models.question import Question, InteractionType, Choice, Image, Solution
 from src.services.ccc_client import CCCClient, CCCError
+from src.services.curriculum import data_store
+from src.services.cache import TieredCache, get_cache, make_key
+from src.services.tag_memo import TagMemo, prompt_fingerprint
+
+TAG_CACHE_TTL = 3600.0
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Build clients when the server starts rather than when the module is imported."""
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    app.state.ccc_client = CCCClient()
+    # Tagging results are shared by every worker on the host
+    app.state.tag_cache = get_cache("tag")
+    # Sub-millisecond memo for re-submitted prompts, in front of the shared cache
+    app.state.tag_memo = TagMemo(ttl=TAG_CACHE_TTL)
+    app.state.grader = None
+    app.state.generator = None
+    # Build the first data snapshot now rather than on the first request, off the event loop
+    await run_in_threadpool(data_store.snapshot)
+    # Hot-reload the curriculum/CCC data files in the background
+    data_store.start()
+    mount_visualizer_ui(app)
+    yield
+    data_store.stop()
+    await app.state.ccc_client.aclose()
+    if app.state.grader is not None:
+        await app.state.grader.aclose()
+
+def mount_visualizer_ui(app: FastAPI) -> None:
+    """
+    Serve the Flask visualizer's pages and static files from this process.
+
+    The /api/* routes are answered by the async router included below, which
+    is registered first and therefore wins over the Flask app's own copies.
+    Mounting happens at startup so importing this module does not import Flask.
+    """
+    if os.getenv("INCEPT_MOUNT_VISUALIZER", "1") == "0":
+        return
+    if any(getattr(route, "name", None) == "visualizer-ui" for route in app.routes):
+        return
+    from fastapi.middleware.wsgi import WSGIMiddleware
+    from app.app import app as flask_app
+
+    app.mount("/", WSGIMiddleware(flask_app), name="visualizer-ui")
 
 app = FastAPI(
     title="Incept API",
     description="API for generating educational content for 8th grade science",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=FastJSONResponse,
+    lifespan=lifespan
 )
 
-# Initialize clients
-ccc_client = CCCClient()
+app.include_router(visualizer_router)
+
+# Fields copied from the most similar CCC question onto a tagged question
+TAG_FIELDS = ["subject", "grade", "standard", "lesson", "difficulty"]
 
 # Models
 class Article(BaseModel):
@@ -38,9 +95,14 @@ SUPPORTED_STANDARDS = [
 
 # Question endpoints
 @app.post("/api/v1/questions/tag", response_model=Question)
-async def tag_question(question: Question):
+async def tag_question(
+    question: Question,
+    ccc_client: CCCClient = Depends(get_ccc_client),
+    tag_cache: TieredCache = Depends(get_tag_cache),
+    tag_memo: TagMemo = Depends(get_tag_memo)
+):
     """Tag a question with subject, grade, standard, lesson, and difficulty."""
-    try:
+    async def find_tags() -> dict:
         # Use CCC client to find similar questions
         similar_questions = await ccc_client.find_similar_questions(question.prompt)
         
@@ -50,13 +112,22 @@ async def tag_question(question: Question):
             
         # Use the most similar question's metadata
         most_similar = similar_questions[0]
+        return {field: getattr(most_similar, field) for field in TAG_FIELDS}
+
+    try:
+        corpus_version = ccc_client.corpus_version
+        tags = tag_memo.get(question.prompt, corpus_version)
+        if tags is None:
+            tags = await tag_cache.aget_or_set(
+                make_key(corpus_version, prompt_fingerprint(question.prompt)),
+                find_tags,
+                TAG_CACHE_TTL
+            )
+            tag_memo.set(question.prompt, corpus_version, tags)
         
         # Update our question with the metadata
-        question.subject = most_similar.subject
-        question.grade = most_similar.grade
-        question.standard = most_similar.standard
-        question.lesson = most_similar.lesson
-        question.difficulty = most_similar.difficulty
+        for field in TAG_FIELDS:
+            setattr(question, field, tags[field])
         
         return question
         
@@ -71,15 +142,39 @@ async def tag_question(question: Question):
             detail=f"Unexpected error while tagging question: {str(e)}"
         )
 
+@app.get("/api/v1/questions/tag/stats")
+async def tag_memo_stats(tag_memo: TagMemo = Depends(get_tag_memo)):
+    """Hit/miss counters of the tagging memo."""
+    return tag_memo.stats()
+
 @app.post("/api/v1/questions/grade", response_model=GradeResponse)
 async def grade_question(question: Question):
     """Grade a question and provide quality feedback."""
     raise HTTPException(status_code=501, detail="Not implemented yet")
 
 @app.post("/api/v1/questions/generate", response_model=Question)
-async def generate_question(template: Question):
-    """Generate a new question based on provided parameters."""
-    raise HTTPException(status_code=501, detail="Not implemented yet")
+async def generate_question(template: Question, response: Response, generator=Depends(get_generator)):
+    """Generate a new question like the template that passes the checks and the grader."""
+    result = await generator.generate(template)
+    if result["question"] is None:
+        raise HTTPException(
+            status_code=502,
+            detail={"message": "No generated question passed grading", "rejected": result["rejected"]}
+        )
+    response.headers["X-Time-To-First-Valid"] = f"{result['time_to_first_valid']:.3f}"
+    response.headers["X-Candidates-Rejected"] = str(len(result["rejected"]))
+    return result["question"]
+
+@app.get("/api/v1/questions/generate/stats")
+async def generation_stats(request: Request):
+    """Time to the first valid question and success rate of recent generations."""
+    generator = request.app.state.generator
+    if generator is None:
+        from src.services.generator import QuestionGenerator
+
+        # Same keys as a generator that has not run yet
+        generator = QuestionGenerator(grader=None)
+    return generator.stats()
 
 # Article endpoints
 @app.post("/api/v1/articles/tag", response_model=Article)
@@ -0,0 +1,12 @@
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+from src.utils.serialization import dumps
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson/msgspec when installed."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
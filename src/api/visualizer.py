@@ -0,0 +1,221 @@
+"""
+Async versions of the visualizer's /api/* routes (app/app.py).
+
+They share the CCC client, caches and curriculum data with the rest of the
+service. Routes that only read the local data (snapshot builds, SQLite
+queries, encoding and compression) are plain functions that FastAPI runs in
+its threadpool, so a slow one never stalls the event loop; the CCC fallback
+and grading routes stay async and hand their local work to the threadpool.
+"""
+
+from typing import Optional
+
+from fastapi import APIRouter, Body, Depends, Request
+from fastapi.responses import JSONResponse, Response
+from starlette.concurrency import run_in_threadpool
+
+from src.api.dependencies import get_ccc_client, get_grader
+from src.services import curriculum
+from src.services.ccc_client import CCCClient
+from src.utils.http_cache import encode_json_body
+from src.utils.serialization import dumps
+
+router = APIRouter(prefix="/api", tags=["visualizer"])
+
+
+def error_response(status_code: int, message: str) -> JSONResponse:
+    # Same {"error": ...} shape the Flask routes return
+    return JSONResponse({"error": message}, status_code=status_code)
+
+
+def json_response(request: Request, body: bytes, memo=None) -> Response:
+    """Encoded JSON body with ETag revalidation and gzip/br compression"""
+    status, headers, payload = encode_json_body(
+        body,
+        request.headers.get("accept-encoding"),
+        request.headers.get("if-none-match"),
+        memo
+    )
+    return Response(content=payload, status_code=status, headers=headers, media_type="application/json")
+
+
+def cached_json_response(request: Request, name, builder) -> Response:
+    return json_response(request, *curriculum.cached_json(name, builder))
+
+
+def listing_response(request: Request, items, cursor, limit, fields) -> Response:
+    """One page of items, or the whole list when no listing parameter was given"""
+    if cursor is None and limit is None and fields is None:
+        return json_response(request, dumps(items))
+    try:
+        page = curriculum.paginate_items(items, cursor, limit, fields)
+    except ValueError as e:
+        return error_response(400, str(e))
+    return json_response(request, dumps(page))
+
+
+@router.get("/standards")
+def get_standards(request: Request):
+    """Returns a list of all standards"""
+    return cached_json_response(request, "standards", lambda snapshot: snapshot["curriculum"].get("standards", []))
+
+
+@router.get("/lessons")
+def get_lessons(
+    request: Request,
+    standard_code: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    fields: Optional[str] = None
+):
+    """
+    Returns a list of all lessons, or lessons for a specific standard if standard_code is provided.
+    With cursor, limit or fields, returns one page as {items, next_cursor, total}.
+    """
+    if standard_code:
+        lessons = curriculum.lessons_for_standard(standard_code)
+    elif cursor is None and limit is None and fields is None:
+        return cached_json_response(request, "lessons", lambda snapshot: snapshot["curriculum"].get("lessons", []))
+    else:
+        lessons = curriculum.load_curriculum_structure().get("lessons", [])
+    return listing_response(request, lessons, cursor, limit, fields)
+
+
+@router.get("/lessons/{lesson_id}")
+def get_lesson(lesson_id: str):
+    """Returns a single lesson by ID"""
+    lesson = curriculum.get_lesson(lesson_id)
+    if lesson is None:
+        return error_response(404, "Lesson not found")
+    return lesson
+
+
+@router.get("/lessons/{lesson_id}/ccc-content")
+def get_lesson_ccc_content(lesson_id: str):
+    """Returns the CCC items joined to a lesson"""
+    return curriculum.ccc_items_for_lesson(lesson_id)
+
+
+@router.get("/standards/{standard_code}/lessons")
+def get_standard_lessons(standard_code: str):
+    """Returns lessons for a specific standard"""
+    return curriculum.lessons_for_standard(standard_code)
+
+
+@router.get("/ccc-content")
+async def get_ccc_content(
+    request: Request,
+    standard_code: Optional[str] = None,
+    lesson_id: Optional[str] = None,
+    content_type: Optional[str] = None,
+    difficulty: Optional[str] = None,
+    interaction_type: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    fields: Optional[str] = None,
+    ccc_client: CCCClient = Depends(get_ccc_client)
+):
+    """
+    CCC items for a standard or lesson, falling back to the CCC API for unknown standards,
+    optionally narrowed by content_type, difficulty and interaction_type.
+    Supports the same cursor/limit/fields paging as /api/lessons. When the CCC API
+    could not answer within the request budget, X-Partial-Results is set.
+    """
+    items = await run_in_threadpool(
+        curriculum.find_local_ccc_items, standard_code, lesson_id, content_type, difficulty, interaction_type
+    )
+    partial = False
+    narrowed = content_type or difficulty or interaction_type
+    if not items and standard_code and not narrowed:
+        items, partial = await curriculum.fetch_remote_ccc_items(ccc_client, standard_code)
+    response = await run_in_threadpool(listing_response, request, items, cursor, limit, fields)
+    if partial:
+        response.headers["X-Partial-Results"] = "true"
+    return response
+
+
+@router.get("/ccc-item/{item_id}")
+async def get_ccc_item(item_id: str, ccc_client: CCCClient = Depends(get_ccc_client)):
+    """Fetch detailed information about a specific CCC item, possibly from the CCC API"""
+    item = await run_in_threadpool(curriculum.find_local_ccc_item, item_id)
+    if item is None and item_id.startswith("CFItem-"):
+        item = await curriculum.fetch_remote_ccc_item(ccc_client, item_id.replace("CFItem-", ""))
+    if item is None:
+        return error_response(404, "Item not found")
+    return item
+
+
+@router.get("/data-status")
+def get_data_status():
+    """Version and rebuild timing of the loaded data snapshot"""
+    return curriculum.data_store.status()
+
+
+@router.get("/structure")
+def get_structure(request: Request):
+    curriculum_data = curriculum.load_curriculum_structure()
+    if not curriculum_data or "standards" not in curriculum_data or "lessons" not in curriculum_data:
+        return error_response(400, "Invalid curriculum data structure")
+    return cached_json_response(request, "structure", lambda snapshot: snapshot["structure"].to_dict())
+
+
+@router.get("/structure/overview")
+def get_structure_overview(request: Request):
+    """Collapsed graph: the standards only, to be expanded node by node"""
+    return cached_json_response(request, "structure:overview", lambda snapshot: snapshot["structure"].overview())
+
+
+@router.get("/structure/nodes/{node_id:path}")
+def get_structure_node(request: Request, node_id: str, limit: Optional[int] = None):
+    """A node's neighbours and the links to them (default limit 200)"""
+    neighbourhood = curriculum.load_structure().neighbourhood(node_id, limit)
+    if neighbourhood is None:
+        return error_response(404, "Node not found")
+    return json_response(request, dumps(neighbourhood))
+
+
+@router.get("/search")
+def search(q: str = "", type: Optional[str] = None, limit: int = 10):
+    """Typeahead search over lessons, standards, sample questions and CCC items"""
+    kinds = [kind for kind in (type or "").split(",") if kind] or None
+    return curriculum.search(q, limit, kinds)
+
+
+@router.get("/available-question-filters")
+def get_available_question_filters():
+    """Standards, lessons and difficulties that will actually return questions"""
+    try:
+        return curriculum.question_filters()
+    except FileNotFoundError as e:
+        return error_response(404, str(e))
+
+
+@router.get("/random-question")
+def get_random_question(
+    standard: Optional[str] = None,
+    lesson: Optional[str] = None,
+    difficulty: Optional[str] = None,  # Not used for filtering currently
+    n: Optional[int] = None
+):
+    """Get a random sample question matching the filters, or a list of up to n with ?n="""
+    try:
+        if n is not None:
+            question = curriculum.random_questions(n, standard, lesson)
+        else:
+            question = curriculum.random_question(standard, lesson)
+    except FileNotFoundError as e:
+        return error_response(404, str(e))
+    if not question:
+        return error_response(404, "No questions match the specified filters")
+    return question
+
+
+@router.post("/verify-question")
+async def verify_question(question: dict = Body(...), grader=Depends(get_grader)):
+    """Verify a question using the shared question grader."""
+    if not question:
+        return error_response(400, "No question data provided")
+    try:
+        return await grader.grade_question(question)
+    except Exception as e:
+        return error_response(500, f"Grading failed: {str(e)}")
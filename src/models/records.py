@@ -0,0 +1,296 @@
+"""
+Lightweight question records for bulk processing.
+
+The pydantic models in ``question`` validate every field and keep a dict per
+instance, which dominates the cost of pipelines that handle questions by
+the hundred thousand (CCC conversion, grading runs, generation). The records
+here carry the same fields in ``__slots__`` and do no validation: they hold
+data that was validated on the way in or produced by our own code, and are
+turned into the pydantic models only at the API boundary. ``to_model``
+validates the record's ``to_dict()``: pydantic's compiled validator builds
+the nested models about twice as fast as ``model_construct`` does field by
+field (benchmarks/bench_records.py). It is still some 15% slower than
+``Question.model_validate`` on a dict that already exists, so records pay
+off in memory and between pipeline stages, not at the boundary itself.
+``from_model`` shares field values (strings and lists) with the model
+instead of copying them, so neither side should mutate a list while the
+other is in use.
+
+``encode``/``decode`` (and ``write_records``/``iter_records`` for streams)
+turn records into nested tuples of primitives serialized with ``marshal``.
+It is a compact, fast format for spooling records between pipeline stages
+on the same Python version, not an interchange format.
+"""
+
+import marshal
+import struct
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional
+
+from src.models.question import Choice, Image, Question, Solution
+
+# Bumped whenever the tuple layout changes
+ENCODING_VERSION = 1
+
+_MAGIC = b'QR' + bytes([ENCODING_VERSION])
+_FRAME = struct.Struct('<I')
+# marshal format understood by every Python 3 release since 3.4
+_MARSHAL_VERSION = 4
+
+# Records per frame written by write_records
+FRAME_RECORDS = 10000
+
+
+class _Record:
+    """Field-wise equality and repr for the record classes."""
+
+    __slots__ = ()
+    FIELDS: tuple = ()
+
+    def __eq__(self, other: Any) -> bool:
+        return type(other) is type(self) and all(getattr(self, f) == getattr(other, f) for f in self.FIELDS)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({', '.join(f'{f}={getattr(self, f)!r}' for f in self.FIELDS)})"
+
+
+class ChoiceRecord(_Record):
+    FIELDS = ('text', 'is_correct', 'explanation')
+    __slots__ = FIELDS
+
+    def __init__(self, text: str, is_correct: bool, explanation: str = ''):
+        self.text = text
+        self.is_correct = is_correct
+        self.explanation = explanation
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'text': self.text, 'is_correct': self.is_correct, 'explanation': self.explanation}
+
+    def to_model(self) -> Choice:
+        return Choice.model_validate(self.to_dict())
+
+    @classmethod
+    def from_model(cls, choice: Choice) -> 'ChoiceRecord':
+        return cls(choice.text, choice.is_correct, choice.explanation)
+
+
+class ImageRecord(_Record):
+    FIELDS = ('url', 'caption', 'alt_text')
+    __slots__ = FIELDS
+
+    def __init__(self, url: str, caption: Optional[str] = None, alt_text: str = ''):
+        self.url = url
+        self.caption = caption
+        self.alt_text = alt_text
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'url': self.url, 'caption': self.caption, 'alt_text': self.alt_text}
+
+    def to_model(self) -> Image:
+        return Image.model_validate(self.to_dict())
+
+    @classmethod
+    def from_model(cls, image: Image) -> 'ImageRecord':
+        return cls(image.url, image.caption, image.alt_text)
+
+
+class SolutionRecord(_Record):
+    FIELDS = ('steps', 'explanation')
+    __slots__ = FIELDS
+
+    def __init__(self, steps: List[str], explanation: str = ''):
+        self.steps = steps
+        self.explanation = explanation
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'steps': self.steps, 'explanation': self.explanation}
+
+    def to_model(self) -> Solution:
+        return Solution.model_validate(self.to_dict())
+
+    @classmethod
+    def from_model(cls, solution: Solution) -> 'SolutionRecord':
+        return cls(solution.steps, solution.explanation)
+
+
+class QuestionRecord(_Record):
+    """A question with the fields of models.question.Question; interaction_type is its string value."""
+
+    FIELDS = (
+        'prompt', 'stimuli', 'images', 'interaction_type', 'choices', 'correct_answer', 'solution',
+        'grading_criteria', 'subject', 'grade', 'standard', 'lesson', 'difficulty'
+    )
+    __slots__ = FIELDS
+
+    def __init__(
+        self,
+        prompt: str,
+        interaction_type: str,
+        correct_answer: str,
+        solution: SolutionRecord,
+        choices: Optional[List[ChoiceRecord]] = None,
+        stimuli: Optional[str] = None,
+        images: Optional[List[ImageRecord]] = None,
+        grading_criteria: Optional[str] = None,
+        subject: Optional[str] = None,
+        grade: Optional[int] = None,
+        standard: Optional[str] = None,
+        lesson: Optional[str] = None,
+        difficulty: Optional[int] = None
+    ):
+        self.prompt = prompt
+        self.stimuli = stimuli
+        self.images = images
+        self.interaction_type = interaction_type
+        self.choices = choices
+        self.correct_answer = correct_answer
+        self.solution = solution
+        self.grading_criteria = grading_criteria
+        self.subject = subject
+        self.grade = grade
+        self.standard = standard
+        self.lesson = lesson
+        self.difficulty = difficulty
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The record as Question.model_dump() would return it."""
+        # Spelled out rather than walking FIELDS: to_model and the exporters call this per question
+        return {
+            'prompt': self.prompt,
+            'stimuli': self.stimuli,
+            'images': [image.to_dict() for image in self.images] if self.images is not None else None,
+            'interaction_type': self.interaction_type,
+            'choices': [choice.to_dict() for choice in self.choices] if self.choices is not None else None,
+            'correct_answer': self.correct_answer,
+            'solution': self.solution.to_dict(),
+            'grading_criteria': self.grading_criteria,
+            'subject': self.subject,
+            'grade': self.grade,
+            'standard': self.standard,
+            'lesson': self.lesson,
+            'difficulty': self.difficulty
+        }
+
+    def to_model(self) -> Question:
+        """The pydantic Question, validated from to_dict()."""
+        return Question.model_validate(self.to_dict())
+
+    @classmethod
+    def from_model(cls, question: Question) -> 'QuestionRecord':
+        interaction_type = question.interaction_type
+        return cls(
+            question.prompt,
+            getattr(interaction_type, 'value', interaction_type),
+            question.correct_answer,
+            SolutionRecord.from_model(question.solution),
+            [ChoiceRecord.from_model(choice) for choice in question.choices] if question.choices is not None else None,
+            question.stimuli,
+            [ImageRecord.from_model(image) for image in question.images] if question.images is not None else None,
+            question.grading_criteria,
+            question.subject,
+            question.grade,
+            question.standard,
+            question.lesson,
+            question.difficulty
+        )
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'QuestionRecord':
+        """A record from Question.model_dump()-shaped data (not validated)."""
+        choices = data.get('choices')
+        images = data.get('images')
+        solution = data['solution']
+        interaction_type = data['interaction_type']
+        return cls(
+            data['prompt'],
+            getattr(interaction_type, 'value', interaction_type),
+            data['correct_answer'],
+            SolutionRecord(solution['steps'], solution['explanation']),
+            [ChoiceRecord(c['text'], c['is_correct'], c['explanation']) for c in choices] if choices is not None else None,
+            data.get('stimuli'),
+            [ImageRecord(i['url'], i.get('caption'), i['alt_text']) for i in images] if images is not None else None,
+            data.get('grading_criteria'),
+            data.get('subject'),
+            data.get('grade'),
+            data.get('standard'),
+            data.get('lesson'),
+            data.get('difficulty')
+        )
+
+    def to_tuple(self) -> tuple:
+        """The record as nested tuples of primitives, the layout encode() writes."""
+        images = self.images
+        choices = self.choices
+        solution = self.solution
+        return (
+            self.prompt, self.stimuli,
+            [(i.url, i.caption, i.alt_text) for i in images] if images is not None else None,
+            self.interaction_type,
+            [(c.text, c.is_correct, c.explanation) for c in choices] if choices is not None else None,
+            self.correct_answer, solution.steps, solution.explanation, self.grading_criteria,
+            self.subject, self.grade, self.standard, self.lesson, self.difficulty
+        )
+
+    @classmethod
+    def from_tuple(cls, values: tuple) -> 'QuestionRecord':
+        (prompt, stimuli, images, interaction_type, choices, correct_answer, steps, explanation,
+         grading_criteria, subject, grade, standard, lesson, difficulty) = values
+        return cls(
+            prompt, interaction_type, correct_answer, SolutionRecord(steps, explanation),
+            [ChoiceRecord(*c) for c in choices] if choices is not None else None,
+            stimuli,
+            [ImageRecord(*i) for i in images] if images is not None else None,
+            grading_criteria, subject, grade, standard, lesson, difficulty
+        )
+
+
+def encode(records: Iterable[QuestionRecord]) -> bytes:
+    """Records in the binary record format."""
+    return _MAGIC + marshal.dumps([record.to_tuple() for record in records], _MARSHAL_VERSION)
+
+
+def decode(data: bytes) -> List[QuestionRecord]:
+    """The records of encode()'s output; raises ValueError for anything else."""
+    if data[:len(_MAGIC)] != _MAGIC:
+        raise ValueError("Not question records of this encoding version")
+    try:
+        values = marshal.loads(memoryview(data)[len(_MAGIC):])
+    except (EOFError, TypeError) as e:
+        raise ValueError(f"Corrupt question records: {e}")
+    from_tuple = QuestionRecord.from_tuple
+    return [from_tuple(value) for value in values]
+
+
+def write_records(f: BinaryIO, records: Iterable[QuestionRecord], frame_records: int = FRAME_RECORDS) -> int:
+    """Write records to a binary file as length-prefixed frames; returns how many were written."""
+    count = 0
+    batch: List[QuestionRecord] = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= frame_records:
+            count += _write_frame(f, batch)
+            batch = []
+    if batch:
+        count += _write_frame(f, batch)
+    return count
+
+
+def _write_frame(f: BinaryIO, batch: List[QuestionRecord]) -> int:
+    frame = encode(batch)
+    f.write(_FRAME.pack(len(frame)))
+    f.write(frame)
+    return len(batch)
+
+
+def iter_records(f: BinaryIO) -> Iterator[QuestionRecord]:
+    """The records written by write_records, one frame in memory at a time."""
+    while True:
+        header = f.read(_FRAME.size)
+        if not header:
+            return
+        if len(header) < _FRAME.size:
+            raise ValueError("Truncated question record frame")
+        (size,) = _FRAME.unpack(header)
+        frame = f.read(size)
+        if len(frame) < size:
+            raise ValueError("Truncated question record frame")
+        yield from decode(frame)
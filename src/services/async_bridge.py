@@ -0,0 +1,171 @@
+"""
+Run coroutines from synchronous code (the Flask visualizer) on one
+long-lived event loop.
+
+The loop runs on a daemon thread and owns shared async resources such as
+the question grader and its HTTP clients, so sync routes no longer build a
+loop and a client per request. ``run`` waits for a result with a timeout
+and cancels the coroutine when it expires; ``JobRegistry`` offers a
+submit/poll variant that does not hold the calling thread at all.
+"""
+
+import asyncio
+import concurrent.futures
+import logging
+import threading
+import time
+import uuid
+from typing import Any, Callable, Coroutine, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncBridge:
+    """A background event loop that sync callers can submit coroutines to."""
+
+    def __init__(self, name: str = "async-bridge"):
+        self.name = name
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._resources: Dict[str, Any] = {}
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """The bridge's loop, started on first use."""
+        loop = self._loop
+        if loop is None or not self._thread.is_alive():
+            with self._lock:
+                if self._loop is None or not self._thread.is_alive():
+                    self._start()
+                loop = self._loop
+        return loop
+
+    def _start(self) -> None:
+        loop = asyncio.new_event_loop()
+        ready = threading.Event()
+
+        def run() -> None:
+            asyncio.set_event_loop(loop)
+            loop.call_soon(ready.set)
+            loop.run_forever()
+
+        self._thread = threading.Thread(target=run, name=self.name, daemon=True)
+        self._thread.start()
+        ready.wait()
+        self._loop = loop
+        # Resources bound to a previous loop cannot be reused
+        self._resources = {}
+
+    def shared(self, name: str, factory: Callable[[], Any]) -> Any:
+        """A resource built once by factory() and reused by every coroutine on this loop."""
+        self.loop
+        with self._lock:
+            if name not in self._resources:
+                self._resources[name] = factory()
+            return self._resources[name]
+
+    def submit(self, coro: Coroutine, timeout: Optional[float] = None) -> concurrent.futures.Future:
+        """Schedule coro on the loop; with timeout it is cancelled once that many seconds pass."""
+        if timeout is not None:
+            coro = asyncio.wait_for(coro, timeout)
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro: Coroutine, timeout: Optional[float] = None) -> Any:
+        """
+        Run coro on the loop and wait for its result. Raises TimeoutError
+        (after cancelling coro) when it takes longer than timeout seconds.
+        """
+        future = self.submit(coro)
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise TimeoutError(f"Timed out after {timeout}s")
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Close shared resources that have an aclose() and stop the loop."""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            resources, self._resources = self._resources, {}
+            self._loop = None
+        if loop is None or not thread.is_alive():
+            return
+        for name, resource in resources.items():
+            if hasattr(resource, "aclose"):
+                try:
+                    asyncio.run_coroutine_threadsafe(resource.aclose(), loop).result(timeout)
+                except Exception as e:
+                    logger.error(f"Error closing {name}: {str(e)}")
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout)
+
+
+class JobLimitError(RuntimeError):
+    """Too many jobs are still running to accept another one."""
+    pass
+
+
+class JobRegistry:
+    """
+    Submit/poll jobs on an AsyncBridge.
+
+    Finished jobs are kept for ``ttl`` seconds so clients can collect the
+    result; at most ``max_pending`` jobs may run at once.
+    """
+
+    def __init__(self, bridge: AsyncBridge, ttl: float = 600.0, max_pending: int = 256):
+        self.bridge = bridge
+        self.ttl = ttl
+        self.max_pending = max_pending
+        self._jobs: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def _evict(self) -> None:
+        cutoff = time.time() - self.ttl
+        for job_id in [job_id for job_id, job in self._jobs.items() if (job["finished_at"] or time.time()) < cutoff]:
+            del self._jobs[job_id]
+
+    def submit(self, coro: Coroutine, timeout: Optional[float] = None) -> str:
+        """Start coro and return the id to poll it with."""
+        with self._lock:
+            self._evict()
+            pending = sum(1 for job in self._jobs.values() if not job["future"].done())
+            if pending >= self.max_pending:
+                coro.close()
+                raise JobLimitError(f"{pending} jobs are still running")
+            job_id = uuid.uuid4().hex
+            job = {"future": self.bridge.submit(coro, timeout), "created_at": time.time(), "finished_at": None}
+            self._jobs[job_id] = job
+
+        def finished(_future) -> None:
+            job["finished_at"] = time.time()
+
+        job["future"].add_done_callback(finished)
+        return job_id
+
+    def status(self, job_id: str) -> Optional[dict]:
+        """The job's state and, once done, its result or error; None if unknown."""
+        job = self._jobs.get(job_id)
+        if job is None:
+            return None
+        future = job["future"]
+        status = {"id": job_id, "created_at": job["created_at"]}
+        if future.cancelled():
+            status["status"] = "cancelled"
+        elif not future.done():
+            status["status"] = "running"
+        elif future.exception() is not None:
+            error = future.exception()
+            status["status"] = "failed"
+            status["error"] = "Timed out" if isinstance(error, (asyncio.TimeoutError, TimeoutError)) else str(error)
+        else:
+            status["status"] = "done"
+            status["result"] = future.result()
+        status["elapsed"] = (job["finished_at"] or time.time()) - job["created_at"]
+        return status
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a running job. Returns False if it is unknown or already finished."""
+        job = self._jobs.get(job_id)
+        return job is not None and job["future"].cancel()
@@ -0,0 +1,373 @@
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, Union
+
+# Default location of the shared tier; every worker on a host opens the same file
+DEFAULT_CACHE_PATH = os.path.join(tempfile.gettempdir(), "incept-cache.sqlite3")
+
+# How long a worker may hold a refresh lock before others assume it died
+DEFAULT_LOCK_TTL = 30.0
+
+# Expired entries are kept this long so waiting workers can serve stale values
+DEFAULT_STALE_TTL = 3600.0
+
+# Writes between purges of entries that are past their stale window
+DEFAULT_PURGE_EVERY = 1000
+
+# (value, expires_at) as stored by every backend
+CacheEntry = Tuple[Any, float]
+
+# A fixed TTL, or a function of the value (e.g. shorter TTLs for misses)
+TTL = Union[float, Callable[[Any], float]]
+
+
+def resolve_ttl(ttl: TTL, value: Any) -> float:
+    return ttl(value) if callable(ttl) else ttl
+
+
+def make_key(*parts: Any) -> str:
+    """Build a stable cache key from JSON-serializable parts."""
+    raw = json.dumps(parts, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class CacheBackend:
+    """Minimal interface shared by the cache tiers."""
+
+    def get_entry(self, key: str) -> Optional[CacheEntry]:
+        """Return ``(value, expires_at)`` even if expired, or None if absent."""
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return a fresh value for key, or default."""
+        entry = self.get_entry(key)
+        if entry is None or entry[1] <= time.time():
+            return default
+        return entry[0]
+
+
+class LRUCache(CacheBackend):
+    """Thread-safe in-process LRU with per-entry expiry."""
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_entry(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                self._data.move_to_end(key)
+            return entry
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        with self._lock:
+            self._data[key] = (value, time.time() + ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def set_entry(self, key: str, entry: CacheEntry) -> None:
+        """Store an entry with an absolute expiry (used when promoting from the shared tier)."""
+        with self._lock:
+            self._data[key] = entry
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SQLiteCache(CacheBackend):
+    """
+    Host-wide cache tier backed by an SQLite file in WAL mode.
+
+    Values are stored as JSON so any worker process can read them. The same
+    file also holds short-lived refresh locks used for stampede protection.
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_CACHE_PATH,
+        stale_ttl: float = DEFAULT_STALE_TTL,
+        purge_every: int = DEFAULT_PURGE_EVERY
+    ):
+        self.path = path
+        self.stale_ttl = stale_ttl
+        self.purge_every = purge_every
+        self._writes = 0
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = self._conn()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS locks ("
+            "key TEXT PRIMARY KEY, owner TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+
+    def _conn(self) -> sqlite3.Connection:
+        # sqlite3 connections must not be shared across threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get_entry(self, key: str) -> Optional[CacheEntry]:
+        row = self._conn().execute(
+            "SELECT value, expires_at FROM cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1]
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        self._conn().execute(
+            "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, json.dumps(value), time.time() + ttl),
+        )
+        # Unsynchronized on purpose: an extra or skipped purge is harmless
+        self._writes += 1
+        if self.purge_every and self._writes % self.purge_every == 0:
+            self.purge()
+
+    def delete(self, key: str) -> None:
+        self._conn().execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        conn = self._conn()
+        conn.execute("DELETE FROM cache")
+        conn.execute("DELETE FROM locks")
+
+    def purge(self) -> int:
+        """
+        Drop entries that have been expired for longer than stale_ttl, and
+        dead locks. Runs every purge_every writes and when get_cache first
+        opens the file.
+        """
+        now = time.time()
+        conn = self._conn()
+        cursor = conn.execute("DELETE FROM cache WHERE expires_at < ?", (now - self.stale_ttl,))
+        conn.execute("DELETE FROM locks WHERE expires_at < ?", (now,))
+        return cursor.rowcount
+
+    def acquire_lock(self, key: str, owner: str, ttl: float = DEFAULT_LOCK_TTL) -> bool:
+        """Try to become the only worker refreshing key. Dead holders expire after ttl."""
+        now = time.time()
+        conn = self._conn()
+        conn.execute("DELETE FROM locks WHERE key = ? AND expires_at < ?", (key, now))
+        cursor = conn.execute(
+            "INSERT OR IGNORE INTO locks (key, owner, expires_at) VALUES (?, ?, ?)",
+            (key, owner, now + ttl),
+        )
+        return cursor.rowcount == 1
+
+    def release_lock(self, key: str, owner: str) -> None:
+        self._conn().execute("DELETE FROM locks WHERE key = ? AND owner = ?", (key, owner))
+
+    def is_locked(self, key: str) -> bool:
+        row = self._conn().execute(
+            "SELECT 1 FROM locks WHERE key = ? AND expires_at >= ?", (key, time.time())
+        ).fetchone()
+        return row is not None
+
+
+class TieredCache:
+    """
+    In-process LRU in front of a shared SQLite tier.
+
+    Reads hit the LRU first and fall back to the shared tier, promoting what
+    they find. ``get_or_set``/``aget_or_set`` add stampede protection: when a
+    key is missing or expired only the worker holding the refresh lock calls
+    the factory; the others serve the stale value if there is one, or wait for
+    the refreshed value to land in the shared tier.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        shared: Optional[SQLiteCache] = None,
+        local_maxsize: int = 1024,
+        lock_ttl: float = DEFAULT_LOCK_TTL,
+        poll_interval: float = 0.05,
+    ):
+        self.namespace = namespace
+        self.local = LRUCache(local_maxsize)
+        self.shared = shared
+        self.lock_ttl = lock_ttl
+        self.poll_interval = poll_interval
+
+    def _key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    def _get_entry(self, full_key: str) -> Optional[CacheEntry]:
+        entry = self.local.get_entry(full_key)
+        if entry is not None and entry[1] > time.time():
+            return entry
+        if self.shared is not None:
+            shared_entry = self.shared.get_entry(full_key)
+            if shared_entry is not None:
+                self.local.set_entry(full_key, shared_entry)
+                return shared_entry
+        return entry
+
+    def get(self, key: str, default: Any = None) -> Any:
+        entry = self._get_entry(self._key(key))
+        if entry is None or entry[1] <= time.time():
+            return default
+        return entry[0]
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        full_key = self._key(key)
+        self.local.set(full_key, value, ttl)
+        if self.shared is not None:
+            self.shared.set(full_key, value, ttl)
+
+    def delete(self, key: str) -> None:
+        full_key = self._key(key)
+        self.local.delete(full_key)
+        if self.shared is not None:
+            self.shared.delete(full_key)
+
+    def _try_lock(self, full_key: str, owner: str) -> bool:
+        if self.shared is None:
+            return True
+        return self.shared.acquire_lock(full_key, owner, self.lock_ttl)
+
+    def _release(self, full_key: str, owner: str) -> None:
+        if self.shared is not None:
+            self.shared.release_lock(full_key, owner)
+
+    def _fresh_from_shared(self, full_key: str) -> Optional[CacheEntry]:
+        if self.shared is None:
+            return None
+        entry = self.shared.get_entry(full_key)
+        if entry is not None and entry[1] > time.time():
+            self.local.set_entry(full_key, entry)
+            return entry
+        return None
+
+    def get_or_set(self, key: str, factory: Callable[[], Any], ttl: TTL) -> Any:
+        """Return the cached value for key, computing it with factory at most once per host."""
+        full_key = self._key(key)
+        entry = self._get_entry(full_key)
+        if entry is not None and entry[1] > time.time():
+            return entry[0]
+
+        owner = uuid.uuid4().hex
+        deadline = time.time() + self.lock_ttl
+        while True:
+            if self._try_lock(full_key, owner):
+                try:
+                    # Another worker may have refreshed it just before we got the lock
+                    fresh = self._fresh_from_shared(full_key)
+                    if fresh is not None:
+                        return fresh[0]
+                    value = factory()
+                    self.set(key, value, resolve_ttl(ttl, value))
+                    return value
+                finally:
+                    self._release(full_key, owner)
+            if entry is not None:
+                # Someone else is refreshing; serve the stale value meanwhile
+                return entry[0]
+            if time.time() >= deadline:
+                # Give up on the holder and compute locally
+                value = factory()
+                self.set(key, value, resolve_ttl(ttl, value))
+                return value
+            time.sleep(self.poll_interval)
+            fresh = self._fresh_from_shared(full_key)
+            if fresh is not None:
+                return fresh[0]
+
+    async def aget_or_set(self, key: str, factory: Callable[[], Awaitable[Any]], ttl: TTL) -> Any:
+        """Async variant of get_or_set for coroutine factories."""
+        # Imported here so sync-only users (CLI jobs) do not pay for asyncio
+        import asyncio
+
+        full_key = self._key(key)
+        entry = self._get_entry(full_key)
+        if entry is not None and entry[1] > time.time():
+            return entry[0]
+
+        owner = uuid.uuid4().hex
+        deadline = time.time() + self.lock_ttl
+        while True:
+            if self._try_lock(full_key, owner):
+                try:
+                    fresh = self._fresh_from_shared(full_key)
+                    if fresh is not None:
+                        return fresh[0]
+                    value = await factory()
+                    self.set(key, value, resolve_ttl(ttl, value))
+                    return value
+                finally:
+                    self._release(full_key, owner)
+            if entry is not None:
+                return entry[0]
+            if time.time() >= deadline:
+                value = await factory()
+                self.set(key, value, resolve_ttl(ttl, value))
+                return value
+            await asyncio.sleep(self.poll_interval)
+            fresh = self._fresh_from_shared(full_key)
+            if fresh is not None:
+                return fresh[0]
+
+
+_shared_tiers: Dict[str, SQLiteCache] = {}
+_shared_lock = threading.Lock()
+
+
+def get_cache(namespace: str, local_maxsize: int = 1024) -> TieredCache:
+    """
+    Build a TieredCache for namespace using the host-wide shared tier.
+
+    ``INCEPT_CACHE_PATH`` overrides the SQLite file location and
+    ``INCEPT_CACHE_BACKEND=memory`` disables the shared tier entirely.
+    """
+    if os.getenv("INCEPT_CACHE_BACKEND", "tiered") == "memory":
+        return TieredCache(namespace, shared=None, local_maxsize=local_maxsize)
+
+    path = os.getenv("INCEPT_CACHE_PATH", DEFAULT_CACHE_PATH)
+    with _shared_lock:
+        shared = _shared_tiers.get(path)
+        if shared is None:
+            shared = SQLiteCache(path)
+            shared.purge()
+            _shared_tiers[path] = shared
+    return TieredCache(namespace, shared=shared, local_maxsize=local_maxsize)
@@ -1,20 +1,114 @@
 import os
 from typing import List, Optional, Dict, Any
-import httpx
-from dotenv import load_dotenv
+import asyncio
 import json
+import logging
 
 from src.models.question import Question, InteractionType, Choice, Solution
+from src.services.cache import TieredCache, get_cache, make_key
 
-load_dotenv()
+# CCC standards and content change rarely; cache them host-wide for an hour
+CCC_CACHE_TTL = 3600.0
+
+# Empty results and upstream failures are cached too, for less time, so
+# repeated misses do not hit the API on every request
+CCC_NEGATIVE_TTL = 300.0
+CCC_ERROR_TTL = 30.0
+
+# Connections kept open to the CCC API by one client
+CCC_MAX_CONNECTIONS = 20
+
+# Seconds to wait for a replaced client to close on its own loop
+CCC_CLOSE_TIMEOUT = 5.0
+
+# Standards searched when tagging; for now all 8th grade physics standards
+TAG_CORPUS_STANDARDS = [
+    "MS-PS2-1",  # Newton's Laws
+    "MS-PS2-2",  # Forces and Motion
+    "MS-PS2-3",  # Factors Affecting Forces
+    "MS-PS2-4",  # Gravitational and Magnetic Forces
+    "MS-PS2-5"   # Fields
+]
+
+logger = logging.getLogger(__name__)
 
 class CCCError(Exception):
     """Custom error for CCC API issues"""
     pass
 
+def _ttl_for(value: Any) -> float:
+    if isinstance(value, dict) and "error" in value:
+        return CCC_ERROR_TTL
+    return CCC_CACHE_TTL if value else CCC_NEGATIVE_TTL
+
 class CCCClient:
-    def __init__(self):
+    def __init__(self, cache: Optional[TieredCache] = None):
         self.base_url = "https://commoncrawl.alpha1edtech.com"
+        self.cache = cache if cache is not None else get_cache("ccc")
+        self._http = None
+        self._http_loop = None
+        self._closing = None
+
+    async def _client(self):
+        """
+        Pooled HTTP client for the running event loop (clients cannot cross
+        loops). A client left on another loop is closed there, and the close
+        awaited, before the replacement is built.
+        """
+        import httpx
+
+        loop = asyncio.get_running_loop()
+        if self._http is not None and self._http_loop is not loop:
+            old, old_loop = self._http, self._http_loop
+            self._http = self._http_loop = None
+            if old_loop.is_running():
+                self._closing = asyncio.run_coroutine_threadsafe(old.aclose(), old_loop)
+        closing = self._closing
+        if closing is not None:
+            # asyncio.wait, unlike wait_for, does not cancel the close on timeout
+            done, _ = await asyncio.wait({asyncio.wrap_future(closing)}, timeout=CCC_CLOSE_TIMEOUT)
+            if not done or closing.exception() is not None:
+                logger.warning("Replaced CCC HTTP client did not close cleanly")
+            if self._closing is closing:
+                self._closing = None
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=10.0,
+                limits=httpx.Limits(max_connections=CCC_MAX_CONNECTIONS)
+            )
+            self._http_loop = loop
+        return self._http
+
+    async def aclose(self) -> None:
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+            self._http_loop = None
+
+    async def _cached(self, key: str, fetch) -> Any:
+        """
+        fetch() through the cache. Empty results and CCCErrors are cached with
+        shorter TTLs; a cached error is raised again.
+        """
+        async def fetch_or_error():
+            try:
+                return await fetch()
+            except CCCError as e:
+                return {"error": str(e)}
+
+        value = await self.cache.aget_or_set(key, fetch_or_error, _ttl_for)
+        if isinstance(value, dict) and "error" in value:
+            raise CCCError(value["error"])
+        return value
+
+    @property
+    def corpus_version(self) -> str:
+        """
+        Version of the corpus tagging searches. Changes when the searched
+        standards change or when CCC_CORPUS_VERSION is bumped after a CCC refresh.
+        """
+        return make_key(TAG_CORPUS_STANDARDS, os.getenv("CCC_CORPUS_VERSION", ""))[:16]
 
     async def get_standard(self, standard_code: str) -> Dict[str, Any]:
         """
@@ -28,30 +122,35 @@ class CCCClient:
             "fullStatement": "Use spelling patterns and generalizations..."
         }
         """
-        print(f"Attempting to fetch standard: {standard_code}")
+        standards = await self.search_standards(standard_code)
+        if not standards:
+            raise CCCError(f"No standard found for code: {standard_code}")
+        return standards[0]
+
+    async def search_standards(self, keyword: str) -> List[Dict[str, Any]]:
+        """Fetch every standard matching keyword; an empty list when none match."""
+        return await self._cached(make_key("standards", keyword), lambda: self._fetch_standards(keyword))
+
+    async def _fetch_standards(self, keyword: str) -> List[Dict[str, Any]]:
+        import httpx
+
+        print(f"Attempting to fetch standard: {keyword}")
         print(f"Using API URL: {self.base_url}")
         
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(
-                    f"{self.base_url}/standards/items",
-                    params={"keyword": standard_code}
-                )
-                
-                print(f"API Response Status: {response.status_code}")
-                print(f"API Response: {response.text}")
-                
-                if response.status_code != 200:
-                    raise CCCError(f"Failed to fetch standard: {response.text}")
-                
-                standards = response.json()
-                if not standards:
-                    raise CCCError(f"No standard found for code: {standard_code}")
-                    
-                return standards[0]
-            except httpx.RequestError as e:
-                print(f"HTTP Request failed: {str(e)}")
-                raise CCCError(f"Failed to connect to CCC API: {str(e)}")
+        try:
+            http = await self._client()
+            response = await http.get("/standards/items", params={"keyword": keyword})
+            
+            print(f"API Response Status: {response.status_code}")
+            print(f"API Response: {response.text}")
+            
+            if response.status_code != 200:
+                raise CCCError(f"Failed to fetch standard: {response.text}")
+            
+            return response.json()
+        except httpx.RequestError as e:
+            print(f"HTTP Request failed: {str(e)}")
+            raise CCCError(f"Failed to connect to CCC API: {str(e)}")
 
     async def get_content_for_standard(self, cf_item_id: str) -> List[Dict[str, Any]]:
         """
@@ -71,16 +170,21 @@ class CCCClient:
             }
         ]
         """
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.base_url}/sources/content",
-                params={"CFItemId": cf_item_id}
-            )
+        return await self._cached(make_key("content", cf_item_id), lambda: self._fetch_content_for_standard(cf_item_id))
+
+    async def _fetch_content_for_standard(self, cf_item_id: str) -> List[Dict[str, Any]]:
+        import httpx
+
+        try:
+            http = await self._client()
+            response = await http.get("/sources/content", params={"CFItemId": cf_item_id})
+        except httpx.RequestError as e:
+            raise CCCError(f"Failed to connect to CCC API: {str(e)}")
+        
+        if response.status_code != 200:
+            raise CCCError(f"Failed to fetch content: {response.text}")
             
-            if response.status_code != 200:
-                raise CCCError(f"Failed to fetch content: {response.text}")
-                
-            return response.json()
+        return response.json()
 
     async def get_questions_for_standard(self, standard_code: str) -> List[Question]:
         """
@@ -109,7 +213,8 @@ class CCCClient:
                 continue
                 
             try:
-                content = item["content"]
+                # Copy so the mapping below never mutates cached responses
+                content = dict(item["content"])
                 
                 # Print raw content for debugging
                 print(f"\nRaw question content #{i}:")
@@ -182,17 +287,8 @@ class CCCClient:
         Returns:
             List of similar questions
         """
-        # For now, we'll search across all 8th grade physics standards
-        standards = [
-            "MS-PS2-1",  # Newton's Laws
-            "MS-PS2-2",  # Forces and Motion
-            "MS-PS2-3",  # Factors Affecting Forces
-            "MS-PS2-4",  # Gravitational and Magnetic Forces
-            "MS-PS2-5"   # Fields
-        ]
-        
         all_questions = []
-        for standard in standards:
+        for standard in TAG_CORPUS_STANDARDS:
             try:
                 questions = await self.get_questions_for_standard(standard)
                 all_questions.extend(questions)
@@ -0,0 +1,190 @@
+"""
+CCC items as typed, indexed SQLite rows.
+
+The ``ccc_items`` table keeps each item's filterable fields in their own
+columns next to the encoded record. It is part of the compiled snapshot and
+can also be written on its own (``ccc.py --sqlite``), so listings filtered
+by standard, lesson, content type, difficulty or interaction type are
+indexed queries read a page at a time with LIMIT/OFFSET instead of scans of
+the whole corpus.
+"""
+
+import json
+import os
+import sqlite3
+from collections.abc import Sequence
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from src.utils.serialization import dumps
+
+CCC_ITEMS_TABLE = """
+CREATE TABLE ccc_items (
+    ord INTEGER PRIMARY KEY, id TEXT NOT NULL, standard_code TEXT, lesson TEXT, content_type TEXT,
+    difficulty TEXT, interaction_type TEXT, grade TEXT, subject TEXT, record BLOB NOT NULL
+);
+"""
+
+CCC_ITEMS_INDEXES = """
+CREATE INDEX ccc_items_id ON ccc_items (id);
+CREATE INDEX ccc_items_standard ON ccc_items (standard_code);
+CREATE INDEX ccc_items_lesson ON ccc_items (lesson);
+CREATE INDEX ccc_items_content_type ON ccc_items (content_type);
+CREATE INDEX ccc_items_difficulty ON ccc_items (difficulty);
+CREATE INDEX ccc_items_interaction_type ON ccc_items (interaction_type);
+"""
+
+INSERT_ITEM = "INSERT INTO ccc_items VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+
+# Columns items can be filtered on
+FILTER_COLUMNS = ('standard_code', 'lesson', 'content_type', 'difficulty', 'interaction_type')
+
+# Items fetched per query when iterating a whole result
+SCAN_BATCH = 2000
+
+
+def ccc_item_standard(item):
+    """Standard code of a CCC item, whichever field it is stored under"""
+    return item.get('standard') or item.get('standard_code') or item.get('CFItemId') or item.get('humanCodingScheme')
+
+
+def ccc_item_lesson(item):
+    """Lesson reference of a CCC item (local items keep it under lesson_id)"""
+    lesson = item.get('lesson')
+    if lesson is None:
+        lesson = item.get('lesson_id')
+    return '' if lesson is None else str(lesson)
+
+
+def ccc_item_grade(item):
+    """Grade of a CCC item as a string, or None (local items keep it under 'content')"""
+    grade = item.get('grade')
+    raw = item.get('content')
+    if grade is None and isinstance(raw, dict):
+        grade = raw.get('grade')
+    return str(grade) if grade not in (None, '') else None
+
+
+def item_columns(item: Dict[str, Any]) -> Dict[str, Optional[str]]:
+    """
+    The column values of an item, either as converted from the export or as
+    loaded by the curriculum service (which keeps the converted item under
+    'content'). Empty values are None.
+    """
+    raw = item.get('content')
+    if not isinstance(raw, dict):
+        raw = item
+    subject = raw.get('subject')
+    return {
+        'standard_code': ccc_item_standard(item) or None,
+        'lesson': ccc_item_lesson(item) or None,
+        'content_type': raw.get('content_type') or item.get('type') or None,
+        'difficulty': raw.get('difficulty') or None,
+        'interaction_type': raw.get('interaction_type') or None,
+        'grade': ccc_item_grade(item),
+        'subject': json.dumps(subject, ensure_ascii=False) if subject not in (None, '', []) else None
+    }
+
+
+def item_row(ord_: int, item: Dict[str, Any]) -> tuple:
+    columns = item_columns(item)
+    return (
+        ord_, str(item.get('id')), columns['standard_code'], columns['lesson'], columns['content_type'],
+        columns['difficulty'], columns['interaction_type'], columns['grade'], columns['subject'], dumps(item)
+    )
+
+
+def check_filters(filters: Dict[str, Any]) -> Dict[str, str]:
+    """filters without unset values; raises ValueError for unknown columns."""
+    unknown = set(filters) - set(FILTER_COLUMNS)
+    if unknown:
+        raise ValueError(f"Cannot filter CCC items on {', '.join(sorted(unknown))}")
+    return {column: str(value) for column, value in filters.items() if value not in (None, '')}
+
+
+def item_matches(item: Dict[str, Any], filters: Dict[str, str]) -> bool:
+    """Whether an in-memory item passes filters, as the SQL query would decide."""
+    if not filters:
+        return True
+    columns = item_columns(item)
+    return all(columns[column] == value for column, value in filters.items())
+
+
+class ItemQuery(Sequence):
+    """
+    The CCC items matching filters, in file order, as a read-only list whose
+    slices are LIMIT/OFFSET queries. query(sql, params) runs against a
+    database with the ccc_items table; decode turns a record into a dict.
+    """
+
+    def __init__(self, query: Callable[..., List[tuple]], decode: Callable[[bytes], dict], filters: Dict[str, Any]):
+        self.query = query
+        self.decode = decode
+        self.filters = check_filters(filters)
+        self.where = " AND ".join(f"{column} = ?" for column in self.filters)
+        self.where = f"WHERE {self.where}" if self.where else ""
+        self.params = tuple(self.filters.values())
+        self._length: Optional[int] = None
+
+    def __len__(self) -> int:
+        if self._length is None:
+            self._length = self.query(f"SELECT COUNT(*) FROM ccc_items {self.where}", self.params)[0][0]
+        return self._length
+
+    def page(self, offset: int = 0, limit: int = -1) -> List[dict]:
+        rows = self.query(
+            f"SELECT record FROM ccc_items {self.where} ORDER BY ord LIMIT ? OFFSET ?", self.params + (limit, offset)
+        )
+        return [self.decode(row[0]) for row in rows]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return [self[i] for i in range(start, stop, step)]
+            return self.page(start, max(0, stop - start))
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return self.page(index, 1)[0]
+
+    def __iter__(self) -> Iterator[dict]:
+        offset = 0
+        while True:
+            batch = self.page(offset, SCAN_BATCH)
+            yield from batch
+            if len(batch) < SCAN_BATCH:
+                return
+            offset += SCAN_BATCH
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, (list, ItemQuery)) and len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+
+def write_ccc_database(path: str, items: Iterable[Dict[str, Any]]) -> int:
+    """
+    Write items to a standalone SQLite database at path (replaced
+    atomically); returns the number of items written.
+    """
+    partial = f"{path}.partial"
+    if os.path.exists(partial):
+        os.remove(partial)
+    conn = sqlite3.connect(partial, isolation_level=None)
+    try:
+        conn.execute("PRAGMA journal_mode=OFF")
+        conn.execute("PRAGMA synchronous=OFF")
+        conn.executescript(CCC_ITEMS_TABLE)
+        conn.execute("BEGIN")
+        count = 0
+        for count, item in enumerate(items, 1):
+            conn.execute(INSERT_ITEM, item_row(count - 1, item))
+        conn.execute("COMMIT")
+        conn.executescript(CCC_ITEMS_INDEXES)
+        conn.execute("ANALYZE")
+    except BaseException:
+        conn.close()
+        os.remove(partial)
+        raise
+    conn.close()
+    os.replace(partial, path)
+    return count
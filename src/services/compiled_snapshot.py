@@ -0,0 +1,390 @@
+"""
+Compiled data snapshot: the curriculum, CCC items and the indexes derived
+from them in one read-only SQLite file.
+
+The data build writes it next to the JSON files. Workers open it instead of
+parsing the JSON and rebuilding joins and the graph layout: lookups become
+indexed queries, records are decoded only when a request needs them, and
+the file is memory-mapped so every process on a host shares its pages
+through the OS page cache. Responses that are always served whole (the
+standards and lesson lists, the structure graph) are stored pre-encoded.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from src.services.ccc_store import CCC_ITEMS_INDEXES, CCC_ITEMS_TABLE, INSERT_ITEM, ItemQuery, item_row
+from src.services.curriculum_store import PARTITION_CACHE_BYTES, LessonList, PartitionedLessons
+from src.services.structure import DEFAULT_NEIGHBOUR_LIMIT
+from src.utils.serialization import dumps, loads
+
+logger = logging.getLogger(__name__)
+
+# Bumped whenever the schema changes; files of another version are ignored
+FORMAT_VERSION = 4
+
+# Bytes of the file mapped into memory by each reader
+MMAP_SIZE = 1 << 30
+
+SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE standards (ord INTEGER PRIMARY KEY, code TEXT, record BLOB NOT NULL);
+CREATE TABLE partitions (
+    id INTEGER PRIMARY KEY, grade TEXT, subject TEXT, lessons INTEGER NOT NULL, bytes INTEGER NOT NULL
+);
+CREATE TABLE lessons (
+    ord INTEGER PRIMARY KEY, part INTEGER NOT NULL, id TEXT NOT NULL, title TEXT, standard_code TEXT,
+    record BLOB NOT NULL
+);
+CREATE TABLE lesson_items (ord INTEGER PRIMARY KEY, lesson_id TEXT NOT NULL, item_ord INTEGER NOT NULL);
+CREATE TABLE item_lessons (ord INTEGER PRIMARY KEY, item_id TEXT NOT NULL, lesson_id TEXT NOT NULL);
+CREATE TABLE nodes (
+    ord INTEGER PRIMARY KEY, id TEXT NOT NULL, type TEXT NOT NULL, data BLOB NOT NULL,
+    degree INTEGER NOT NULL, x REAL, y REAL
+);
+CREATE TABLE links (ord INTEGER PRIMARY KEY, source TEXT NOT NULL, target TEXT NOT NULL, type TEXT NOT NULL);
+CREATE TABLE blobs (name TEXT PRIMARY KEY, body BLOB NOT NULL);
+""" + CCC_ITEMS_TABLE
+
+# Created after the rows are in, which is much faster than maintaining them per insert
+INDEXES = """
+CREATE INDEX standards_code ON standards (code);
+CREATE INDEX lessons_part ON lessons (part);
+CREATE INDEX lessons_id ON lessons (id);
+CREATE INDEX lessons_title ON lessons (title);
+CREATE INDEX lessons_standard ON lessons (standard_code);
+CREATE INDEX lesson_items_lesson ON lesson_items (lesson_id);
+CREATE INDEX item_lessons_item ON item_lessons (item_id);
+CREATE UNIQUE INDEX nodes_id ON nodes (id);
+CREATE INDEX links_source ON links (source);
+CREATE INDEX links_target ON links (target);
+""" + CCC_ITEMS_INDEXES
+
+
+def write_compiled_snapshot(
+    path: str,
+    data: Dict[str, Any],
+    sources: Dict[str, Optional[str]]
+) -> None:
+    """
+    Write the loaded data (``curriculum``, ``ccc``, ``joins``, ``structure``)
+    to path. sources maps each input file to its sha256 so readers can tell
+    when the snapshot is stale. The file is built aside and moved into place,
+    so readers never see a partial snapshot.
+    """
+    curriculum_data = data.get('curriculum') or {}
+    ccc_data = data.get('ccc') or {}
+    joins = data.get('joins') or {}
+    graph = data.get('structure')
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    partial = f"{path}.{os.getpid()}.tmp"
+    if os.path.exists(partial):
+        os.remove(partial)
+    conn = sqlite3.connect(partial, isolation_level=None)
+    try:
+        conn.execute("PRAGMA journal_mode=OFF")
+        conn.execute("PRAGMA synchronous=OFF")
+        conn.executescript(SCHEMA)
+        conn.execute("BEGIN")
+        meta = {'format': str(FORMAT_VERSION)}
+        if graph is not None:
+            meta['layout'] = graph.topology_digest()
+        meta.update({f"source:{name}": digest or '' for name, digest in sources.items()})
+        conn.executemany("INSERT INTO meta VALUES (?, ?)", meta.items())
+
+        standards = curriculum_data.get('standards', [])
+        lessons = curriculum_data.get('lessons', [])
+        items = ccc_data.get('items', [])
+        conn.executemany(
+            "INSERT INTO standards VALUES (?, ?, ?)",
+            ((i, standard.get('code'), dumps(standard)) for i, standard in enumerate(standards))
+        )
+        # Lessons are partitioned by (grade, subject) so readers can load one partition at a time
+        partitions: Dict[tuple, list] = {}
+
+        def lesson_rows():
+            for i, lesson in enumerate(lessons):
+                record = dumps(lesson)
+                key = (lesson.get('grade'), lesson.get('subject'))
+                partition = partitions.setdefault(key, [len(partitions), 0, 0])
+                partition[1] += 1
+                partition[2] += len(record)
+                yield i, partition[0], str(lesson['id']), lesson.get('title'), lesson.get('standard_code') or None, record
+
+        conn.executemany("INSERT INTO lessons VALUES (?, ?, ?, ?, ?, ?)", lesson_rows())
+        conn.executemany(
+            "INSERT INTO partitions VALUES (?, ?, ?, ?, ?)",
+            ((part, grade, subject, count, nbytes) for (grade, subject), (part, count, nbytes) in partitions.items())
+        )
+        conn.executemany(INSERT_ITEM, (item_row(i, item) for i, item in enumerate(items)))
+
+        item_ords = {id(item): i for i, item in enumerate(items)}
+        conn.executemany(
+            "INSERT INTO lesson_items (lesson_id, item_ord) VALUES (?, ?)",
+            (
+                (lesson_id, item_ords[id(item)])
+                for lesson_id, lesson_items in joins.get('lesson_items', {}).items()
+                for item in lesson_items
+            )
+        )
+        conn.executemany(
+            "INSERT INTO item_lessons (item_id, lesson_id) VALUES (?, ?)",
+            (
+                (item_id, lesson_id)
+                for item_id, lesson_ids in joins.get('item_lessons', {}).items()
+                for lesson_id in lesson_ids
+            )
+        )
+
+        if graph is not None:
+            conn.executemany(
+                "INSERT INTO nodes VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    (i, node_id, node['type'], dumps(node['data']), len(graph.adjacency[node_id]),
+                     *graph.positions.get(node_id, (None, None)))
+                    for i, (node_id, node) in enumerate(graph.nodes.items())
+                )
+            )
+            conn.executemany(
+                "INSERT INTO links VALUES (?, ?, ?, ?)",
+                ((i, link['source'], link['target'], link['type']) for i, link in enumerate(graph.links))
+            )
+
+        blobs = {'standards': dumps(standards), 'lessons': dumps(lessons)}
+        if graph is not None:
+            blobs['structure'] = dumps(graph.to_dict())
+            blobs['structure:overview'] = dumps(graph.overview())
+        conn.executemany("INSERT INTO blobs VALUES (?, ?)", blobs.items())
+        conn.execute("COMMIT")
+        conn.executescript(INDEXES)
+        conn.execute("ANALYZE")
+    except BaseException:
+        conn.close()
+        os.remove(partial)
+        raise
+    conn.close()
+    os.replace(partial, path)
+    logger.info(f"Compiled snapshot with {len(lessons)} lessons and {len(items)} CCC items to {path}")
+
+
+class CompiledSnapshot:
+    """Read-only view of a compiled snapshot file; safe to share between threads."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self.meta = dict(self._conn().execute("SELECT key, value FROM meta"))
+
+    @classmethod
+    def open(cls, path: str) -> Optional['CompiledSnapshot']:
+        """The snapshot at path, or None if there is none or it has another format."""
+        if not os.path.exists(path):
+            return None
+        try:
+            snapshot = cls(path)
+        except sqlite3.DatabaseError as e:
+            logger.warning(f"Ignoring unreadable compiled snapshot {path}: {str(e)}")
+            return None
+        if snapshot.meta.get('format') != str(FORMAT_VERSION):
+            logger.warning(f"Ignoring compiled snapshot {path} of format {snapshot.meta.get('format')}")
+            return None
+        return snapshot
+
+    def _conn(self) -> sqlite3.Connection:
+        # sqlite3 connections must not be shared across threads. The file is
+        # replaced rather than modified, so it can be opened as immutable
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(f"file:{self.path}?mode=ro&immutable=1", uri=True, check_same_thread=False)
+            conn.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+            self._local.conn = conn
+        return conn
+
+    def query(self, sql: str, params=()) -> List[tuple]:
+        return self._conn().execute(sql, params).fetchall()
+
+    def source_digest(self, name: str) -> Optional[str]:
+        """sha256 of the input file the snapshot was compiled from ('' if it was missing)."""
+        return self.meta.get(f"source:{name}")
+
+    def positions(self) -> Dict[str, tuple]:
+        """Node coordinates of the stored structure graph."""
+        return {node_id: (x, y) for node_id, x, y in self.query("SELECT id, x, y FROM nodes WHERE x IS NOT NULL")}
+
+    def blob(self, name: str) -> Optional[bytes]:
+        """A pre-encoded JSON response, or None if it was not stored."""
+        rows = self.query("SELECT body FROM blobs WHERE name = ?", (name,))
+        return bytes(rows[0][0]) if rows else None
+
+    def _records(self, sql: str, params=()) -> List[dict]:
+        return [loads(row[0]) for row in self.query(sql, params)]
+
+    def _record_index(self, table: str, column: str, many: bool) -> 'QueryIndex':
+        if many:
+            lookup = lambda key: self._records(f"SELECT record FROM {table} WHERE {column} = ? ORDER BY ord", (key,)) or None
+        else:
+            # Later rows win, like the dict indexes built from the JSON
+            lookup = lambda key: next(iter(self._records(
+                f"SELECT record FROM {table} WHERE {column} = ? ORDER BY ord DESC LIMIT 1", (key,)
+            )), None)
+        return QueryIndex(lookup, lambda: self.query(f"SELECT DISTINCT {column} FROM {table} WHERE {column} IS NOT NULL"))
+
+    def curriculum(self, max_bytes: int = PARTITION_CACHE_BYTES) -> 'LazyData':
+        """
+        Curriculum data with the same keys as curriculum.index_curriculum's
+        output. Lessons are Lesson objects served from a PartitionedLessons
+        whose loaded partitions stay under max_bytes.
+        """
+        lessons = PartitionedLessons(self.query, loads, max_bytes)
+        keys = lambda column: lambda: self.query(f"SELECT DISTINCT {column} FROM lessons WHERE {column} IS NOT NULL")
+        return LazyData({
+            'standards': lambda: self._records("SELECT record FROM standards ORDER BY ord"),
+            'lessons': lambda: LessonList(lessons),
+            'standards_by_code': lambda: self._record_index('standards', 'code', many=False),
+            'lessons_by_id': lambda: QueryIndex(lessons.get, keys('id')),
+            'lessons_by_title': lambda: QueryIndex(lessons.for_title, keys('title')),
+            'lessons_by_standard': lambda: QueryIndex(lessons.for_standard, keys('standard_code')),
+            'partitions': lambda: lessons
+        })
+
+    def ccc(self) -> 'LazyData':
+        """CCC data with the same keys as curriculum.index_ccc's output."""
+        return LazyData({
+            'items': lambda: self._records("SELECT record FROM ccc_items ORDER BY ord"),
+            'items_by_id': lambda: self._record_index('ccc_items', 'id', many=False),
+            'items_by_standard': lambda: self._record_index('ccc_items', 'standard_code', many=True),
+            'items_by_lesson': lambda: self._record_index('ccc_items', 'lesson', many=True)
+        })
+
+    def ccc_items(self, **filters: Optional[str]) -> ItemQuery:
+        """CCC items matching filters (see ccc_store.FILTER_COLUMNS), read a page at a time."""
+        return ItemQuery(self.query, loads, filters)
+
+    def joins(self) -> Dict[str, 'QueryIndex']:
+        """The lesson/CCC item join tables of curriculum.build_lesson_item_joins."""
+        return {
+            'lesson_items': QueryIndex(
+                lambda key: self._records(
+                    "SELECT i.record FROM lesson_items j JOIN ccc_items i ON i.ord = j.item_ord "
+                    "WHERE j.lesson_id = ? ORDER BY j.ord", (key,)
+                ) or None,
+                lambda: self.query("SELECT DISTINCT lesson_id FROM lesson_items")
+            ),
+            'item_lessons': QueryIndex(
+                lambda key: [row[0] for row in self.query(
+                    "SELECT lesson_id FROM item_lessons WHERE item_id = ? ORDER BY ord", (key,)
+                )] or None,
+                lambda: self.query("SELECT DISTINCT item_id FROM item_lessons")
+            )
+        }
+
+    def structure(self) -> 'CompiledStructure':
+        return CompiledStructure(self)
+
+
+class LazyData(Mapping):
+    """Mapping whose values are built by their factory on first access."""
+
+    def __init__(self, factories: Dict[str, Callable[[], Any]]):
+        self._factories = factories
+        self._values: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return self._values[key]
+        except KeyError:
+            pass
+        factory = self._factories[key]
+        with self._lock:
+            if key not in self._values:
+                self._values[key] = factory()
+            return self._values[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._factories)
+
+    def __len__(self) -> int:
+        return len(self._factories)
+
+
+class QueryIndex(Mapping):
+    """Read-only mapping backed by a query: lookup(key) returns the value or None."""
+
+    def __init__(self, lookup: Callable[[Any], Any], keys: Callable[[], List[tuple]]):
+        self._lookup = lookup
+        self._keys = keys
+
+    def __getitem__(self, key: Any) -> Any:
+        value = self._lookup(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __iter__(self) -> Iterator[Any]:
+        return (row[0] for row in self._keys())
+
+    def __len__(self) -> int:
+        return len(self._keys())
+
+
+class CompiledStructure:
+    """The structure graph's views (see structure.StructureGraph) answered from the snapshot."""
+
+    def __init__(self, snapshot: CompiledSnapshot):
+        self.snapshot = snapshot
+
+    @staticmethod
+    def _view(row: tuple) -> Dict[str, Any]:
+        node_id, node_type, data, degree, x, y = row
+        view = {'id': node_id, 'type': node_type, 'data': loads(data), 'degree': degree}
+        if x is not None:
+            view['x'], view['y'] = x, y
+        return view
+
+    def _views(self, where: str = "", params=()) -> List[Dict[str, Any]]:
+        rows = self.snapshot.query(f"SELECT id, type, data, degree, x, y FROM nodes {where} ORDER BY ord", params)
+        return [self._view(row) for row in rows]
+
+    def _links(self, where: str = "", params=(), limit: int = -1) -> List[Dict[str, str]]:
+        rows = self.snapshot.query(f"SELECT source, target, type FROM links {where} ORDER BY ord LIMIT {int(limit)}", params)
+        return [{'source': source, 'target': target, 'type': link_type} for source, target, link_type in rows]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'nodes': self._views(), 'links': self._links()}
+
+    def overview(self) -> Dict[str, Any]:
+        (total_nodes,), = self.snapshot.query("SELECT COUNT(*) FROM nodes")
+        (total_links,), = self.snapshot.query("SELECT COUNT(*) FROM links")
+        return {
+            'nodes': self._views("WHERE type = 'standard'"),
+            'links': [],
+            'total_nodes': total_nodes,
+            'total_links': total_links
+        }
+
+    def neighbourhood(self, node_id: str, limit: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        node = self._views("WHERE id = ?", (node_id,))
+        if not node:
+            return None
+        limit = DEFAULT_NEIGHBOUR_LIMIT if limit is None else max(0, limit)
+        links = self._links("WHERE source = ?1 OR target = ?1", (node_id,), limit)
+        others = [link['target'] if link['source'] == node_id else link['source'] for link in links]
+        views = {}
+        for start in range(0, len(others), 500):
+            chunk = others[start:start + 500]
+            for view in self._views(f"WHERE id IN ({','.join('?' * len(chunk))})", chunk):
+                views[view['id']] = view
+        return {
+            'node': node[0],
+            'nodes': [views[other] for other in others],
+            'links': links,
+            'total': node[0]['degree']
+        }
@@ -0,0 +1,612 @@
+"""
+Curriculum and CCC data shared by the Flask visualizer and the FastAPI service.
+
+Both frontends call into this module so they share one set of loaded files,
+indexes and pre-encoded responses per process.
+"""
+
+import json
+import logging
+import os
+
+from src.services.ccc_store import ccc_item_lesson, ccc_item_standard, check_filters, item_matches
+from src.services.compiled_snapshot import CompiledSnapshot, write_compiled_snapshot
+from src.services.curriculum_store import Lesson
+from src.services.data_store import DataStore, Deferred, file_digest
+from src.services.layout import compute_layout
+from src.services.question_pool import QuestionPool
+from src.services.search_index import SearchIndex
+from src.services.streaming_loader import stream_ccc, stream_curriculum, use_streaming
+from src.services.structure import build_structure
+from src.utils.listing import paginate, parse_fields
+from src.utils.serialization import dumps
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Configure file paths - use the correct paths
+CONFIG = {
+    'curriculum': os.path.join(PROJECT_ROOT, 'data', 'curriculum_structure.json'),
+    'ccc': os.path.join(PROJECT_ROOT, 'data', 'ccc_structure.json'),
+    'snapshot': os.getenv('INCEPT_SNAPSHOT_PATH', os.path.join(PROJECT_ROOT, 'data', 'snapshot.sqlite3'))
+}
+
+# Set to 0 to always load the JSON files even when a compiled snapshot exists
+USE_COMPILED_SNAPSHOT = os.getenv('INCEPT_COMPILED_SNAPSHOT', '1') != '0'
+
+# Memory cap for the lesson partitions loaded from a compiled snapshot
+PARTITION_CACHE_BYTES = int(float(os.getenv('INCEPT_PARTITION_CACHE_MB', '256')) * 1024 * 1024)
+
+# Seconds a request may spend on the CCC API fallback before partial results are returned
+CCC_FALLBACK_BUDGET = float(os.getenv('INCEPT_CCC_BUDGET', '5'))
+
+def get_json_path(file_key):
+    """Get the absolute path for a JSON file"""
+    path = CONFIG.get(file_key, '')
+    logger.debug(f"Resolved path for {file_key}: {path}")
+    
+    # Try alternate locations if file doesn't exist
+    if not os.path.exists(path):
+        # Try directly in the project root
+        alt_path = os.path.join(PROJECT_ROOT, f"{file_key}_structure.json")
+        logger.debug(f"File not found at {path}, trying alternate path: {alt_path}")
+        if os.path.exists(alt_path):
+            return alt_path
+    
+    return path
+
+def open_compiled_snapshot():
+    """
+    The compiled snapshot if there is one and it was compiled from the
+    current JSON files (or they are missing), else None
+    """
+    if not USE_COMPILED_SNAPSHOT:
+        return None
+    compiled = CompiledSnapshot.open(CONFIG['snapshot'])
+    if compiled is None:
+        return None
+    for name in ('curriculum', 'ccc'):
+        path = get_json_path(name)
+        if os.path.exists(path) and file_digest(path) != compiled.source_digest(name):
+            logger.warning(f"Compiled snapshot {compiled.path} is older than {path}; loading the JSON files")
+            return None
+    return compiled
+
+def load_json_data(strict=False):
+    """Read both JSON data files and index them"""
+    return {
+        'curriculum': index_curriculum(read_curriculum_structure(strict)),
+        'ccc': index_ccc(read_ccc_structure(strict))
+    }
+
+def load_data(strict=False):
+    """The DataStore's loader: the compiled snapshot when it is current, else the JSON files"""
+    compiled = open_compiled_snapshot()
+    if compiled is None:
+        return load_json_data(strict)
+    logger.info(f"Loading compiled snapshot from: {compiled.path}")
+    return {
+        'compiled': compiled,
+        'curriculum': compiled.curriculum(PARTITION_CACHE_BYTES),
+        'ccc': compiled.ccc()
+    }
+
+def compile_snapshot(path=None, previous=None):
+    """
+    Read the JSON data files, build their indexes, joins and graph layout and
+    write them as the compiled snapshot workers start from. The layout of a
+    previous CompiledSnapshot is reused when the graph's shape is unchanged.
+    """
+    data = load_json_data(strict=False)
+    data['joins'] = build_lesson_item_joins(data['curriculum'], data['ccc'])
+    graph = build_structure(data['curriculum'], data['ccc'], data['joins'], ccc_item_standard, layout=None)
+    if previous is not None and previous.meta.get('layout') == graph.topology_digest():
+        logger.info("Graph shape unchanged; reusing the previous layout")
+        graph.positions = previous.positions()
+    else:
+        graph.positions = compute_layout(graph)
+    data['structure'] = graph
+    sources = {name: file_digest(get_json_path(name)) for name in ('curriculum', 'ccc')}
+    path = path or CONFIG['snapshot']
+    write_compiled_snapshot(path, data, sources)
+    return path
+
+data_store = DataStore(
+    {
+        'curriculum': lambda: get_json_path('curriculum'),
+        'ccc': lambda: get_json_path('ccc'),
+        'snapshot': lambda: CONFIG['snapshot']
+    },
+    load_data,
+    poll_interval=float(os.getenv('INCEPT_DATA_POLL_INTERVAL', '2.0'))
+)
+
+def load_curriculum_structure():
+    """The curriculum structure with its lookup indexes from the current data snapshot"""
+    return data_store.snapshot()['curriculum']
+
+def load_ccc_structure():
+    """The CCC structure with its lookup indexes from the current data snapshot"""
+    return data_store.snapshot()['ccc']
+
+def cached_json(name, builder):
+    """
+    Encoded JSON for builder(snapshot), computed once per data snapshot.
+    Returns (body, memo) where memo caches derived variants such as
+    compressed bodies and ETags alongside it.
+    """
+    snapshot = data_store.snapshot()
+
+    def build():
+        # A compiled snapshot stores the large whole-list responses pre-encoded
+        compiled = snapshot.data.get('compiled')
+        body = compiled.blob(name) if compiled is not None else None
+        return body if body is not None else dumps(builder(snapshot))
+
+    body = snapshot.memo(f"json:{name}", build)
+    return body, lambda key, fn: snapshot.memo(f"json:{name}:{key}", fn)
+
+def paginate_items(items, cursor=None, limit=None, fields=None):
+    """A page of items with a cursor tied to the current data snapshot"""
+    return paginate(items, data_store.snapshot().version, cursor, limit, parse_fields(fields))
+
+def read_curriculum_structure(strict=False):
+    """
+    Load the curriculum structure from JSON file. With strict, failures raise
+    instead of returning empty data (used by hot reloads to keep the old data).
+    """
+    try:
+        file_path = get_json_path('curriculum')
+        logger.info(f"Loading curriculum structure from: {file_path}")
+        
+        if not os.path.exists(file_path):
+            logger.error("Could not find curriculum_structure.json file")
+            if strict:
+                raise FileNotFoundError(file_path)
+            return {}
+        
+        if use_streaming(file_path):
+            return stream_curriculum(file_path)
+            
+        with open(file_path, 'r') as f:
+            data = json.load(f)
+            logger.info("Successfully loaded curriculum data")
+            
+            # Extract standards from the file
+            standards = []
+            
+            # Curriculum may be directly at the top level or nested under 'curriculum'
+            curriculum_data = data.get('curriculum', data)
+            
+            # Extract standards from lessons since they might not be separately listed
+            standard_map = {}
+            
+            # Process by grade level
+            if isinstance(curriculum_data, dict):
+                lessons = []
+                
+                for grade, grade_data in curriculum_data.items():
+                    logger.info(f"Processing grade: {grade}")
+                    
+                    # Grade data may contain lessons directly
+                    if isinstance(grade_data, dict) and 'lessons' in grade_data:
+                        grade_lessons = grade_data['lessons']
+                        logger.info(f"Found {len(grade_lessons)} lessons in grade {grade}")
+                        
+                        # Go through lessons to collect standards
+                        for i, lesson in enumerate(grade_lessons):
+                            # Add grade info to lesson
+                            lesson['grade'] = grade
+                            
+                            # Give the lesson an ID if it doesn't have one
+                            if 'id' not in lesson:
+                                lesson['id'] = f"{grade}-lesson-{i}"
+                                
+                            # Add to lessons collection
+                            lessons.append(lesson)
+                            
+                            # Extract standard info
+                            standard_code = lesson.get('standard_code')
+                            standard_description = lesson.get('standard_description')
+                            
+                            if standard_code and standard_code not in standard_map:
+                                standard_map[standard_code] = {
+                                    'code': standard_code,
+                                    'description': standard_description,
+                                    'grade': grade
+                                }
+                
+                # Convert standards map to list
+                for std_code, std_data in standard_map.items():
+                    standards.append(std_data)
+                
+                logger.info(f"Extracted {len(standards)} unique standards from lessons")
+                logger.info(f"Total lessons: {len(lessons)}")
+                
+                # Enhance lessons with sample questions if available
+                for lesson in lessons:
+                    # Make sure sample questions are easily accessible 
+                    if 'sample_questions' in lesson:
+                        lesson['question_count'] = len(lesson['sample_questions'])
+                    else:
+                        lesson['question_count'] = 0
+                
+                # Build the restructured data
+                restructured_data = {
+                    'standards': standards,
+                    'lessons': lessons
+                }
+                
+                return restructured_data
+            
+            else:
+                logger.warning(f"Unexpected curriculum data structure: {type(curriculum_data)}")
+                return {
+                    'standards': [],
+                    'lessons': []
+                }
+            
+    except Exception as e:
+        if strict:
+            raise
+        logger.exception(f"Error loading curriculum structure: {str(e)}")
+        return {
+            'standards': [],
+            'lessons': []
+        }
+
+def read_ccc_structure(strict=False):
+    """
+    Load the CCC structure from JSON file. With strict, failures raise
+    instead of returning empty data (used by hot reloads to keep the old data).
+    """
+    try:
+        file_path = get_json_path('ccc')
+        logger.info(f"Loading CCC structure from: {file_path}")
+        
+        if not os.path.exists(file_path):
+            logger.error("Could not find ccc_structure.json file")
+            if strict:
+                raise FileNotFoundError(file_path)
+            return {
+                'items': []
+            }
+        
+        if use_streaming(file_path):
+            return stream_ccc(file_path)
+            
+        with open(file_path, 'r') as f:
+            data = json.load(f)
+            logger.info("Successfully loaded CCC data")
+            
+            # Handle different possible structures
+            if isinstance(data, dict):
+                if 'items' in data:
+                    logger.info(f"Found {len(data['items'])} items in CCC data")
+                    return data
+                elif 'content' in data:
+                    # Content structure from the file
+                    content_items = data['content']
+                    logger.info(f"Found {len(content_items)} content items in CCC data")
+                    
+                    # Process items to have consistent keys
+                    processed_items = []
+                    for item in content_items:
+                        # Map item fields to expected structure
+                        processed_item = {
+                            'id': item.get('id', ''),
+                            'title': item.get('source', 'Unnamed Item'),
+                            'type': item.get('content_type', 'article'),
+                            'standard_code': item.get('standard', ''),
+                            'lesson_id': item.get('lesson', ''),
+                            'content': item,  # Include original content
+                            'source': 'local'
+                        }
+                        processed_items.append(processed_item)
+                    
+                    return {'items': processed_items}
+                else:
+                    logger.warning(f"Unexpected CCC data structure with keys: {list(data.keys())}")
+            else:
+                logger.warning(f"Unexpected CCC data type: {type(data)}")
+            
+            # Return empty data structure if no valid data found
+            return {
+                'items': []
+            }
+            
+    except Exception as e:
+        if strict:
+            raise
+        logger.exception(f"Error loading CCC structure: {str(e)}")
+        return {
+            'items': []
+        }
+
+def index_curriculum(data):
+    """
+    Turn loaded lessons into compact Lesson objects and add hash indexes by
+    standard code, lesson ID and lesson title to the curriculum data
+    """
+    if not data:
+        return data
+    
+    standards_by_code = {}
+    for standard in data.get('standards', []):
+        standards_by_code[standard['code']] = standard
+    
+    lessons = [Lesson(lesson) for lesson in data.get('lessons', [])]
+    lessons_by_id = {}
+    lessons_by_title = {}
+    lessons_by_standard = {}
+    for lesson in lessons:
+        lessons_by_id[str(lesson['id'])] = lesson
+        lessons_by_title.setdefault(lesson.get('title'), []).append(lesson)
+        if lesson.get('standard_code'):
+            lessons_by_standard.setdefault(lesson['standard_code'], []).append(lesson)
+    
+    data['lessons'] = lessons
+    data['standards_by_code'] = standards_by_code
+    data['lessons_by_id'] = lessons_by_id
+    data['lessons_by_title'] = lessons_by_title
+    data['lessons_by_standard'] = lessons_by_standard
+    return data
+
+def index_ccc(data):
+    """Add hash indexes by item ID, standard code and lesson to loaded CCC data"""
+    items_by_id = {}
+    items_by_standard = {}
+    items_by_lesson = {}
+    for item in data.get('items', []):
+        items_by_id[str(item.get('id'))] = item
+        standard_code = ccc_item_standard(item)
+        if standard_code:
+            items_by_standard.setdefault(standard_code, []).append(item)
+        lesson = ccc_item_lesson(item)
+        if lesson:
+            items_by_lesson.setdefault(lesson, []).append(item)
+    
+    data['items_by_id'] = items_by_id
+    data['items_by_standard'] = items_by_standard
+    data['items_by_lesson'] = items_by_lesson
+    return data
+
+def load_lesson_item_joins():
+    """Join tables between curriculum lessons and CCC items from the current data snapshot"""
+    return data_store.snapshot()['joins']
+
+def build_lesson_item_joins(curriculum_data, ccc_data):
+    """
+    Join tables between curriculum lessons and CCC items.
+    CCC items refer to lessons by title or ID, so both are tried.
+    """
+    curriculum_data = curriculum_data or {}
+    lessons_by_id = curriculum_data.get('lessons_by_id', {})
+    lessons_by_title = curriculum_data.get('lessons_by_title', {})
+    
+    lesson_items = {}
+    item_lessons = {}
+    for lesson_ref, items in ccc_data.get('items_by_lesson', {}).items():
+        if lesson_ref in lessons_by_id:
+            lessons = [lessons_by_id[lesson_ref]]
+        else:
+            lessons = lessons_by_title.get(lesson_ref, [])
+        for lesson in lessons:
+            lesson_id = str(lesson['id'])
+            lesson_items.setdefault(lesson_id, []).extend(items)
+            for item in items:
+                item_lessons.setdefault(str(item.get('id')), []).append(lesson_id)
+    
+    return {
+        'lesson_items': lesson_items,
+        'item_lessons': item_lessons
+    }
+
+def build_search_index(curriculum_data, ccc_data):
+    """Search index over lessons, standards and CCC item titles"""
+    curriculum_data = curriculum_data or {}
+    documents = []
+    for standard in curriculum_data.get('standards', []):
+        documents.append({
+            'kind': 'standard',
+            'id': standard['code'],
+            'title': standard['code'],
+            'fields': {'code': standard['code'], 'description': standard.get('description') or ''}
+        })
+    for lesson in curriculum_data.get('lessons', []):
+        documents.append({
+            'kind': 'lesson',
+            'id': str(lesson['id']),
+            'title': lesson.get('title') or '',
+            'standard_code': lesson.get('standard_code'),
+            'fields': {
+                'title': lesson.get('title') or '',
+                'description': lesson.get('standard_description') or '',
+                'body': '\n\n'.join(lesson.get('sample_questions', []))
+            }
+        })
+    for item in (ccc_data or {}).get('items', []):
+        documents.append({
+            'kind': 'ccc_item',
+            'id': str(item.get('id')),
+            'title': item.get('title') or '',
+            'standard_code': ccc_item_standard(item),
+            'fields': {'title': item.get('title') or ''}
+        })
+    return SearchIndex(documents)
+
+def search(query, limit=10, kinds=None):
+    """Ranked lessons, standards and CCC items matching query; the last word may be a prefix"""
+    return data_store.snapshot()['search'].search(query, limit, kinds)
+
+def load_structure():
+    """Visualization graph of the current data snapshot"""
+    return data_store.snapshot()['structure']
+
+def lessons_for_standard(standard_code):
+    """Lessons linked to a standard"""
+    return (load_curriculum_structure() or {}).get('lessons_by_standard', {}).get(standard_code, [])
+
+def get_lesson(lesson_id):
+    """A single lesson by ID, or None"""
+    return (load_curriculum_structure() or {}).get('lessons_by_id', {}).get(str(lesson_id))
+
+def ccc_items_for_lesson(lesson_id):
+    """CCC items joined to a curriculum lesson"""
+    return load_lesson_item_joins()['lesson_items'].get(str(lesson_id), [])
+
+def find_local_ccc_items(standard_code=None, lesson_id=None, content_type=None, difficulty=None, interaction_type=None):
+    """
+    CCC items from the local data matching a standard code or lesson, narrowed
+    by content type, difficulty and interaction type. With a compiled snapshot
+    and no lesson, the result is an indexed query read a page at a time.
+    """
+    filters = check_filters({'content_type': content_type, 'difficulty': difficulty, 'interaction_type': interaction_type})
+    snapshot = data_store.snapshot()
+    ccc_data = snapshot['ccc']
+    compiled = snapshot.data.get('compiled')
+
+    unfiltered = not standard_code and not lesson_id and not filters
+
+    if compiled is not None and not lesson_id:
+        items = compiled.ccc_items(standard_code=standard_code, **filters)
+        return items[:100] if unfiltered else items
+    if unfiltered:
+        # If no filters provided, return all items (limited to avoid large responses)
+        return ccc_data.get('items', [])[:100]
+
+    if standard_code or lesson_id:
+        filtered_items = []
+        if standard_code:
+            filtered_items.extend(ccc_data['items_by_standard'].get(standard_code, []))
+        if lesson_id:
+            # The lesson may be referenced directly by the items or only through the join table
+            lesson_items = ccc_data['items_by_lesson'].get(str(lesson_id)) or ccc_items_for_lesson(lesson_id)
+            # Compared by ID: records read from a compiled snapshot are new objects per lookup
+            seen = {str(item.get('id')) for item in filtered_items}
+            filtered_items.extend(item for item in lesson_items if str(item.get('id')) not in seen)
+    else:
+        filtered_items = ccc_data.get('items', [])
+    filtered_items = [item for item in filtered_items if item_matches(item, filters)]
+
+    logger.info(f"Found {len(filtered_items)} items in local CCC data")
+    return filtered_items
+
+def find_local_ccc_item(item_id):
+    """A single CCC item from the local data, or None"""
+    return load_ccc_structure()['items_by_id'].get(str(item_id))
+
+async def fetch_remote_ccc_items(ccc_client, standard_code, budget=None):
+    """
+    CCC API content for every standard matching standard_code, in the visualizer's item format.
+    Content is fetched concurrently; whatever has not arrived when the budget
+    (seconds, INCEPT_CCC_BUDGET by default) runs out is cancelled.
+    Returns (items, partial) where partial tells whether anything was cut off.
+    """
+    import asyncio
+
+    budget = CCC_FALLBACK_BUDGET if budget is None else budget
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + budget
+    items = []
+    try:
+        standards_data = await asyncio.wait_for(ccc_client.search_standards(standard_code), budget)
+    except asyncio.TimeoutError:
+        logger.warning(f"CCC standards search for {standard_code} exceeded the {budget:g}s budget")
+        return items, True
+    except Exception as api_err:
+        logger.error(f"Error fetching from CCC API: {str(api_err)}")
+        return items, False
+    logger.info(f"Found {len(standards_data)} standards from CCC API")
+    
+    tasks = [
+        asyncio.ensure_future(ccc_client.get_content_for_standard(standard['id']))
+        for standard in standards_data if 'id' in standard
+    ]
+    if not tasks:
+        return items, False
+    done, pending = await asyncio.wait(tasks, timeout=max(0.0, deadline - loop.time()))
+    for task in pending:
+        task.cancel()
+    if pending:
+        logger.warning(f"{len(pending)} of {len(tasks)} CCC content requests exceeded the {budget:g}s budget")
+    
+    # Keep the standards' order regardless of which request finished first
+    for task in tasks:
+        if task not in done:
+            continue
+        if task.exception() is not None:
+            logger.error(f"Error fetching from CCC API: {str(task.exception())}")
+            continue
+        content_items = task.result()
+        logger.info(f"Found {len(content_items)} content items for standard")
+        
+        # Transform items to our expected format
+        for item in content_items:
+            items.append({
+                'id': item.get('id', ''),
+                'title': item.get('name', ''),
+                'type': item.get('type', ''),
+                'standard_code': standard_code,
+                'content': item.get('content', {}),
+                'source': 'CCC API'
+            })
+    return items, bool(pending)
+
+async def fetch_remote_ccc_item(ccc_client, cf_item_id):
+    """First CCC API content item for a CFItem id, or None"""
+    content_items = await ccc_client.get_content_for_standard(cf_item_id)
+    return content_items[0] if content_items else None
+
+def load_question_pool():
+    """Sample questions grouped for random draws, from the current data snapshot"""
+    return data_store.snapshot()['question_pool']
+
+def _require_curriculum():
+    if not load_curriculum_structure():
+        raise FileNotFoundError('Curriculum file not found')
+
+def question_filters():
+    """
+    Get all available standards, lessons, and difficulties from the curriculum structure
+    This helps the user know what options will actually return results
+    """
+    _require_curriculum()
+    return load_question_pool().filters()
+
+def random_question(standard=None, lesson=None):
+    """
+    A random sample question matching the filters, or None
+    Filters:
+    - standard: NGSS standard code
+    - lesson: lesson title
+    """
+    _require_curriculum()
+    return load_question_pool().draw(standard, lesson)
+
+def random_questions(n, standard=None, lesson=None):
+    """Up to n distinct random sample questions matching the filters"""
+    _require_curriculum()
+    return load_question_pool().draw_many(n, standard, lesson)
+
+# Derived structures rebuilt with every data snapshot, in dependency order. A compiled
+# snapshot already holds the joins and the laid-out graph; the in-memory search index
+# and question pool are then only built when first used
+def derive_joins(data):
+    if 'compiled' in data:
+        return data['compiled'].joins()
+    return build_lesson_item_joins(data['curriculum'], data['ccc'])
+
+def derive_structure(data):
+    if 'compiled' in data:
+        return data['compiled'].structure()
+    return build_structure(data['curriculum'], data['ccc'], data['joins'], ccc_item_standard)
+
+def derive_lazily_if_compiled(builder):
+    return lambda data: Deferred(lambda: builder(data)) if 'compiled' in data else builder(data)
+
+data_store.register_derived('joins', derive_joins)
+data_store.register_derived('structure', derive_structure)
+data_store.register_derived('search', derive_lazily_if_compiled(lambda data: build_search_index(data['curriculum'], data['ccc'])))
+data_store.register_derived('question_pool', derive_lazily_if_compiled(lambda data: QuestionPool((data['curriculum'] or {}).get('lessons', []))))
@@ -0,0 +1,213 @@
+"""
+Compact lessons and a partitioned, lazily loaded lesson store.
+
+``Lesson`` keeps a lesson's fields in ``__slots__`` instead of a per-lesson
+dict but still reads like one (``lesson['title']``, ``lesson.get(...)``,
+JSON encoding), so the rest of the code does not care which it gets.
+
+``PartitionedLessons`` serves the lessons of a compiled snapshot by
+(grade, subject) partition: a partition is read the first time a request
+touches one of its lessons and kept in an LRU bounded by an estimate of
+its size, so the resident set follows what is being used rather than how
+many grades and subjects the curriculum has.
+"""
+
+import heapq
+import logging
+import sys
+import threading
+from collections import OrderedDict
+from collections.abc import Mapping, Sequence
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Default size cap of the loaded partitions, estimated from their encoded size
+PARTITION_CACHE_BYTES = 256 * 1024 * 1024
+
+# Lessons fetched per query when walking the whole curriculum
+SCAN_BATCH = 2000
+
+_MISSING = object()
+
+
+class Lesson(Mapping):
+    """
+    A curriculum lesson. Known fields live in slots, in the order the data
+    build writes them; any other field goes to ``extra``.
+    """
+
+    FIELDS = (
+        'title', 'third_party_code', 'ixl_skill_code', 'order', 'video_url', 'standard_code',
+        'standard_description', 'sample_questions', 'subject', 'grade', 'id', 'question_count'
+    )
+    __slots__ = FIELDS + ('extra',)
+
+    _SLOTTED = frozenset(FIELDS)
+    # Short values shared by many lessons
+    _INTERNED = frozenset({'grade', 'standard_code', 'standard_description', 'subject'})
+
+    def __init__(self, record: Dict[str, Any]):
+        extra = None
+        for key, value in record.items():
+            if key in Lesson._INTERNED and type(value) is str:
+                value = sys.intern(value)
+            if key in Lesson._SLOTTED:
+                object.__setattr__(self, key, value)
+            else:
+                if extra is None:
+                    extra = {}
+                extra[key] = value
+        object.__setattr__(self, 'extra', extra)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("Lesson is read-only")
+
+    def __getitem__(self, key: str) -> Any:
+        if key in Lesson._SLOTTED:
+            value = getattr(self, key, _MISSING)
+            if value is not _MISSING:
+                return value
+        elif self.extra is not None and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        for field in Lesson.FIELDS:
+            if getattr(self, field, _MISSING) is not _MISSING:
+                yield field
+        if self.extra is not None:
+            yield from self.extra
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f"Lesson({self.to_dict()!r})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {key: self[key] for key in self}
+
+
+class LessonPartition:
+    """The lessons of one (grade, subject) partition and their lookup indexes."""
+
+    __slots__ = ('key', 'nbytes', 'by_ord', 'by_id', 'by_standard', 'by_title')
+
+    def __init__(self, key: int, nbytes: int, rows: List[Tuple[int, Lesson]]):
+        self.key = key
+        self.nbytes = nbytes
+        self.by_ord: Dict[int, Lesson] = {}
+        self.by_id: Dict[str, Lesson] = {}
+        self.by_standard: Dict[str, List[Tuple[int, Lesson]]] = {}
+        self.by_title: Dict[str, List[Tuple[int, Lesson]]] = {}
+        for ord_, lesson in rows:
+            self.by_ord[ord_] = lesson
+            self.by_id[str(lesson['id'])] = lesson
+            if lesson.get('standard_code'):
+                self.by_standard.setdefault(lesson['standard_code'], []).append((ord_, lesson))
+            self.by_title.setdefault(lesson.get('title'), []).append((ord_, lesson))
+
+
+class PartitionedLessons:
+    """
+    Lessons of a compiled snapshot, loaded a partition at a time.
+
+    query(sql, params) runs against the snapshot; decode turns a stored record
+    into a dict. Partitions are evicted least recently used first once the
+    loaded ones exceed max_bytes (the partition in use is always kept).
+    """
+
+    def __init__(self, query: Callable[..., List[tuple]], decode: Callable[[bytes], dict], max_bytes: int = PARTITION_CACHE_BYTES):
+        self.query = query
+        self.decode = decode
+        self.max_bytes = max_bytes
+        self.partitions = {
+            key: {'grade': grade, 'subject': subject, 'lessons': count, 'bytes': nbytes}
+            for key, grade, subject, count, nbytes in query("SELECT id, grade, subject, lessons, bytes FROM partitions ORDER BY id")
+        }
+        self.loads = 0
+        self._loaded: 'OrderedDict[int, LessonPartition]' = OrderedDict()
+        self._loaded_bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return sum(partition['lessons'] for partition in self.partitions.values())
+
+    def partition(self, key: int) -> LessonPartition:
+        with self._lock:
+            partition = self._loaded.get(key)
+            if partition is not None:
+                self._loaded.move_to_end(key)
+                return partition
+        rows = self.query("SELECT ord, record FROM lessons WHERE part = ? ORDER BY ord", (key,))
+        partition = LessonPartition(key, self.partitions[key]['bytes'], [(ord_, Lesson(self.decode(record))) for ord_, record in rows])
+        with self._lock:
+            if key not in self._loaded:
+                self._loaded[key] = partition
+                self._loaded_bytes += partition.nbytes
+                self.loads += 1
+                while self._loaded_bytes > self.max_bytes and len(self._loaded) > 1:
+                    _, evicted = self._loaded.popitem(last=False)
+                    self._loaded_bytes -= evicted.nbytes
+            return self._loaded[key]
+
+    def loaded(self) -> List[dict]:
+        """Partitions currently in memory, least recently used first."""
+        with self._lock:
+            return [dict(self.partitions[key], id=key) for key in self._loaded]
+
+    def _keys_where(self, column: str, value: Any) -> List[int]:
+        return [row[0] for row in self.query(f"SELECT DISTINCT part FROM lessons WHERE {column} = ?", (value,))]
+
+    def get(self, lesson_id: str) -> Optional[Lesson]:
+        # The last lesson with an ID wins, as in the dict index built from the JSON
+        rows = self.query("SELECT part FROM lessons WHERE id = ? ORDER BY ord DESC LIMIT 1", (lesson_id,))
+        return self.partition(rows[0][0]).by_id.get(lesson_id) if rows else None
+
+    def _merged(self, index: str, column: str, value: Any) -> Optional[List[Lesson]]:
+        groups = [getattr(self.partition(key), index).get(value, []) for key in self._keys_where(column, value)]
+        if not groups:
+            return None
+        return [lesson for _, lesson in heapq.merge(*groups, key=lambda row: row[0])]
+
+    def for_standard(self, standard_code: str) -> Optional[List[Lesson]]:
+        return self._merged('by_standard', 'standard_code', standard_code)
+
+    def for_title(self, title: str) -> Optional[List[Lesson]]:
+        return self._merged('by_title', 'title', title)
+
+    def in_order(self, offset: int = 0, limit: int = -1) -> List[Lesson]:
+        """Lessons in file order, read through the partition cache."""
+        rows = self.query("SELECT part, ord FROM lessons ORDER BY ord LIMIT ? OFFSET ?", (limit, offset))
+        return [self.partition(key).by_ord[ord_] for key, ord_ in rows]
+
+
+class LessonList(Sequence):
+    """All lessons of a PartitionedLessons as a read-only list that is fetched in batches."""
+
+    def __init__(self, lessons: PartitionedLessons):
+        self.lessons = lessons
+        self._length = len(lessons)
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._length)
+            if step != 1:
+                return [self[i] for i in range(start, stop, step)]
+            return self.lessons.in_order(start, max(0, stop - start))
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError(index)
+        return self.lessons.in_order(index, 1)[0]
+
+    def __iter__(self) -> Iterator[Lesson]:
+        for offset in range(0, self._length, SCAN_BATCH):
+            yield from self.lessons.in_order(offset, SCAN_BATCH)
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, (list, LessonList)) and len(self) == len(other) and all(a == b for a, b in zip(self, other))
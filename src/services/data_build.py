@@ -0,0 +1,594 @@
+"""
+Incremental build of the data files from the CSV exports.
+
+Each stage turns one kind of export (any number of files: one per grade,
+subject or vendor) into one JSON file. Files are converted in worker
+processes and merged in path order; a record found in more than one file
+is kept once (see resolve_conflicts). The manifest written next to the
+outputs records, per stage, every input's signature and hash, the output's
+hash and a hash of every input row together with where that row's JSON was
+written. On the next run:
+
+- a stage whose inputs and output are unchanged is skipped without reading
+  them, and so is each unchanged file of a stage that is rebuilt;
+- otherwise every row is tokenized and hashed, and rows seen before copy
+  their encoded JSON straight from the previous output instead of being
+  converted and encoded again;
+- the compiled snapshot is recompiled only when the JSON files changed, and
+  reuses the previous graph layout while the graph's shape is the same.
+"""
+
+import glob
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from src.services.data_store import file_digest
+from src.utils.csv_stream import split_header
+from src.utils.serialization import file_signature
+
+logger = logging.getLogger(__name__)
+
+# Bumped whenever a converter's output changes, so cached rows are not reused
+BUILD_VERSION = 3
+
+MANIFEST_NAME = 'build_manifest.json'
+
+# Sample question columns of the curriculum export
+SAMPLE_QUESTION_FIELDS = [f'Sample Question {i}' for i in range(1, 5)]
+
+# Pattern to match markdown blocks inside triple backticks; re.DOTALL allows the dot to match newlines
+MARKDOWN_BLOCK = re.compile(r'```markdown(.*?)```', re.DOTALL)
+
+# One quoted item of a list literal and the separator after it
+_LIST_ITEM = re.compile(r"""\s*('(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*")\s*(,?)""", re.DOTALL)
+_ESCAPE = re.compile(r'\\(.)', re.DOTALL)
+_ESCAPES = {'n': '\n', 't': '\t', 'r': '\r'}
+_BLANK = re.compile(r'\s*')
+
+
+def extract_markdown_blocks(text: Optional[str]) -> List[str]:
+    """The stripped contents of the ```markdown blocks in text."""
+    if not text:
+        return []
+    return [match.strip() for match in MARKDOWN_BLOCK.findall(text)]
+
+
+def lesson_from_row(row: Dict[str, str]) -> Optional[Tuple[str, dict]]:
+    """(grade, lesson) for one curriculum CSV row, or None for rows without a grade or lesson."""
+    grade = row.get('Grade', '')
+    lesson = row.get('Lesson', '')
+    if not grade or not lesson:
+        return None
+
+    sample_questions = []
+    for field_name in SAMPLE_QUESTION_FIELDS:
+        sample_questions.extend(extract_markdown_blocks(row.get(field_name)))
+
+    return grade, {
+        'title': lesson,
+        'third_party_code': row.get('Third party code', ''),
+        'ixl_skill_code': row.get('IXL skill code', ''),
+        'order': row.get('Order', ''),
+        'video_url': row.get('Instructional Video URL', ''),
+        'standard_code': row.get('Standard Code', ''),
+        'standard_description': row.get('Standard Description', ''),
+        'sample_questions': sample_questions
+    }
+
+
+def _unescape(match) -> str:
+    return _ESCAPES.get(match.group(1), match.group(1))
+
+
+def parse_list_literal(text: str) -> Optional[List[str]]:
+    """
+    The strings of a list literal such as ``['Science', "Earth's Systems"]``,
+    or None if text is not a list of string literals. Only quoted strings and
+    the usual backslash escapes are understood; nothing is evaluated.
+    """
+    text = text.strip()
+    if not (text.startswith('[') and text.endswith(']')):
+        return None
+    values = []
+    pos = 1
+    end = len(text) - 1
+    while True:
+        match = _LIST_ITEM.match(text, pos, end)
+        if match is None:
+            break
+        quoted = match.group(1)
+        values.append(_ESCAPE.sub(_unescape, quoted[1:-1]) if '\\' in quoted else quoted[1:-1])
+        pos = match.end()
+        if match.group(2) != ',':
+            break
+    return values if _BLANK.fullmatch(text, pos, end) else None
+
+
+def item_from_row(row: Dict[str, str]) -> Optional[Tuple[None, dict]]:
+    """(None, item) for one CCC CSV row; CCC items are not grouped."""
+    # The subject field is usually a list literal; anything else is kept as is
+    subject = row.get('subject', '')
+    subject_list = parse_list_literal(subject)
+    return None, {
+        'id': row.get('id', ''),
+        'content_type': row.get('content type', ''),
+        'source': row.get('source', ''),
+        'subject': subject if subject_list is None else subject_list,
+        'grade': row.get('grade', ''),
+        'standard': row.get('standard', ''),
+        'lesson': row.get('lesson', ''),
+        'difficulty': row.get('difficulty', ''),
+        'interaction_type': row.get('interaction type', '')
+    }
+
+
+class OutputFormat:
+    """How a stage's records are laid out in its JSON file."""
+
+    def __init__(self, head: bytes, group_head: Callable[[Any], bytes], group_tail: bytes, tail: bytes):
+        self.head = head
+        self.group_head = group_head
+        self.group_tail = group_tail
+        self.tail = tail
+
+
+CURRICULUM_FORMAT = OutputFormat(
+    b'{"curriculum": {',
+    lambda grade: b'\n' + json.dumps(grade).encode() + b': {"lessons": [\n',
+    b'\n]}',
+    b'\n}}\n'
+)
+
+CCC_FORMAT = OutputFormat(b'{"content": [', lambda _: b'\n', b'\n', b']}\n')
+
+def lesson_identity(grade: str, lesson: dict) -> Tuple[str, str, str]:
+    """
+    (key, standard code, standard description) of a lesson. Skill codes are
+    not unique on their own in every export, so the title is part of the key.
+    """
+    key = '/'.join(part for part in (grade, lesson['ixl_skill_code'], lesson['title']) if part)
+    return key, lesson['standard_code'], lesson['standard_description']
+
+
+def item_identity(_, item: dict) -> Tuple[str, str, str]:
+    return str(item['id']), '', ''
+
+
+class Stage:
+    """Converts the rows of one kind of export into one JSON file."""
+
+    def __init__(self, converter: Callable[[Dict[str, str]], Optional[Tuple[Any, dict]]],
+                 output_format: OutputFormat, identity: Callable[[Any, dict], Tuple[str, str, str]], kind: str):
+        self.converter = converter
+        self.format = output_format
+        self.identity = identity
+        # What a record is called in conflict reports
+        self.kind = kind
+
+
+STAGES = {
+    'curriculum': Stage(lesson_from_row, CURRICULUM_FORMAT, lesson_identity, 'lesson'),
+    'ccc': Stage(item_from_row, CCC_FORMAT, item_identity, 'item')
+}
+
+
+def encode_record(record: dict) -> bytes:
+    return json.dumps(record, ensure_ascii=False).encode('utf-8')
+
+
+class SpooledJSONWriter:
+    """
+    Writes records into the grouped arrays of an OutputFormat incrementally.
+
+    Groups can arrive in any order, so each group's records are spooled to a
+    temporary file as they come in, one per line, and the spools are joined
+    on close, which replaces output_path atomically. close() returns where
+    each record ended up in the output as (offset, length).
+    """
+
+    def __init__(self, output_path: str, output_format: OutputFormat):
+        self.output_path = output_path
+        self.format = output_format
+        self.directory = tempfile.mkdtemp(prefix='.build-', dir=os.path.dirname(os.path.abspath(output_path)))
+        self.spools: Dict[Any, Any] = {}
+        self.counts: Dict[Any, int] = {}
+        # Per record: (group, offset in the group's spool, length)
+        self.placements: List[Tuple[Any, int, int]] = []
+
+    def add(self, group: Any, fragment: bytes) -> int:
+        """Append an encoded record to group; returns its index for close()'s placements."""
+        spool = self.spools.get(group)
+        if spool is None:
+            spool = self.spools[group] = open(os.path.join(self.directory, f"{len(self.spools)}.part"), 'w+b')
+            self.counts[group] = 0
+        if self.counts[group]:
+            spool.write(b',\n')
+        self.placements.append((group, spool.tell(), len(fragment)))
+        spool.write(fragment)
+        self.counts[group] += 1
+        return len(self.placements) - 1
+
+    def close(self) -> List[Tuple[int, int]]:
+        partial = os.path.join(self.directory, 'output.json')
+        starts = {}
+        try:
+            with open(partial, 'wb') as out:
+                out.write(self.format.head)
+                for i, (group, spool) in enumerate(self.spools.items()):
+                    if i:
+                        out.write(b',')
+                    out.write(self.format.group_head(group))
+                    starts[group] = out.tell()
+                    spool.seek(0)
+                    shutil.copyfileobj(spool, out)
+                    out.write(self.format.group_tail)
+                out.write(self.format.tail)
+            os.replace(partial, self.output_path)
+        finally:
+            self.abort()
+        return [(starts[group] + offset, length) for group, offset, length in self.placements]
+
+    def abort(self) -> None:
+        for spool in self.spools.values():
+            spool.close()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+def row_hasher(header: List[str]) -> Callable[[List[str]], str]:
+    """Hash function for the rows under header; a changed header changes every row hash."""
+    key = hashlib.blake2b('\x1f'.join(header).encode(), digest_size=16).digest()
+
+    def row_hash(row: List[str]) -> str:
+        return hashlib.blake2b('\x1f'.join(row).encode(), digest_size=16, key=key).hexdigest()
+
+    return row_hash
+
+
+def iter_hashed_rows(lines: Iterable[str]):
+    """(row hash, row dict) for every row under the header of a CSV."""
+    header, rows = split_header(lines)
+    if header is None:
+        return
+    row_hash = row_hasher(header)
+    for row in rows:
+        yield row_hash(row), dict(zip(header, row))
+
+
+CONFLICT_POLICIES = ('first', 'last', 'error')
+
+# Conflicts kept in the manifest for reporting; all of them are counted
+CONFLICT_REPORT_LIMIT = 100
+
+# Fields of a row entry: [row hash, group, offset, length, key, standard code, standard description digest].
+# Offsets are into the output, or into a worker's part file until the merge; rows a conflict dropped have none.
+HASH, GROUP, OFFSET, LENGTH, KEY, CODE, DESCRIPTION = range(7)
+
+
+class BuildConflict(ValueError):
+    """Exports disagree about a record and the conflict policy is 'error'."""
+
+    def __init__(self, conflicts: List[dict]):
+        self.conflicts = conflicts
+        first = conflicts[0]
+        super().__init__(f"{len(conflicts)} conflicting records across exports, "
+                         f"e.g. {first['kind']} {first['key']} in {', '.join(first['files'])}")
+
+
+def expand_inputs(specs) -> List[str]:
+    """
+    Absolute paths of the CSV files named by specs: files, directories (every
+    *.csv below them) and glob patterns. The result is sorted, so the merge
+    order does not depend on how the files were listed or listed by the OS.
+    """
+    if isinstance(specs, str):
+        specs = [specs]
+    paths = set()
+    for spec in specs:
+        if os.path.isdir(spec):
+            matches = glob.glob(os.path.join(spec, '**', '*.csv'), recursive=True)
+        elif any(char in spec for char in '*?['):
+            matches = glob.glob(spec, recursive=True)
+        else:
+            matches = [spec]
+        paths.update(os.path.abspath(path) for path in matches if not os.path.isdir(path))
+    return sorted(paths)
+
+
+def _digest(text: str) -> str:
+    return hashlib.blake2b(text.encode(), digest_size=8).hexdigest() if text else ''
+
+
+def iter_records(name: str, input_path: str) -> Iterator[Tuple[Any, dict]]:
+    """(group, record) for every row of one export that stage name converts."""
+    converter = STAGES[name].converter
+    with open(input_path, 'r', encoding='utf-8-sig', newline='') as f:
+        for _, row in iter_hashed_rows(f):
+            parsed = converter(row)
+            if parsed is not None:
+                yield parsed
+
+
+def convert_file(name: str, input_path: str, part_path: str, old_output: Optional[str] = None,
+                 reusable: Optional[Dict[str, list]] = None) -> dict:
+    """
+    Convert one export, appending its encoded records to part_path; this is
+    what runs in the worker processes. Rows whose hash is in reusable are
+    copied from old_output instead of being converted. Returns the file's
+    row entries (offsets into part_path), its hashes and timings.
+    """
+    started = time.perf_counter()
+    stage = STAGES[name]
+    rows = []
+    converted = reused = 0
+    old = open(old_output, 'rb') if reusable else None
+    try:
+        # newline='' keeps line breaks inside quoted fields as they are
+        with open(input_path, 'r', encoding='utf-8-sig', newline='') as f, open(part_path, 'wb') as part:
+            for row_hash, row in iter_hashed_rows(f):
+                cached = reusable.get(row_hash) if reusable else None
+                if cached is not None:
+                    group, key, code, description = cached[GROUP], cached[KEY], cached[CODE], cached[DESCRIPTION]
+                    old.seek(cached[OFFSET])
+                    fragment = old.read(cached[LENGTH])
+                    reused += 1
+                else:
+                    parsed = stage.converter(row)
+                    if parsed is None:
+                        continue
+                    group, record = parsed
+                    key, code, description = stage.identity(group, record)
+                    description = _digest(description)
+                    fragment = encode_record(record)
+                    converted += 1
+                rows.append([row_hash, group, part.tell(), len(fragment), key, code, description])
+                part.write(fragment)
+    finally:
+        if old is not None:
+            old.close()
+    return {
+        'source': part_path,
+        'signature': file_signature(input_path),
+        'sha256': file_digest(input_path),
+        'rows': rows,
+        'run': {
+            'status': 'built',
+            'records': len(rows),
+            'converted': converted,
+            'reused': reused,
+            'seconds': round(time.perf_counter() - started, 3)
+        }
+    }
+
+
+def resolve_conflicts(stage: Stage, inputs: List[str], results: List[dict], on_conflict: str):
+    """
+    Decide which file each record is taken from. A key found in several files
+    is taken from the first or the last of them (on_conflict). It only counts
+    as a conflict when the rows differ; identical rows are duplicates. A
+    standard code described differently by different files is reported but
+    left alone: the loader takes the description of its first lesson.
+
+    Returns ({key: index of the file it is kept from}, conflicts, duplicate count).
+    """
+    # Which file each key was first seen in, and the keys that more than one file has
+    first_file: Dict[str, int] = {}
+    shared = set()
+    standards: Dict[str, Tuple[int, str]] = {}
+    described: Dict[str, Dict[str, set]] = {}
+    for index, result in enumerate(results):
+        for row in result['rows']:
+            if first_file.setdefault(row[KEY], index) != index:
+                shared.add(row[KEY])
+            if row[CODE]:
+                first = standards.setdefault(row[CODE], (index, row[DESCRIPTION]))
+                if first[0] != index and first[1] != row[DESCRIPTION]:
+                    described.setdefault(row[CODE], {first[1]: {first[0]}}).setdefault(row[DESCRIPTION], set()).add(index)
+
+    versions: Dict[str, Dict[int, set]] = {}
+    for index, result in enumerate(results):
+        for row in result['rows']:
+            if row[KEY] in shared:
+                versions.setdefault(row[KEY], {}).setdefault(index, set()).add(row[HASH])
+
+    kept = {}
+    conflicts = []
+    duplicates = 0
+    for key in sorted(versions):
+        files = versions[key]
+        kept[key] = min(files) if on_conflict == 'first' else max(files)
+        hashes = list(files.values())
+        if all(other == hashes[0] for other in hashes[1:]):
+            duplicates += 1
+            continue
+        conflicts.append({
+            'kind': stage.kind,
+            'key': key,
+            'files': [inputs[index] for index in sorted(files)],
+            'kept': inputs[kept[key]]
+        })
+    for code in sorted(described):
+        files = sorted(set().union(*described[code].values()))
+        conflicts.append({'kind': 'standard', 'key': code, 'files': [inputs[index] for index in files], 'kept': None})
+    return kept, conflicts, duplicates
+
+
+def convert(name: str, inputs, output_path: str, previous: Optional[dict] = None, jobs: int = 1,
+            on_conflict: str = 'first') -> dict:
+    """
+    Run stage name over the exports named by inputs (see expand_inputs) into
+    output_path. Files are converted in up to jobs worker processes and
+    merged in path order, so the output does not depend on which worker
+    finishes first. With a previous manifest entry whose output is still
+    in place, unchanged files are not read at all and unchanged rows of the
+    others are copied from the previous output. Returns the stage's manifest
+    entry, with run statistics under 'last_run'; raises BuildConflict, leaving
+    the output untouched, if exports conflict and on_conflict is 'error'.
+    """
+    if on_conflict not in CONFLICT_POLICIES:
+        raise ValueError(f"on_conflict must be one of {', '.join(CONFLICT_POLICIES)}")
+    started = time.perf_counter()
+    stage = STAGES[name]
+    inputs = expand_inputs(inputs)
+    previous_files = {}
+    if previous and previous.get('version') == BUILD_VERSION and file_digest(output_path) == previous.get('output_sha256'):
+        previous_files = previous.get('files', {})
+
+    work_dir = tempfile.mkdtemp(prefix='.ingest-', dir=os.path.dirname(os.path.abspath(output_path)))
+    try:
+        results: List[Optional[dict]] = [None] * len(inputs)
+        pending = []
+        for index, path in enumerate(inputs):
+            entry = previous_files.get(path)
+            if entry and file_is_current(entry, path) and all(row[OFFSET] is not None for row in entry['rows']):
+                results[index] = {
+                    'source': output_path,
+                    'signature': file_signature(path),
+                    'sha256': entry['sha256'],
+                    'rows': entry['rows'],
+                    'run': {'status': 'unchanged', 'records': len(entry['rows'])}
+                }
+                continue
+            reusable = {row[HASH]: row for row in entry['rows'] if row[OFFSET] is not None} if entry else None
+            pending.append((index, (name, path, os.path.join(work_dir, f"{index}.part"), output_path, reusable)))
+
+        if jobs > 1 and len(pending) > 1:
+            with ProcessPoolExecutor(max_workers=min(jobs, len(pending))) as pool:
+                futures = [(index, pool.submit(convert_file, *args)) for index, args in pending]
+                for index, future in futures:
+                    results[index] = future.result()
+        else:
+            for index, args in pending:
+                results[index] = convert_file(*args)
+
+        kept, conflicts, duplicates = resolve_conflicts(stage, inputs, results, on_conflict)
+        if conflicts and on_conflict == 'error':
+            raise BuildConflict(conflicts)
+
+        writer = SpooledJSONWriter(output_path, stage.format)
+        placed = []
+        try:
+            for index, result in enumerate(results):
+                with open(result['source'], 'rb') as source:
+                    for row in result['rows']:
+                        if kept.get(row[KEY], index) != index:
+                            continue
+                        source.seek(row[OFFSET])
+                        placed.append((row, writer.add(row[GROUP], source.read(row[LENGTH]))))
+        except BaseException:
+            writer.abort()
+            raise
+        placements = writer.close()
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    # Rows a conflict dropped keep their entry without an offset, so the file is converted again next time
+    positions = {id(row): placements[index] for row, index in placed}
+    files = {}
+    for path, result in zip(inputs, results):
+        rows = []
+        for row in result['rows']:
+            offset, length = positions.get(id(row), (None, None))
+            rows.append([row[HASH], row[GROUP], offset, length, row[KEY], row[CODE], row[DESCRIPTION]])
+        files[path] = {'signature': result['signature'], 'sha256': result['sha256'], 'rows': rows}
+
+    runs = [dict(result['run'], path=path) for path, result in zip(inputs, results)]
+    converted = sum(run.get('converted', 0) for run in runs)
+    reused = sum(run['records'] if run['status'] == 'unchanged' else run['reused'] for run in runs)
+    entry = {
+        'version': BUILD_VERSION,
+        'inputs': inputs,
+        'files': files,
+        'output': os.path.abspath(output_path),
+        'output_sha256': file_digest(output_path),
+        'groups': writer.counts,
+        'last_run': {
+            'status': 'built',
+            'records': len(placed),
+            'converted': converted,
+            'reused': reused,
+            'duplicates': duplicates,
+            'conflicts': len(conflicts),
+            'conflict_examples': conflicts[:CONFLICT_REPORT_LIMIT],
+            'files': runs,
+            'seconds': round(time.perf_counter() - started, 3)
+        }
+    }
+    logger.info(f"{name}: {len(placed)} records from {len(inputs)} files, {converted} converted, "
+                f"{duplicates} duplicates, {len(conflicts)} conflicts")
+    return entry
+
+
+def file_is_current(entry: dict, path: str) -> bool:
+    """Whether a file's manifest entry still describes it (hashing it only if it was touched)."""
+    signature = file_signature(path)
+    if signature is None:
+        return False
+    return list(signature) == list(entry.get('signature') or []) or file_digest(path) == entry.get('sha256')
+
+
+def is_current(entry: Optional[dict], inputs: List[str], output_path: str) -> bool:
+    """Whether entry still describes the exports inputs and output_path."""
+    if not entry or entry.get('version') != BUILD_VERSION:
+        return False
+    if entry.get('inputs') != inputs or entry.get('output') != os.path.abspath(output_path):
+        return False
+    if not all(file_is_current(entry['files'][path], path) for path in inputs):
+        return False
+    return file_digest(output_path) == entry.get('output_sha256')
+
+
+def load_manifest(path: str) -> dict:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {'stages': {}}
+    return manifest if isinstance(manifest.get('stages'), dict) else {'stages': {}}
+
+
+def save_manifest(path: str, manifest: dict) -> None:
+    partial = f"{path}.tmp"
+    with open(partial, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f)
+    os.replace(partial, path)
+
+
+def run_stage(manifest: dict, name: str, inputs, output_path: str, force: bool = False, jobs: int = 1,
+              on_conflict: str = 'first') -> dict:
+    """Bring output_path up to date with the exports named by inputs; returns the stage's run statistics."""
+    inputs = expand_inputs(inputs)
+    previous = manifest['stages'].get(name)
+    if not force and is_current(previous, inputs, output_path):
+        for path in inputs:
+            previous['files'][path]['signature'] = file_signature(path)
+        return {'status': 'unchanged'}
+    entry = convert(name, inputs, output_path, None if force else previous, jobs, on_conflict)
+    manifest['stages'][name] = entry
+    return entry['last_run']
+
+
+def build_snapshot(force: bool = False) -> dict:
+    """
+    Recompile the visualizer's snapshot if the JSON files changed since it
+    was compiled, reusing its layout when the graph's shape did not change.
+    """
+    from src.services import curriculum
+    from src.services.compiled_snapshot import CompiledSnapshot
+
+    started = time.perf_counter()
+    previous = CompiledSnapshot.open(curriculum.CONFIG['snapshot'])
+    if not force and previous is not None and all(
+        (file_digest(curriculum.get_json_path(name)) or '') == previous.source_digest(name)
+        for name in ('curriculum', 'ccc')
+    ):
+        return {'status': 'unchanged'}
+    curriculum.compile_snapshot(previous=None if force else previous)
+    return {'status': 'built', 'seconds': round(time.perf_counter() - started, 3)}
@@ -0,0 +1,241 @@
+import hashlib
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from src.utils.serialization import file_signature
+
+logger = logging.getLogger(__name__)
+
+
+# (signature, sha256) of recently hashed files, so one file is read once per change
+_digests: Dict[str, Tuple[Tuple[int, int], str]] = {}
+
+
+def file_digest(path: str) -> Optional[str]:
+    """sha256 of a file's contents, or None if it does not exist."""
+    signature = file_signature(path)
+    if signature is None:
+        return None
+    cached = _digests.get(path)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+    digest = hashlib.sha256()
+    try:
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+    except OSError:
+        return None
+    value = digest.hexdigest()
+    _digests[path] = (signature, value)
+    return value
+
+
+class Deferred:
+    """
+    A derived value built on first access rather than with the snapshot, for
+    structures that only some requests need.
+    """
+
+    def __init__(self, builder: Callable[[], Any]):
+        self.builder = builder
+
+
+class DataSnapshot:
+    """
+    Immutable view of the data files and everything derived from them.
+
+    A snapshot is fully built before it is published, so a reader that holds
+    one never sees a mix of old and new data. ``memo`` caches lazily derived
+    values (such as encoded responses) for the lifetime of the snapshot.
+    """
+
+    def __init__(self, version: int, data: Dict[str, Any], sources: Dict[str, dict], build_seconds: float):
+        self.version = version
+        self.data = data
+        self.sources = sources
+        self.build_seconds = build_seconds
+        self.built_at = time.time()
+        self._memo: Dict[str, Any] = {}
+        self._memo_lock = threading.Lock()
+
+    def __getitem__(self, name: str) -> Any:
+        value = self.data[name]
+        if isinstance(value, Deferred):
+            return self.memo(f"deferred:{name}", value.builder)
+        return value
+
+    def memo(self, name: str, builder: Callable[[], Any]) -> Any:
+        """Value of builder() computed at most once per snapshot."""
+        try:
+            return self._memo[name]
+        except KeyError:
+            pass
+        with self._memo_lock:
+            if name not in self._memo:
+                self._memo[name] = builder()
+            return self._memo[name]
+
+
+class DataStore:
+    """
+    Holds the current DataSnapshot and rebuilds it when the data files change.
+
+    ``sources`` maps a name to a function resolving the file path to watch.
+    ``loader(strict)`` reads the files and returns the base data; derived
+    structures registered with ``register_derived`` are built on top of it.
+    A background thread polls file signatures (mtime and size); when one
+    changes the file is hashed and the snapshot is rebuilt only if the
+    contents really differ. The new snapshot replaces the old one in a single
+    reference swap, off the request path.
+    """
+
+    def __init__(
+        self,
+        sources: Dict[str, Callable[[], str]],
+        loader: Callable[[bool], Dict[str, Any]],
+        poll_interval: float = 2.0
+    ):
+        self.sources = sources
+        self.loader = loader
+        self.poll_interval = poll_interval
+        self.rebuilds = 0
+        self.last_error: Optional[str] = None
+        self._derived: Dict[str, Callable[[Dict[str, Any]], Any]] = {}
+        self._snapshot: Optional[DataSnapshot] = None
+        self._signatures: Dict[str, Tuple[str, Optional[Tuple[int, int]]]] = {}
+        # Signatures of the files a strict rebuild last failed on; not retried until one changes
+        self._failed_signatures: Optional[Dict[str, Tuple[str, Optional[Tuple[int, int]]]]] = None
+        self._build_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def register_derived(self, name: str, builder: Callable[[Dict[str, Any]], Any]) -> None:
+        """
+        Build builder(data) into every snapshot under name. Builders run in
+        registration order and see the entries built before them; a builder
+        may return a Deferred to postpone the work to the first reader.
+        """
+        self._derived[name] = builder
+        self._snapshot = None
+
+    def snapshot(self) -> DataSnapshot:
+        """The current snapshot, built synchronously on first use."""
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._build_lock:
+                if self._snapshot is None:
+                    self._rebuild(strict=False)
+                snapshot = self._snapshot
+        return snapshot
+
+    def invalidate(self) -> None:
+        """Drop the current snapshot; the next reader rebuilds it."""
+        self._snapshot = None
+
+    def reload(self) -> DataSnapshot:
+        """Rebuild synchronously regardless of file changes."""
+        with self._build_lock:
+            self._rebuild(strict=False)
+            return self._snapshot
+
+    def _rebuild(self, strict: bool) -> None:
+        started = time.perf_counter()
+        sources = {}
+        for name, resolve in self.sources.items():
+            path = resolve()
+            sources[name] = {
+                'path': path,
+                'signature': file_signature(path),
+                'sha256': file_digest(path)
+            }
+
+        data = dict(self.loader(strict))
+        for name, builder in self._derived.items():
+            data[name] = builder(data)
+
+        version = self._snapshot.version + 1 if self._snapshot is not None else 1
+        build_seconds = time.perf_counter() - started
+        self._snapshot = DataSnapshot(version, data, sources, build_seconds)
+        self._signatures = {name: (info['path'], info['signature']) for name, info in sources.items()}
+        self._failed_signatures = None
+        self.rebuilds += 1
+        logger.info(f"Data snapshot v{version} built in {build_seconds:.3f}s")
+
+    def check(self) -> bool:
+        """
+        Rebuild if a watched file's contents changed. Returns True when a new
+        snapshot was published.
+        """
+        current = self._snapshot
+        if current is None:
+            self.snapshot()
+            return True
+
+        changed = False
+        signatures = {}
+        for name, resolve in self.sources.items():
+            path = resolve()
+            signature = file_signature(path)
+            signatures[name] = (path, signature)
+            if self._signatures.get(name) == (path, signature):
+                continue
+            if path == current.sources[name]['path'] and file_digest(path) == current.sources[name]['sha256']:
+                # Touched but not modified; remember the new signature and move on
+                self._signatures[name] = (path, signature)
+                continue
+            changed = True
+
+        if not changed or signatures == self._failed_signatures:
+            return False
+
+        with self._build_lock:
+            try:
+                self._rebuild(strict=True)
+            except Exception as e:
+                # Keep serving the previous snapshot; retry once a file changes again
+                self.last_error = str(e)
+                self._failed_signatures = signatures
+                logger.error(f"Data snapshot rebuild failed: {str(e)}")
+                return False
+        self.last_error = None
+        return True
+
+    def start(self) -> None:
+        """Start the background polling thread (idempotent)."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._watch, name='data-store-watcher', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.check()
+            except Exception as e:
+                logger.error(f"Data store watcher error: {str(e)}")
+
+    def status(self) -> dict:
+        snapshot = self.snapshot()
+        return {
+            'version': snapshot.version,
+            'built_at': snapshot.built_at,
+            'rebuild_seconds': snapshot.build_seconds,
+            'rebuilds': self.rebuilds,
+            'watching': self._thread is not None and self._thread.is_alive(),
+            'poll_interval': self.poll_interval,
+            'last_error': self.last_error,
+            'sources': {
+                name: {'path': info['path'], 'sha256': info['sha256']}
+                for name, info in snapshot.sources.items()
+            }
+        }
@@ -0,0 +1,323 @@
+"""
+Near-duplicate detection for questions, so a grading run pays for one
+representative per cluster instead of every copy.
+
+A question is reduced to a canonical text: the stimuli and prompt followed
+by the sorted choice texts, tokenized like the search index with every
+number replaced by ``0``. Its word 3-grams give a MinHash signature of
+NUM_PERM 32-bit values, each the minimum over the shingles of an
+independent hash (a SHAKE-128 digest sliced into NUM_PERM words, so one
+call per shingle yields the whole row).
+
+DedupIndex clusters questions in the order they are added. The signature
+is split into BANDS bands; a question whose band matches a cluster
+representative's and whose estimated Jaccard similarity to it reaches the
+threshold joins that cluster, otherwise it starts one. Only representatives
+are indexed, at most MAX_BUCKET per bucket so common phrasing cannot make
+inserts quadratic, and identical canonical texts skip the signature
+altogether. Signatures and buckets grow with the number of clusters; the
+keys and cluster ids grow with every question added, and the exact-text
+fingerprints with every distinct canonical text. ``cluster_questions`` can
+compute signatures in worker processes; the clusters do not depend on the
+number of workers.
+"""
+
+import asyncio
+import hashlib
+import re
+import struct
+import unicodedata
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from operator import eq
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+from src.services.search_index import tokenize
+
+NUM_PERM = 64
+BANDS = 16
+
+# Estimated Jaccard similarity of canonical 3-gram sets that counts as a duplicate
+THRESHOLD = 0.7
+
+SHINGLE_SIZE = 3
+
+# Clusters kept per LSH bucket; a band that many clusters share says little,
+# and uncapped buckets make every insert compare against all of them
+MAX_BUCKET = 8
+
+# Questions canonicalized (and signed by one worker call) at a time
+BATCH_SIZE = 20000
+CHUNK_SIZE = 1000
+
+# Concurrent grader calls made by grade_representatives
+GRADE_CONCURRENCY = 8
+
+_NUMBER = re.compile(r"\d+(?:[.,]\d+)*")
+_CHOICE_SEPARATOR = " | "
+
+
+def _field(question: Any, name: str) -> Any:
+    if isinstance(question, dict):
+        return question.get(name)
+    return getattr(question, name, None)
+
+
+def _normalize(text: Optional[str]) -> str:
+    if not text:
+        return ""
+    return " ".join(tokenize(_NUMBER.sub(" 0 ", unicodedata.normalize("NFKC", text))))
+
+
+def canonical_text(question: Any) -> str:
+    """
+    Canonical text of a Question, QuestionRecord or question dict: stimuli
+    and prompt, then the sorted choice texts, with numbers replaced by 0.
+    """
+    choices = _field(question, 'choices') or []
+    texts = sorted(_normalize(choice if isinstance(choice, str) else _field(choice, 'text')) for choice in choices)
+    parts = [_normalize(_field(question, 'stimuli')), _normalize(_field(question, 'prompt'))]
+    return _CHOICE_SEPARATOR.join([" ".join(part for part in parts if part)] + texts)
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> set:
+    """Word n-grams of a canonical text; shorter texts are a single shingle."""
+    words = text.split()
+    if len(words) <= size:
+        return {" ".join(words)}
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def minhash(text: str, num_perm: int = NUM_PERM) -> bytes:
+    """MinHash signature of a canonical text as num_perm little-endian uint32."""
+    codec = struct.Struct(f"<{num_perm}I")
+    length = codec.size
+    shake = hashlib.shake_128
+    rows = [codec.unpack(shake(shingle.encode("utf-8")).digest(length)) for shingle in shingles(text)]
+    return codec.pack(*map(min, zip(*rows)))
+
+
+def similarity(a: bytes, b: bytes) -> float:
+    """Estimated Jaccard similarity of two signatures."""
+    return _agreement(array("I", a), array("I", b))
+
+
+def _agreement(a: array, b: array) -> float:
+    return sum(map(eq, a, b)) / len(a)
+
+
+def _signatures(texts: List[str], num_perm: int) -> List[bytes]:
+    return [minhash(text, num_perm) for text in texts]
+
+
+class DedupIndex:
+    """
+    Leader clustering of questions over a MinHash LSH index.
+
+    The first question of each cluster is its representative. Questions are
+    identified by the key given to ``add`` (their position by default).
+    """
+
+    def __init__(self, threshold: float = THRESHOLD, num_perm: int = NUM_PERM, bands: int = BANDS):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self._band_width = num_perm // bands * 4
+        self._keys: List[Hashable] = []
+        self._cluster_of = array("I")
+        # Per cluster: the representative's position and signature
+        self._representatives = array("I")
+        self._signatures: List[array] = []
+        # Band bytes -> cluster id, or a list of up to MAX_BUCKET of them
+        self._buckets: List[Dict[bytes, Any]] = [{} for _ in range(bands)]
+        self._exact: Dict[bytes, int] = {}
+        self.exact_hits = 0
+        self.comparisons = 0
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    @property
+    def cluster_count(self) -> int:
+        return len(self._representatives)
+
+    def add(self, question: Any, key: Optional[Hashable] = None) -> int:
+        """Add a question; returns its cluster id."""
+        return self.add_canonical(canonical_text(question), key)
+
+    def add_canonical(self, text: str, key: Optional[Hashable] = None, signature: Optional[bytes] = None) -> int:
+        """Add a question by its canonical text (and signature, if already computed)."""
+        fingerprint = _fingerprint(text)
+        cluster = self._exact.get(fingerprint)
+        if cluster is None:
+            cluster = self._place(signature if signature is not None else minhash(text, self.num_perm))
+            self._exact[fingerprint] = cluster
+        else:
+            self.exact_hits += 1
+        self._cluster_of.append(cluster)
+        self._keys.append(len(self._keys) if key is None else key)
+        return cluster
+
+    def _place(self, signature: bytes) -> int:
+        width = self._band_width
+        bands = [signature[i * width:(i + 1) * width] for i in range(self.bands)]
+        values = array("I", signature)
+        best, best_score, seen = None, self.threshold, set()
+        for bucket, band in zip(self._buckets, bands):
+            found = bucket.get(band)
+            if found is None:
+                continue
+            for cluster in (found if isinstance(found, list) else (found,)):
+                if cluster in seen:
+                    continue
+                seen.add(cluster)
+                self.comparisons += 1
+                score = _agreement(values, self._signatures[cluster])
+                if score > best_score or (score == best_score and (best is None or cluster < best)):
+                    best, best_score = cluster, score
+        if best is not None:
+            return best
+
+        cluster = len(self._representatives)
+        self._representatives.append(len(self._keys))
+        self._signatures.append(values)
+        for bucket, band in zip(self._buckets, bands):
+            found = bucket.get(band)
+            if found is None:
+                bucket[band] = cluster
+            elif isinstance(found, list):
+                if len(found) < MAX_BUCKET:
+                    found.append(cluster)
+            else:
+                bucket[band] = [found, cluster]
+        return cluster
+
+    def cluster_of(self, position: int) -> int:
+        """Cluster id of the question added at position."""
+        return self._cluster_of[position]
+
+    def representative_of(self, position: int) -> Hashable:
+        """Key of the representative of the question added at position."""
+        return self._keys[self._representatives[self._cluster_of[position]]]
+
+    def representatives(self) -> List[Hashable]:
+        """Keys of the cluster representatives, in the order they were added."""
+        return [self._keys[position] for position in self._representatives]
+
+    def clusters(self) -> List[List[Hashable]]:
+        """Member keys of every cluster, representative first."""
+        members: List[List[Hashable]] = [[] for _ in self._representatives]
+        for key, cluster in zip(self._keys, self._cluster_of):
+            members[cluster].append(key)
+        return members
+
+    def stats(self) -> Dict[str, Any]:
+        count = len(self._keys)
+        return {
+            "questions": count,
+            "clusters": self.cluster_count,
+            "duplicates": count - self.cluster_count,
+            "exact_duplicates": self.exact_hits,
+            "comparisons": self.comparisons,
+            "threshold": self.threshold,
+            "num_perm": self.num_perm,
+            "bands": self.bands,
+        }
+
+
+def _fingerprint(text: str) -> bytes:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest()
+
+
+def cluster_questions(
+    questions: Iterable[Any],
+    keys: Optional[Iterable[Hashable]] = None,
+    index: Optional[DedupIndex] = None,
+    jobs: int = 1,
+    batch_size: int = BATCH_SIZE
+) -> DedupIndex:
+    """
+    Add questions to index (a new DedupIndex by default) and return it.
+
+    Questions are canonicalized in batches; with jobs > 1 the signatures of
+    each batch's new canonical texts are computed in that many processes.
+    """
+    index = index if index is not None else DedupIndex()
+    key_iter = iter(keys) if keys is not None else None
+    pool = ProcessPoolExecutor(max_workers=jobs) if jobs > 1 else None
+    try:
+        batch: List[Tuple[Optional[Hashable], str]] = []
+        for question in questions:
+            batch.append((next(key_iter) if key_iter is not None else None, canonical_text(question)))
+            if len(batch) >= batch_size:
+                _add_batch(index, batch, pool)
+                batch = []
+        if batch:
+            _add_batch(index, batch, pool)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return index
+
+
+def _add_batch(index: DedupIndex, batch: List[Tuple[Optional[Hashable], str]], pool: Optional[ProcessPoolExecutor]) -> None:
+    # Sign each new canonical text once; repeats are resolved by add_canonical's exact lookup
+    pending: Dict[str, Optional[bytes]] = {}
+    for _, text in batch:
+        if text not in pending and _fingerprint(text) not in index._exact:
+            pending[text] = None
+    texts = list(pending)
+    if pool is not None and len(texts) > CHUNK_SIZE:
+        chunks = [texts[i:i + CHUNK_SIZE] for i in range(0, len(texts), CHUNK_SIZE)]
+        signatures = [signature for part in pool.map(_signatures, chunks, [index.num_perm] * len(chunks)) for signature in part]
+    else:
+        signatures = _signatures(texts, index.num_perm)
+    pending = dict(zip(texts, signatures))
+    for key, text in batch:
+        index.add_canonical(text, key, pending.get(text))
+
+
+def _as_dict(question: Any) -> Dict:
+    if isinstance(question, dict):
+        return question
+    if hasattr(question, 'model_dump'):
+        return question.model_dump(mode="json")
+    return question.to_dict()
+
+
+async def grade_representatives(
+    grader,
+    questions: Sequence[Any],
+    index: Optional[DedupIndex] = None,
+    concurrency: int = GRADE_CONCURRENCY
+) -> List[Dict]:
+    """
+    Grade one representative per cluster of questions and return a result
+    per question.
+
+    index must hold questions at their positions (cluster_questions(questions)
+    is built when it is None). A duplicate gets its representative's result
+    with ``duplicate_of`` set to the representative's position. A grader
+    error fails only its cluster, with ``passed`` False and ``error`` set.
+    """
+    if index is None:
+        index = cluster_questions(questions)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def grade(position: int) -> Dict:
+        async with semaphore:
+            try:
+                return await grader.grade_question(_as_dict(questions[position]))
+            except Exception as e:
+                return {'passed': False, 'error': str(e)}
+
+    representatives = index.representatives()
+    graded = dict(zip(representatives, await asyncio.gather(*(grade(position) for position in representatives))))
+    results = []
+    for position in range(len(questions)):
+        representative = index.representative_of(position)
+        result = graded[representative]
+        results.append(result if representative == position else {**result, "duplicate_of": representative})
+    return results
@@ -0,0 +1,241 @@
+"""
+Question generation with the grader in the loop.
+
+``generate`` drafts k candidates for a template Question concurrently, each
+prompted with the template's standard, lesson and difficulty and with the
+matching standard and lesson (description and sample questions) from the
+curriculum data. Every candidate runs through the deterministic checks in
+``check_question`` as soon as its draft arrives and, if it passes them,
+through ``QuestionGrader``. The first candidate the grader passes is
+returned and the drafts and gradings still in flight are cancelled, so the
+time to the first valid question is that of the fastest passing candidate
+rather than of draft and grade run back to back.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import statistics
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+from src.models.question import Question
+from src.services.dedup import THRESHOLD, canonical_text, minhash, similarity
+
+logger = logging.getLogger(__name__)
+
+GENERATION_MODEL = os.getenv("INCEPT_GENERATION_MODEL", "gpt-4o-mini")
+
+# Candidates drafted concurrently per request
+GENERATION_CANDIDATES = int(os.getenv("INCEPT_GENERATION_CANDIDATES", "4"))
+
+# Seconds a request may take before the remaining candidates are cancelled
+GENERATION_TIMEOUT = float(os.getenv("INCEPT_GENERATION_TIMEOUT", "60"))
+
+# Sample questions from the curriculum shown to the model as style examples
+CONTEXT_SAMPLES = 3
+
+# Recent time-to-first-valid measurements kept for stats()
+STATS_WINDOW = 1000
+
+# Metadata copied from the template onto every candidate
+TEMPLATE_FIELDS = ["subject", "grade", "standard", "lesson", "difficulty"]
+
+
+def generation_context(template: Question) -> Dict[str, Any]:
+    """The template's standard and lesson from the curriculum data, with a few sample questions."""
+    from src.services.curriculum import load_curriculum_structure
+
+    curriculum = load_curriculum_structure() or {}
+    standard = curriculum.get('standards_by_code', {}).get(template.standard) if template.standard else None
+    lessons = curriculum.get('lessons_by_title', {}).get(template.lesson, []) if template.lesson else []
+    if not lessons and template.standard:
+        lessons = curriculum.get('lessons_by_standard', {}).get(template.standard, [])
+    samples = []
+    for lesson in lessons:
+        samples.extend(lesson.get('sample_questions') or [])
+        if len(samples) >= CONTEXT_SAMPLES:
+            break
+    return {
+        'standard_description': (standard or {}).get('description') or next(
+            (lesson.get('standard_description') for lesson in lessons if lesson.get('standard_description')), None
+        ),
+        'lessons': [lesson.get('title') for lesson in lessons[:CONTEXT_SAMPLES]],
+        'sample_questions': samples[:CONTEXT_SAMPLES]
+    }
+
+
+def check_question(question: Question, template: Optional[Question] = None) -> List[str]:
+    """
+    Problems the deterministic checks find in a candidate, empty when it
+    passes. These run before the (slow, paid) grader.
+    """
+    problems = []
+    if not question.prompt.strip():
+        problems.append("empty prompt")
+    if question.interaction_type == "multiple_choice":
+        choices = question.choices or []
+        texts = [choice.text.strip().casefold() for choice in choices]
+        correct = [choice for choice in choices if choice.is_correct]
+        if len(choices) < 3:
+            problems.append("fewer than 3 choices")
+        if len(set(texts)) != len(texts):
+            problems.append("duplicate choices")
+        if len(correct) != 1:
+            problems.append(f"{len(correct)} correct choices")
+        elif correct[0].text.strip() != question.correct_answer.strip():
+            problems.append("correct_answer does not match the correct choice")
+        if any(not choice.explanation.strip() for choice in choices):
+            problems.append("choice without explanation")
+    else:
+        if not question.correct_answer.strip():
+            problems.append("no correct answer")
+        if not (question.grading_criteria or "").strip():
+            problems.append("free response without grading criteria")
+    if not question.solution.explanation.strip() or not question.solution.steps:
+        problems.append("incomplete solution")
+    if template is not None and template.prompt.strip():
+        if similarity(minhash(canonical_text(question)), minhash(canonical_text(template))) >= THRESHOLD:
+            problems.append("near-duplicate of the template")
+    return problems
+
+
+def _generation_prompt(template: Question, context: Dict[str, Any], index: int) -> str:
+    samples = "\n\n".join(context['sample_questions']) or "(none)"
+    return f"""Write one new {template.interaction_type.value.replace('_', ' ')} question for students.
+
+Subject: {template.subject or 'science'}
+Grade: {template.grade or 8}
+Standard: {template.standard} - {context['standard_description'] or ''}
+Lesson: {template.lesson or ', '.join(context['lessons'])}
+Difficulty: {template.difficulty or 2} (1 easy, 3 hard)
+
+Example question on the same topic (write a different one):
+{template.prompt}
+
+Sample questions from the curriculum, for style:
+{samples}
+
+This is variant {index + 1}; use a scenario of your own.
+Multiple choice questions need 4 choices with exactly one correct, and an
+explanation for every choice. Free response questions need grading criteria.
+
+Reply with only a JSON object with these fields:
+prompt, interaction_type, choices (list of text, is_correct, explanation, or null),
+correct_answer, solution (steps: list of strings, explanation), grading_criteria."""
+
+
+class QuestionGenerator:
+    """
+    Generates questions like a template by racing k candidates through
+    drafting, the deterministic checks and the grader.
+    """
+
+    def __init__(self, grader, client=None, model: str = GENERATION_MODEL, candidates: int = GENERATION_CANDIDATES):
+        self.grader = grader
+        # The grader's OpenAI client (and its connection pool) is reused by default
+        self.client = client if client is not None else getattr(grader, "client", None)
+        self.model = model
+        self.candidates = candidates
+        self.requests = 0
+        self.successes = 0
+        self._times = deque(maxlen=STATS_WINDOW)
+
+    async def _draft(self, template: Question, context: Dict[str, Any], index: int) -> Question:
+        """One candidate from the model, with the template's metadata."""
+        response = await self.client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": "You write high quality assessment questions. You reply with JSON only."},
+                {"role": "user", "content": _generation_prompt(template, context, index)}
+            ],
+            response_format={"type": "json_object"},
+            temperature=min(0.7 + 0.1 * index, 1.2)
+        )
+        data = json.loads(response.choices[0].message.content)
+        data.setdefault("interaction_type", template.interaction_type.value)
+        data.update({field: getattr(template, field) for field in TEMPLATE_FIELDS})
+        return Question.model_validate(data)
+
+    async def _candidate(self, template: Question, context: Dict[str, Any], index: int) -> Dict[str, Any]:
+        try:
+            question = await self._draft(template, context, index)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            return {"index": index, "stage": "draft", "reason": str(e)}
+        problems = check_question(question, template)
+        if problems:
+            return {"index": index, "stage": "checks", "reason": "; ".join(problems)}
+        try:
+            grade = await self.grader.grade_question(question.model_dump(mode="json"))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            return {"index": index, "stage": "grader", "reason": str(e)}
+        if not grade.get("passed"):
+            return {"index": index, "stage": "grader", "reason": grade.get("feedback") or "failed grading"}
+        return {"index": index, "stage": "passed", "question": question, "grade": grade}
+
+    async def generate(self, template: Question, candidates: Optional[int] = None, timeout: float = GENERATION_TIMEOUT) -> Dict[str, Any]:
+        """
+        The first of ``candidates`` concurrent candidates to pass the checks
+        and the grader. Returns the question (None when none passed), its
+        grade, time_to_first_valid in seconds and why the others were
+        rejected; candidates still running when one passes are cancelled.
+        """
+        started = time.perf_counter()
+        candidates = candidates or self.candidates
+        # Reads the data snapshot (a rebuild or SQLite lookups), so keep it off the event loop
+        context = await asyncio.to_thread(generation_context, template)
+        tasks = {asyncio.ensure_future(self._candidate(template, context, index)) for index in range(candidates)}
+        pending = tasks
+        rejected = []
+        winner = None
+        deadline = started + timeout
+        try:
+            while pending and winner is None:
+                done, pending = await asyncio.wait(pending, timeout=max(0.0, deadline - time.perf_counter()),
+                                                   return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    break
+                for task in done:
+                    result = task.result()
+                    if result["stage"] == "passed" and (winner is None or result["index"] < winner["index"]):
+                        winner = result
+                    elif result["stage"] != "passed":
+                        rejected.append({key: result[key] for key in ("index", "stage", "reason")})
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+        elapsed = time.perf_counter() - started
+        self.requests += 1
+        if winner is not None:
+            self.successes += 1
+            self._times.append(elapsed)
+        else:
+            logger.warning("No generated candidate passed (%d rejected, %d timed out)", len(rejected), len(pending))
+        return {
+            "question": winner["question"] if winner else None,
+            "grade": winner["grade"] if winner else None,
+            "time_to_first_valid": elapsed if winner else None,
+            "candidates": candidates,
+            "cancelled": len(pending),
+            "rejected": sorted(rejected, key=lambda rejection: rejection["index"])
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        times = sorted(self._times)
+        return {
+            "requests": self.requests,
+            "successes": self.successes,
+            "success_rate": self.successes / self.requests if self.requests else 0.0,
+            "candidates": self.candidates,
+            "time_to_first_valid_p50": statistics.median(times) if times else None,
+            "time_to_first_valid_p95": times[min(len(times) - 1, int(len(times) * 0.95))] if times else None,
+        }
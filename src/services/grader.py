@@ -1,13 +1,28 @@
 from typing import Dict, List, Optional
 import os
-from openai import AsyncOpenAI
 import json
 import re
-import httpx
+
+from src.services.cache import TieredCache, get_cache, make_key
+
+# Grading the same question twice gives the same verdict; keep results for a day
+GRADE_CACHE_TTL = 86400.0
+
+GRADER_MODEL = "gpt-4o-mini"
+
+# Part of every cached verdict's key; bump it whenever the grading prompts,
+# criteria or response parsing change so no worker serves old verdicts
+GRADER_VERSION = 1
 
 class QuestionGrader:
-    def __init__(self):
+    def __init__(self, cache: Optional[TieredCache] = None):
         """Initialize the grader with OpenAI client."""
+        self.cache = cache if cache is not None else get_cache("grade")
+        
+        # openai and httpx are slow to import; only pay for them once a grader is built
+        import httpx
+        from openai import AsyncOpenAI
+        
         # Create a clean httpx client without proxies
         self.http_client = httpx.AsyncClient(timeout=60.0)
         
@@ -44,53 +59,59 @@ class QuestionGrader:
     
     async def grade_question(self, question: Dict) -> Dict:
         """Grade a question and return detailed feedback."""
+        return await self.cache.aget_or_set(
+            make_key("grade", GRADER_VERSION, GRADER_MODEL, question),
+            lambda: self._grade_question(question),
+            GRADE_CACHE_TTL,
+        )
+
+    async def _grade_question(self, question: Dict) -> Dict:
+        # Construct prompt for LLM
+        prompt = self._construct_grading_prompt(question)
         
-        try:
-            # Construct prompt for LLM
-            prompt = self._construct_grading_prompt(question)
-            
-            # Log what we're sending to LLM
-            print("\n=== SENDING TO LLM ===")
-            print(f"Question being graded: {json.dumps(question, indent=2)}")
-            print(f"\nPrompt: {prompt}")
-            
-            # Get LLM evaluation
-            response = await self.client.chat.completions.create(
-                model="gpt-4o-mini",  # Using GPT-4 for high precision
-                messages=[
-                    {"role": "system", "content": """You are an expert educational content evaluator. 
+        # Log what we're sending to LLM
+        print("\n=== SENDING TO LLM ===")
+        print(f"Question being graded: {json.dumps(question, indent=2)}")
+        print(f"\nPrompt: {prompt}")
+        
+        # Get LLM evaluation
+        response = await self.client.chat.completions.create(
+            model=GRADER_MODEL,
+            messages=[
+                {"role": "system", "content": """You are an expert educational content evaluator. 
 Your task is to evaluate questions for quality and provide detailed feedback.
 You must be extremely strict in your evaluation as these questions will be used to teach students.
 A question must pass ALL criteria to be considered acceptable.
 If you find ANY issues, the question must fail.
 Provide specific, actionable feedback for any failures."""},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.1  # Low temperature for consistent evaluation
-            )
-            
-            # Log what LLM returned
-            print("\n=== LLM RESPONSE ===")
-            print(response.choices[0].message.content)
-            
-            # Parse LLM response into structured feedback
-            evaluation = self._parse_llm_response(response.choices[0].message.content)
-            
-            print("\n=== PARSED RESULT ===")
-            print(json.dumps(evaluation, indent=2))
-            
-            return {
-                "passed": evaluation["passed"],
-                "score": 1.0 if evaluation["passed"] else 0.0,
-                "feedback": evaluation["feedback"] if not evaluation["passed"] else None,
-                "scorecard": evaluation["scorecard"]
-            }
-        finally:
-            # Make sure we close the HTTP client
-            try:
-                await self.http_client.aclose()
-            except Exception as e:
-                print(f"Error closing HTTP client: {str(e)}")
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.1  # Low temperature for consistent evaluation
+        )
+        
+        # Log what LLM returned
+        print("\n=== LLM RESPONSE ===")
+        print(response.choices[0].message.content)
+        
+        # Parse LLM response into structured feedback
+        evaluation = self._parse_llm_response(response.choices[0].message.content)
+        
+        print("\n=== PARSED RESULT ===")
+        print(json.dumps(evaluation, indent=2))
+        
+        return {
+            "passed": evaluation["passed"],
+            "score": 1.0 if evaluation["passed"] else 0.0,
+            "feedback": evaluation["feedback"] if not evaluation["passed"] else None,
+            "scorecard": evaluation["scorecard"]
+        }
+
+    async def aclose(self) -> None:
+        """Close the HTTP client once the grader is no longer needed."""
+        try:
+            await self.http_client.aclose()
+        except Exception as e:
+            print(f"Error closing HTTP client: {str(e)}")
     
     def _construct_grading_prompt(self, question: Dict) -> str:
         """Construct the prompt for grading a question."""
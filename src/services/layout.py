@@ -0,0 +1,173 @@
+"""
+Node coordinates for the structure graph, computed once per data snapshot.
+
+Every graph gets a radial tree layout: standards on the inner ring, their
+lessons on the next one and CCC items outside, each subtree in its own
+angular sector. It is linear in the graph size, so it stays cheap with tens
+of thousands of nodes. When NumPy is installed, graphs of up to
+FORCE_LAYOUT_MAX_NODES nodes are then relaxed with a vectorized
+force-directed pass.
+"""
+
+import logging
+import math
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Distance between rings of the radial layout
+RING_GAP = 160.0
+
+# Minimum arc length between neighbouring nodes on a ring
+NODE_SPACING = 14.0
+
+# The force pass is O(n^2) per iteration; larger graphs keep the radial layout
+FORCE_LAYOUT_MAX_NODES = 1000
+FORCE_LAYOUT_ITERATIONS = 50
+FORCE_BLOCK_ROWS = 256
+
+Position = Tuple[float, float]
+
+
+def _spanning_forest(graph) -> Tuple[List[str], Dict[str, List[str]], Dict[str, int]]:
+    """
+    Roots, children and depth of a BFS forest grown from the standards.
+    Nodes that cannot be reached from a standard start trees of their own.
+    """
+    roots = [node_id for node_id, node in graph.nodes.items() if node['type'] == 'standard']
+    depth = {node_id: 0 for node_id in roots}
+    children: Dict[str, List[str]] = {}
+
+    def grow(start: List[str]) -> None:
+        queue = deque(start)
+        while queue:
+            node_id = queue.popleft()
+            for index in graph.adjacency[node_id]:
+                link = graph.links[index]
+                other = link['target'] if link['source'] == node_id else link['source']
+                if other not in depth:
+                    depth[other] = depth[node_id] + 1
+                    children.setdefault(node_id, []).append(other)
+                    queue.append(other)
+
+    grow(roots)
+    for node_id in graph.nodes:
+        if node_id not in depth:
+            depth[node_id] = 0
+            roots.append(node_id)
+            grow([node_id])
+    return roots, children, depth
+
+
+def radial_layout(graph) -> Dict[str, Position]:
+    """Radial tree layout; each subtree gets a sector sized by its leaf count."""
+    if not graph.nodes:
+        return {}
+    roots, children, depth = _spanning_forest(graph)
+
+    # Leaves below each node, children before parents (reverse BFS order)
+    order = sorted(depth, key=depth.get)
+    weight: Dict[str, int] = {}
+    for node_id in reversed(order):
+        weight[node_id] = sum(weight[child] for child in children.get(node_id, ())) or 1
+
+    # Rings grow with the number of nodes on them so neighbours never overlap
+    per_depth: Dict[int, int] = {}
+    for d in depth.values():
+        per_depth[d] = per_depth.get(d, 0) + 1
+    radius: Dict[int, float] = {}
+    previous = 0.0
+    for d in range(max(per_depth) + 1):
+        needed = per_depth.get(d, 0) * NODE_SPACING / (2 * math.pi)
+        radius[d] = max(previous + RING_GAP, needed)
+        previous = radius[d]
+
+    positions: Dict[str, Position] = {}
+    total = sum(weight[root] for root in roots)
+    stack = []
+    start = 0.0
+    for root in roots:
+        span = 2 * math.pi * weight[root] / total
+        stack.append((root, start, span))
+        start += span
+    while stack:
+        node_id, start, span = stack.pop()
+        angle = start + span / 2
+        r = radius[depth[node_id]]
+        positions[node_id] = (round(r * math.cos(angle), 1), round(r * math.sin(angle), 1))
+        child_start = start
+        for child in children.get(node_id, ()):
+            child_span = span * weight[child] / weight[node_id]
+            stack.append((child, child_start, child_span))
+            child_start += child_span
+    return positions
+
+
+def force_layout(graph, initial: Dict[str, Position], iterations: int = FORCE_LAYOUT_ITERATIONS) -> Optional[Dict[str, Position]]:
+    """
+    Fruchterman-Reingold relaxation of initial positions using NumPy.
+    Returns None when NumPy is not installed.
+    """
+    try:
+        import numpy as np
+    except ImportError:
+        return None
+
+    ids = list(graph.nodes)
+    count = len(ids)
+    if count < 2:
+        return dict(initial)
+    index = {node_id: i for i, node_id in enumerate(ids)}
+    pos = np.array([initial[node_id] for node_id in ids], dtype=np.float64)
+    if graph.links:
+        edges = np.array([(index[link['source']], index[link['target']]) for link in graph.links], dtype=np.intp)
+    else:
+        edges = np.empty((0, 2), dtype=np.intp)
+
+    k = RING_GAP / 2
+    extent = float(np.ptp(pos, axis=0).max()) or RING_GAP
+    temperature = extent / 10
+    cooling = temperature / (iterations + 1)
+    for _ in range(iterations):
+        # Repulsion k^2/d between every pair, a block of rows at a time to bound memory
+        x, y = pos[:, 0], pos[:, 1]
+        displacement = np.empty_like(pos)
+        for start in range(0, count, FORCE_BLOCK_ROWS):
+            stop = min(start + FORCE_BLOCK_ROWS, count)
+            dx = x[start:stop, None] - x[None, :]
+            dy = y[start:stop, None] - y[None, :]
+            strength = dx * dx
+            strength += dy * dy
+            np.maximum(strength, 1e-4, out=strength)
+            np.divide(k * k, strength, out=strength)
+            rows = np.arange(stop - start)
+            strength[rows, rows + start] = 0.0
+            displacement[start:stop, 0] = (dx * strength).sum(axis=1)
+            displacement[start:stop, 1] = (dy * strength).sum(axis=1)
+
+        if len(edges):
+            # Attraction d^2/k along links
+            link_delta = pos[edges[:, 0]] - pos[edges[:, 1]]
+            link_distance = np.maximum(np.sqrt((link_delta ** 2).sum(axis=1)), 0.01)
+            pull = link_delta * (link_distance / k)[:, None]
+            np.subtract.at(displacement, edges[:, 0], pull)
+            np.add.at(displacement, edges[:, 1], pull)
+
+        length = np.maximum(np.sqrt((displacement ** 2).sum(axis=1)), 0.01)
+        pos += displacement / length[:, None] * np.minimum(length, temperature)[:, None]
+        temperature -= cooling
+
+    pos -= pos.mean(axis=0)
+    return {node_id: (round(float(x), 1), round(float(y), 1)) for node_id, (x, y) in zip(ids, pos)}
+
+
+def compute_layout(graph) -> Dict[str, Position]:
+    """Coordinates for every node of graph, centred on the origin."""
+    positions = radial_layout(graph)
+    if 1 < len(positions) <= FORCE_LAYOUT_MAX_NODES:
+        relaxed = force_layout(graph, positions)
+        if relaxed is not None:
+            positions = relaxed
+    logger.info(f"Laid out {len(positions)} nodes")
+    return positions
@@ -0,0 +1,604 @@
+"""
+Export questions and articles as QTI 3.0 documents (see QTI.md).
+
+``question_to_item`` turns a Question, QuestionRecord or question dict into
+an assessment item in the QTI API's JSON format and ``article_to_stimulus``
+turns an article into a shared stimulus; ``item_to_xml`` and
+``stimulus_to_xml`` render the same documents as QTI XML. Identifiers are
+derived from the content, so exporting a question again updates the same
+item, and a question's stimuli become a shared stimulus that every question
+with the same passage references.
+
+``iter_documents`` converts a stream of questions lazily, emitting each
+shared stimulus once before the first item that uses it. ``write_documents``
+writes them to a directory or a JSON Lines file, and ``QTIUploader`` posts
+them to the QTI API with bounded concurrency and retries. Both consume the
+stream as they go, so memory does not grow with the number of items (only
+with the number of distinct stimuli, whose identifiers are remembered).
+``StandInQTIServer`` is a local HTTP server accepting the same requests,
+for tests and dry runs.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import random
+import threading
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+from xml.sax.saxutils import escape, quoteattr
+
+logger = logging.getLogger(__name__)
+
+QTI_API_URL = os.getenv("QTI_API_URL", "https://alpha-qti-api-43487de62e73.herokuapp.com")
+
+ITEMS_PATH = "/api/assessment-items"
+STIMULI_PATH = "/api/stimuli"
+
+# Namespace of the content-derived identifiers
+IDENTIFIER_NAMESPACE = uuid.UUID("5d0b6c84-2f0e-4d7b-9a51-3f1c2a6e8b90")
+
+QTI_NAMESPACE = "http://www.imsglobal.org/xsd/imsqtiasi_v3p0"
+
+# Outcome the XML items score into; the QTI API's JSON items leave scoring to the API
+SCORE_DECLARATION = {"identifier": "SCORE", "cardinality": "single", "baseType": "float"}
+
+TITLE_LENGTH = 80
+
+# Question difficulty (1-3) as QTI metadata
+DIFFICULTIES = {1: "easy", 2: "medium", 3: "hard"}
+
+# Requests in flight per uploader, and attempts per document
+UPLOAD_CONCURRENCY = 8
+UPLOAD_ATTEMPTS = 4
+UPLOAD_BACKOFF = 0.5
+UPLOAD_TIMEOUT = 30.0
+
+# Responses worth retrying; anything else below 400 is success and above is a rejection
+RETRY_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+
+FORMATS = ("json", "xml")
+
+Document = Tuple[str, str, Dict[str, Any]]
+
+
+class QTIExportError(Exception):
+    """A document the QTI API rejected, or could not be reached for."""
+    pass
+
+
+def _field(value: Any, name: str, default: Any = None) -> Any:
+    if isinstance(value, dict):
+        return value.get(name, default)
+    return getattr(value, name, default)
+
+
+def content_identifier(kind: str, *parts: Any) -> str:
+    """Stable identifier for a document with this content."""
+    digest = hashlib.blake2b(json.dumps([kind, *parts], ensure_ascii=False).encode("utf-8"), digest_size=16).hexdigest()
+    return str(uuid.uuid5(IDENTIFIER_NAMESPACE, digest))
+
+
+def _title(text: str) -> str:
+    text = " ".join(text.split())
+    return text if len(text) <= TITLE_LENGTH else text[:TITLE_LENGTH - 1].rstrip() + "…"
+
+
+def _paragraphs(text: str) -> str:
+    """Plain text as escaped HTML paragraphs (so the result is also well-formed XML)."""
+    blocks = [" ".join(block.split()) for block in text.replace("\r\n", "\n").split("\n\n")]
+    return "".join(f"<p>{escape(block)}</p>" for block in blocks if block)
+
+
+def _metadata(source: Any) -> Dict[str, Any]:
+    metadata = {}
+    for name in ("subject", "grade", "standard", "lesson"):
+        value = _field(source, name)
+        if value is not None:
+            metadata[name] = str(value)
+    difficulty = _field(source, "difficulty")
+    if difficulty is not None:
+        metadata["difficulty"] = DIFFICULTIES.get(difficulty, str(difficulty))
+    return metadata
+
+
+def article_to_stimulus(article: Any, identifier: Optional[str] = None, title: Optional[str] = None) -> Dict[str, Any]:
+    """A shared stimulus (QTI API JSON) for an article or any object with ``content``."""
+    content = _field(article, "content") or ""
+    return {
+        "identifier": identifier or content_identifier("stimulus", content),
+        "title": title or _field(article, "title") or _title(content),
+        "language": "en",
+        "metadata": _metadata(article),
+        "content": f'<div class="qti-shared-stimulus-wrapper">{_paragraphs(content)}</div>'
+    }
+
+
+def _interaction_type(question: Any) -> str:
+    interaction_type = _field(question, "interaction_type")
+    return getattr(interaction_type, "value", interaction_type)
+
+
+def _solution_html(question: Any, correct: bool) -> str:
+    solution = _field(question, "solution")
+    steps = _field(solution, "steps") or []
+    explanation = _field(solution, "explanation") or ""
+    summary = "Correct." if correct else f"Not quite. The correct answer is {escape(_field(question, 'correct_answer') or '')}."
+    html = f"<p>{summary}</p>{_paragraphs(explanation)}"
+    if steps:
+        html += "<ol>" + "".join(f"<li>{escape(step)}</li>" for step in steps) + "</ol>"
+    return html
+
+
+def question_to_item(question: Any, identifier: Optional[str] = None, stimulus_identifier: Optional[str] = None) -> Dict[str, Any]:
+    """
+    An assessment item (QTI API JSON) for a question: a choice item for
+    multiple choice, a text-entry item for free response.
+    """
+    prompt = _field(question, "prompt") or ""
+    choices = _field(question, "choices") or []
+    images = _field(question, "images") or []
+    multiple_choice = _interaction_type(question) == "multiple_choice" and bool(choices)
+    item_type = "choice" if multiple_choice else "text-entry"
+
+    if multiple_choice:
+        labels = [chr(ord("A") + i) if i < 26 else f"C{i}" for i in range(len(choices))]
+        correct = [label for label, choice in zip(labels, choices) if _field(choice, "is_correct")]
+        interaction = {
+            "type": "choice",
+            "responseIdentifier": "RESPONSE",
+            "shuffle": False,
+            "maxChoices": 1 if len(correct) <= 1 else len(correct),
+            "questionStructure": {
+                "prompt": escape(prompt),
+                "choices": [
+                    {
+                        "identifier": label,
+                        "content": escape(_field(choice, "text") or ""),
+                        "feedbackInline": escape(_field(choice, "explanation") or ""),
+                        "feedbackOutcomeIdentifier": "FEEDBACK-INLINE"
+                    }
+                    for label, choice in zip(labels, choices)
+                ]
+            }
+        }
+        response = {"identifier": "RESPONSE", "cardinality": "single" if len(correct) <= 1 else "multiple",
+                    "baseType": "identifier", "correctResponse": {"value": correct}}
+    else:
+        correct_answer = _field(question, "correct_answer") or ""
+        interaction = {
+            "type": "text-entry",
+            "responseIdentifier": "RESPONSE",
+            "attributes": {"expected-length": max(len(correct_answer), 1)},
+            "questionStructure": {"prompt": escape(prompt)}
+        }
+        response = {"identifier": "RESPONSE", "cardinality": "single", "baseType": "string",
+                    "correctResponse": {"value": [correct_answer]}}
+
+    processing = {
+        "templateType": "match_correct",
+        "responseDeclarationIdentifier": "RESPONSE",
+        "outcomeIdentifier": "FEEDBACK",
+        "correctResponseIdentifier": "CORRECT",
+        "incorrectResponseIdentifier": "INCORRECT"
+    }
+    outcomes = [{"identifier": "FEEDBACK", "cardinality": "single", "baseType": "identifier"}]
+    if multiple_choice:
+        processing["inlineFeedback"] = {"outcomeIdentifier": "FEEDBACK-INLINE", "variableIdentifier": "RESPONSE"}
+        outcomes.append({"identifier": "FEEDBACK-INLINE", "cardinality": "single", "baseType": "identifier"})
+
+    item = {
+        "type": item_type,
+        "identifier": identifier or content_identifier("item", _field(question, "prompt"), [_field(c, "text") for c in choices],
+                                                       _field(question, "correct_answer"), _field(question, "stimuli")),
+        "title": _title(prompt),
+        "metadata": _metadata(question),
+        "interaction": interaction,
+        "responseDeclarations": [response],
+        "outcomeDeclarations": outcomes,
+        "responseProcessing": processing,
+        "feedbackBlock": [
+            {"outcomeIdentifier": "FEEDBACK", "identifier": "CORRECT", "showHide": "show", "content": _solution_html(question, True)},
+            {"outcomeIdentifier": "FEEDBACK", "identifier": "INCORRECT", "showHide": "show", "content": _solution_html(question, False)}
+        ]
+    }
+    if images:
+        item["preInteraction"] = "".join(
+            f"<img src={quoteattr(_field(image, 'url') or '')} alt={quoteattr(_field(image, 'alt_text') or '')}/>" for image in images
+        )
+    grading_criteria = _field(question, "grading_criteria")
+    if grading_criteria:
+        item["rubrics"] = [{"use": "ext:criteria", "view": "scorer", "body": _paragraphs(grading_criteria)}]
+    if stimulus_identifier:
+        item["stimulus"] = {"identifier": stimulus_identifier}
+    return item
+
+
+def _attributes(**attributes: Any) -> str:
+    parts = []
+    for name, value in attributes.items():
+        if value is None:
+            continue
+        if isinstance(value, bool):
+            value = "true" if value else "false"
+        parts.append(f" {name.replace('_', '-')}={quoteattr(str(value))}")
+    return "".join(parts)
+
+
+def _declaration(tag: str, declaration: Dict[str, Any]) -> str:
+    attributes = _attributes(identifier=declaration["identifier"], cardinality=declaration["cardinality"], base_type=declaration["baseType"])
+    values = (declaration.get("correctResponse") or {}).get("value")
+    if values is None:
+        return f"<{tag}{attributes}/>"
+    correct = "".join(f"<qti-value>{escape(value)}</qti-value>" for value in values)
+    return f"<{tag}{attributes}><qti-correct-response>{correct}</qti-correct-response></{tag}>"
+
+
+def _set_outcome(identifier: str, base_type: str, value: str) -> str:
+    return (f"<qti-set-outcome-value{_attributes(identifier=identifier)}>"
+            f"<qti-base-value{_attributes(base_type=base_type)}>{value}</qti-base-value></qti-set-outcome-value>")
+
+
+def _response_processing(item: Dict[str, Any]) -> str:
+    """
+    match_correct written out, since the standard template only sets SCORE:
+    also sets the FEEDBACK outcome to the correct/incorrect identifier and
+    copies the response into the inline feedback outcome.
+    """
+    processing = item["responseProcessing"]
+    response = processing["responseDeclarationIdentifier"]
+    feedback = processing["outcomeIdentifier"]
+    parts = [
+        "<qti-response-processing>",
+        "<qti-response-condition>",
+        "<qti-response-if>",
+        f"<qti-match><qti-variable{_attributes(identifier=response)}/><qti-correct{_attributes(identifier=response)}/></qti-match>",
+        _set_outcome("SCORE", "float", "1"),
+        _set_outcome(feedback, "identifier", processing["correctResponseIdentifier"]),
+        "</qti-response-if>",
+        "<qti-response-else>",
+        _set_outcome("SCORE", "float", "0"),
+        _set_outcome(feedback, "identifier", processing["incorrectResponseIdentifier"]),
+        "</qti-response-else>",
+        "</qti-response-condition>"
+    ]
+    inline = processing.get("inlineFeedback")
+    if inline:
+        parts.append(f"<qti-set-outcome-value{_attributes(identifier=inline['outcomeIdentifier'])}>"
+                     f"<qti-variable{_attributes(identifier=inline['variableIdentifier'])}/></qti-set-outcome-value>")
+    parts.append("</qti-response-processing>")
+    return "".join(parts)
+
+
+def item_to_xml(item: Dict[str, Any]) -> str:
+    """QTI 3.0 XML for an assessment item built by question_to_item."""
+    interaction = item["interaction"]
+    structure = interaction["questionStructure"]
+    inline = item["responseProcessing"].get("inlineFeedback")
+    outcomes = [SCORE_DECLARATION]
+    for declaration in item["outcomeDeclarations"]:
+        if inline and declaration["identifier"] == inline["outcomeIdentifier"]:
+            # Holds the response, so it needs the response's cardinality
+            source = next(d for d in item["responseDeclarations"] if d["identifier"] == inline["variableIdentifier"])
+            declaration = dict(declaration, cardinality=source["cardinality"])
+        outcomes.append(declaration)
+    parts = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        f'<qti-assessment-item xmlns="{QTI_NAMESPACE}"'
+        f'{_attributes(identifier=item["identifier"], title=item["title"], adaptive=False, time_dependent=False)}>'
+    ]
+    parts += [_declaration("qti-response-declaration", declaration) for declaration in item["responseDeclarations"]]
+    parts += [_declaration("qti-outcome-declaration", declaration) for declaration in outcomes]
+    if "stimulus" in item:
+        identifier = item["stimulus"]["identifier"]
+        parts.append(f"<qti-assessment-stimulus-ref{_attributes(identifier=identifier, href=f'{identifier}.xml')}/>")
+    parts.append("<qti-item-body>")
+    if item.get("preInteraction"):
+        parts.append(f"<div>{item['preInteraction']}</div>")
+    if interaction["type"] == "choice":
+        parts.append(
+            f"<qti-choice-interaction{_attributes(response_identifier=interaction['responseIdentifier'], shuffle=interaction['shuffle'], max_choices=interaction['maxChoices'])}>"
+            f"<qti-prompt>{structure['prompt']}</qti-prompt>"
+        )
+        for choice in structure["choices"]:
+            feedback = ""
+            if choice.get("feedbackInline"):
+                feedback = (f"<qti-feedback-inline{_attributes(outcome_identifier=choice['feedbackOutcomeIdentifier'], identifier=choice['identifier'], show_hide='show')}>"
+                            f"{choice['feedbackInline']}</qti-feedback-inline>")
+            parts.append(f"<qti-simple-choice{_attributes(identifier=choice['identifier'])}>{choice['content']}{feedback}</qti-simple-choice>")
+        parts.append("</qti-choice-interaction>")
+    else:
+        attributes = interaction.get("attributes", {})
+        parts.append(
+            f"<p>{structure['prompt']}</p>"
+            f"<p><qti-text-entry-interaction{_attributes(response_identifier=interaction['responseIdentifier'], expected_length=attributes.get('expected-length'))}/></p>"
+        )
+    for rubric in item.get("rubrics", []):
+        parts.append(f"<qti-rubric-block{_attributes(use=rubric['use'], view=rubric['view'])}><qti-content-body>{rubric['body']}</qti-content-body></qti-rubric-block>")
+    for block in item["feedbackBlock"]:
+        parts.append(
+            f"<qti-feedback-block{_attributes(outcome_identifier=block['outcomeIdentifier'], identifier=block['identifier'], show_hide=block['showHide'])}>"
+            f"<qti-content-body>{block['content']}</qti-content-body></qti-feedback-block>"
+        )
+    parts.append("</qti-item-body>")
+    parts.append(_response_processing(item))
+    parts.append("</qti-assessment-item>")
+    return "\n".join(parts)
+
+
+def stimulus_to_xml(stimulus: Dict[str, Any]) -> str:
+    """QTI 3.0 XML for a shared stimulus built by article_to_stimulus."""
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        f'<qti-assessment-stimulus xmlns="{QTI_NAMESPACE}"'
+        f'{_attributes(identifier=stimulus["identifier"], title=stimulus["title"])} xml:lang={quoteattr(stimulus.get("language", "en"))}>\n'
+        f'<qti-stimulus-body>{stimulus["content"]}</qti-stimulus-body>\n'
+        '</qti-assessment-stimulus>'
+    )
+
+
+def iter_documents(questions: Iterable[Any]) -> Iterator[Document]:
+    """
+    ("stimulus" | "item", identifier, document) for a stream of questions.
+    A question's stimuli become a shared stimulus emitted before its first
+    item; later questions with the same stimuli only reference it.
+    """
+    seen_stimuli = set()
+    for question in questions:
+        stimulus_identifier = None
+        stimuli = _field(question, "stimuli")
+        if stimuli:
+            stimulus = article_to_stimulus({
+                "content": stimuli,
+                "subject": _field(question, "subject"),
+                "grade": _field(question, "grade"),
+                "standard": _field(question, "standard"),
+                "lesson": _field(question, "lesson")
+            })
+            stimulus_identifier = stimulus["identifier"]
+            if stimulus_identifier not in seen_stimuli:
+                seen_stimuli.add(stimulus_identifier)
+                yield "stimulus", stimulus_identifier, stimulus
+        item = question_to_item(question, stimulus_identifier=stimulus_identifier)
+        yield "item", item["identifier"], item
+
+
+def render(kind: str, document: Dict[str, Any], format: str = "json") -> bytes:
+    """A document as the request body the QTI API takes in format."""
+    if format == "xml":
+        return (stimulus_to_xml(document) if kind == "stimulus" else item_to_xml(document)).encode("utf-8")
+    return json.dumps(document, ensure_ascii=False).encode("utf-8")
+
+
+def write_documents(documents: Iterable[Document], path: str, format: str = "json") -> Dict[str, int]:
+    """
+    Write documents as they arrive: one file per document under the
+    directory path, or, for JSON to a path ending in .jsonl, one line each.
+    Returns how many of each kind were written.
+    """
+    if format not in FORMATS:
+        raise ValueError(f"format must be one of {', '.join(FORMATS)}")
+    counts = {"stimulus": 0, "item": 0}
+    if format == "json" and path.endswith(".jsonl"):
+        with open(path, "w", encoding="utf-8") as f:
+            for kind, identifier, document in documents:
+                f.write(json.dumps({"kind": kind, "document": document}, ensure_ascii=False))
+                f.write("\n")
+                counts[kind] += 1
+        return counts
+
+    for kind in counts:
+        os.makedirs(os.path.join(path, kind), exist_ok=True)
+    for kind, identifier, document in documents:
+        with open(os.path.join(path, kind, f"{identifier}.{format}"), "wb") as f:
+            f.write(render(kind, document, format))
+        counts[kind] += 1
+    return counts
+
+
+class QTIUploader:
+    """
+    Posts documents to the QTI API with at most ``concurrency`` requests in
+    flight. Failed requests (connection errors and RETRY_STATUSES) are
+    retried with jittered exponential backoff; an item waits for the upload
+    of the stimulus it references.
+    """
+
+    def __init__(
+        self,
+        base_url: str = QTI_API_URL,
+        format: str = "json",
+        concurrency: int = UPLOAD_CONCURRENCY,
+        attempts: int = UPLOAD_ATTEMPTS,
+        backoff: float = UPLOAD_BACKOFF,
+        timeout: float = UPLOAD_TIMEOUT,
+        transport=None
+    ):
+        if format not in FORMATS:
+            raise ValueError(f"format must be one of {', '.join(FORMATS)}")
+        self.base_url = base_url.rstrip("/")
+        self.format = format
+        self.concurrency = concurrency
+        self.attempts = attempts
+        self.backoff = backoff
+        self.timeout = timeout
+        self.transport = transport
+        self.retries = 0
+
+    async def _post(self, http, kind: str, identifier: str, document: Dict[str, Any]) -> None:
+        import httpx
+
+        path = STIMULI_PATH if kind == "stimulus" else ITEMS_PATH
+        headers = {"Content-Type": "application/xml" if self.format == "xml" else "application/json"}
+        body = render(kind, document, self.format)
+        for attempt in range(1, self.attempts + 1):
+            try:
+                response = await http.post(path, content=body, headers=headers)
+            except httpx.RequestError as e:
+                error = f"Failed to connect to QTI API: {e}"
+            else:
+                if response.status_code < 400:
+                    return
+                error = f"QTI API rejected {kind} {identifier}: {response.status_code} {response.text[:200]}"
+                if response.status_code not in RETRY_STATUSES:
+                    raise QTIExportError(error)
+            if attempt == self.attempts:
+                raise QTIExportError(error)
+            self.retries += 1
+            delay = self.backoff * 2 ** (attempt - 1)
+            await asyncio.sleep(delay * (0.5 + random.random() / 2))
+
+    async def upload(self, documents: Iterable[Document]) -> Dict[str, Any]:
+        """
+        Upload documents, pulling them from the iterable only as slots free
+        up. Returns counts of uploaded documents and the failures (identifier
+        and error) of those that could not be uploaded.
+        """
+        import httpx
+
+        counts: Dict[str, Any] = {"stimulus": 0, "item": 0, "retries": 0, "failed": []}
+        stimuli: Dict[str, asyncio.Future] = {}
+        pending = set()
+        limits = httpx.Limits(max_connections=self.concurrency)
+        async with httpx.AsyncClient(base_url=self.base_url, timeout=self.timeout, limits=limits, transport=self.transport) as http:
+
+            async def send(kind: str, identifier: str, document: Dict[str, Any], stimulus: Optional[asyncio.Future]) -> None:
+                uploaded = False
+                try:
+                    if stimulus is not None and not await stimulus:
+                        raise QTIExportError(f"Stimulus {document['stimulus']['identifier']} was not uploaded")
+                    await self._post(http, kind, identifier, document)
+                    counts[kind] += 1
+                    uploaded = True
+                except QTIExportError as e:
+                    logger.warning("%s", e)
+                    counts["failed"].append((identifier, str(e)))
+                finally:
+                    # Items waiting on this stimulus go ahead (or fail) either way
+                    if kind == "stimulus":
+                        stimuli[identifier].set_result(uploaded)
+
+            loop = asyncio.get_running_loop()
+            for kind, identifier, document in documents:
+                if len(pending) >= self.concurrency:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        task.result()
+                stimulus = None
+                if kind == "stimulus":
+                    stimuli[identifier] = loop.create_future()
+                elif "stimulus" in document:
+                    stimulus = stimuli.get(document["stimulus"]["identifier"])
+                pending.add(asyncio.ensure_future(send(kind, identifier, document, stimulus)))
+            if pending:
+                done, _ = await asyncio.wait(pending)
+                for task in done:
+                    task.result()
+        counts["retries"] = self.retries
+        return counts
+
+
+class StandInQTIServer:
+    """
+    Local stand-in for the QTI API's create endpoints, served from a thread.
+
+    Documents are kept by kind and identifier. ``fail_first`` makes the
+    first requests answer 503, to exercise retries. Use as a context manager;
+    ``url`` is the base URL to upload to.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, fail_first: int = 0):
+        self.documents: Dict[str, Dict[str, Any]] = {"stimulus": {}, "item": {}}
+        self.requests = 0
+        self.max_in_flight = 0
+        self._fail_first = fail_first
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _handler(self):
+        server = self
+        kinds = {STIMULI_PATH: "stimulus", ITEMS_PATH: "item"}
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                kind = kinds.get(self.path.rstrip("/"))
+                with server._lock:
+                    server.requests += 1
+                    server._in_flight += 1
+                    server.max_in_flight = max(server.max_in_flight, server._in_flight)
+                    failing = server._fail_first > 0
+                    if failing:
+                        server._fail_first -= 1
+                try:
+                    if kind is None:
+                        self._reply(404, {"error": "Not found"})
+                    elif failing:
+                        self._reply(503, {"error": "Unavailable"})
+                    else:
+                        status, payload = server.store(kind, body, self.headers.get("Content-Type", ""))
+                        self._reply(status, payload)
+                finally:
+                    with server._lock:
+                        server._in_flight -= 1
+
+            def _reply(self, status, payload):
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler
+
+    def store(self, kind: str, body: bytes, content_type: str) -> Tuple[int, Dict[str, Any]]:
+        """Keep a posted document; returns the status and JSON reply."""
+        if content_type.startswith("application/xml"):
+            import xml.etree.ElementTree as ET
+            try:
+                root = ET.fromstring(body)
+            except ET.ParseError as e:
+                return 400, {"error": f"Invalid XML: {e}"}
+            document = {"identifier": root.get("identifier"), "xml": body.decode("utf-8")}
+        else:
+            try:
+                document = json.loads(body)
+            except ValueError as e:
+                return 400, {"error": f"Invalid JSON: {e}"}
+        if not document.get("identifier"):
+            return 400, {"error": "identifier is required"}
+        if kind == "item" and "stimulus" in document and document["stimulus"]["identifier"] not in self.documents["stimulus"]:
+            return 400, {"error": "Unknown stimulus"}
+        with self._lock:
+            self.documents[kind][document["identifier"]] = document
+        return 201, {"identifier": document["identifier"]}
+
+    def start(self) -> "StandInQTIServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="qti-stand-in", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "StandInQTIServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
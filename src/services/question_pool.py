@@ -0,0 +1,70 @@
+import random
+from typing import Dict, List, Optional, Tuple
+
+# Upper bound for a single batch draw
+MAX_BATCH_SIZE = 50
+
+# Difficulties are not in the curriculum yet, so the filter offers fixed ones
+DIFFICULTIES = ['easy', 'medium', 'hard']
+
+
+class QuestionPool:
+    """
+    Sample questions of the curriculum grouped for O(1) random draws.
+
+    Every question is placed in four arrays keyed by (standard, lesson) with
+    either side possibly None for "any", so a draw for any filter combination
+    is a single dict lookup plus random.choice. Filter metadata for the
+    verification UI is computed at the same time.
+    """
+
+    def __init__(self, lessons: List[dict]):
+        self._questions: Dict[Tuple[Optional[str], Optional[str]], List[dict]] = {}
+        standards = set()
+        lessons_by_standard: Dict[str, List[dict]] = {}
+
+        for lesson in lessons:
+            standard_code = lesson.get('standard_code')
+            title = lesson.get('title')
+            if standard_code:
+                standards.add(standard_code)
+                # Use title as ID since that's what we'll filter by
+                lessons_by_standard.setdefault(standard_code, []).append({'id': title, 'title': title})
+
+            for question_text in lesson.get('sample_questions', []):
+                question = {
+                    'question_text': question_text,
+                    'standard_code': standard_code,
+                    'standard_description': lesson.get('standard_description'),
+                    'lesson_title': title,
+                    'grade': lesson.get('grade')
+                }
+                for key in ((None, None), (standard_code, None), (None, title), (standard_code, title)):
+                    self._questions.setdefault(key, []).append(question)
+
+        self._filters = {
+            'standards': sorted(standards),
+            'lessons': lessons_by_standard,
+            'difficulties': DIFFICULTIES
+        }
+
+    def __len__(self) -> int:
+        return len(self._questions.get((None, None), []))
+
+    def filters(self) -> dict:
+        """Standards, lessons per standard and difficulties that return questions"""
+        return self._filters
+
+    def matching(self, standard: Optional[str] = None, lesson: Optional[str] = None) -> List[dict]:
+        return self._questions.get((standard or None, lesson or None), [])
+
+    def draw(self, standard: Optional[str] = None, lesson: Optional[str] = None) -> Optional[dict]:
+        """A random question matching the filters, or None"""
+        questions = self.matching(standard, lesson)
+        return random.choice(questions) if questions else None
+
+    def draw_many(self, n: int, standard: Optional[str] = None, lesson: Optional[str] = None) -> List[dict]:
+        """Up to n distinct random questions matching the filters"""
+        questions = self.matching(standard, lesson)
+        n = max(0, min(n, MAX_BATCH_SIZE, len(questions)))
+        return random.sample(questions, n)
@@ -0,0 +1,156 @@
+import bisect
+import heapq
+import math
+import re
+import unicodedata
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Words and numbers; markdown punctuation and code fences fall away
+_TOKEN = re.compile(r"[^\W_]+", re.UNICODE)
+
+# Relative weight of a match in each field of a document
+FIELD_WEIGHTS = {
+    'title': 3.0,
+    'code': 3.0,
+    'description': 2.0,
+    'body': 1.0
+}
+
+# A prefix match counts a little less than the whole word
+PREFIX_WEIGHT = 0.8
+
+# Prefix expansions considered per query term, so one-letter prefixes stay cheap
+MAX_PREFIX_TERMS = 64
+
+SNIPPET_LENGTH = 160
+MAX_RESULTS = 50
+
+
+def tokenize(text: str) -> List[str]:
+    """NFKC-normalized, case-folded word tokens."""
+    return _TOKEN.findall(unicodedata.normalize("NFKC", text).casefold())
+
+
+class SearchIndex:
+    """
+    In-memory inverted index for typeahead search.
+
+    Each document is a dict with ``kind``, ``id``, ``title`` and a ``fields``
+    mapping of field name (see FIELD_WEIGHTS) to text. Postings hold a
+    field-weighted term frequency per document and are also kept sorted by
+    weight, so queries rank with tf-idf using the threshold algorithm: they
+    walk the best postings of each term and stop as soon as no unseen
+    document can beat the current top results. Every term must match and
+    the last one is a prefix, resolved by binary search over the sorted terms.
+    """
+
+    def __init__(self, documents: Iterable[dict]):
+        self.documents: List[dict] = []
+        self.postings: Dict[str, Dict[int, float]] = {}
+        for document in documents:
+            doc_id = len(self.documents)
+            self.documents.append(document)
+            for field, text in document['fields'].items():
+                weight = FIELD_WEIGHTS.get(field, 1.0)
+                for term in tokenize(text or ''):
+                    postings = self.postings.setdefault(term, {})
+                    postings[doc_id] = postings.get(doc_id, 0.0) + weight
+        self.terms = sorted(self.postings)
+        count = len(self.documents)
+        self.idf = {term: math.log(1 + count / len(postings)) for term, postings in self.postings.items()}
+        # (-weight, doc_id) in ascending order, i.e. best postings first
+        self.impacts = {
+            term: sorted((-weight, doc_id) for doc_id, weight in postings.items())
+            for term, postings in self.postings.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def _expand(self, prefix: str) -> List[str]:
+        start = bisect.bisect_left(self.terms, prefix)
+        end = bisect.bisect_left(self.terms, prefix + '\U0010ffff', start)
+        return self.terms[start:min(end, start + MAX_PREFIX_TERMS)]
+
+    def _matcher(self, term: str, prefix: bool):
+        """
+        (stream, score) for one query term: stream yields (-score, doc_id)
+        best first, score(doc_id) looks up a document's score (0 if absent).
+        """
+        factors = []
+        for candidate in (self._expand(term) if prefix else [term]):
+            if candidate in self.postings:
+                factors.append((candidate, self.idf[candidate] * (1.0 if candidate == term else PREFIX_WEIGHT)))
+
+        def scaled(candidate, factor):
+            for negative_weight, doc_id in self.impacts[candidate]:
+                yield negative_weight * factor, doc_id
+
+        def score(doc_id):
+            return max((self.postings[candidate].get(doc_id, 0.0) * factor for candidate, factor in factors), default=0.0)
+
+        return heapq.merge(*(scaled(candidate, factor) for candidate, factor in factors)), score
+
+    def search(self, query: str, limit: int = 10, kinds: Optional[List[str]] = None) -> dict:
+        """Best documents for query as {'query', 'results'}."""
+        terms = tokenize(query)
+        limit = max(1, min(limit, MAX_RESULTS))
+        if not terms:
+            return {'query': query, 'results': []}
+
+        matchers = [self._matcher(term, prefix=i == len(terms) - 1) for i, term in enumerate(terms)]
+        heads = [math.inf] * len(matchers)
+        best: List[Tuple[float, int]] = []  # min-heap of (score, -doc_id)
+        seen = set()
+        while True:
+            for i, (stream, _) in enumerate(matchers):
+                posting = next(stream, None)
+                if posting is None:
+                    # Every document containing this term has been scored, and
+                    # a document must contain all terms: nothing is left to find
+                    return self._results(query, best, terms)
+                heads[i] = -posting[0]
+                doc_id = posting[1]
+                if doc_id in seen:
+                    continue
+                seen.add(doc_id)
+                if kinds and self.documents[doc_id]['kind'] not in kinds:
+                    continue
+                scores = [heads[i] if j == i else score(doc_id) for j, (_, score) in enumerate(matchers)]
+                if min(scores) <= 0.0:
+                    continue
+                entry = (sum(scores), -doc_id)
+                if len(best) < limit:
+                    heapq.heappush(best, entry)
+                elif entry > best[0]:
+                    heapq.heapreplace(best, entry)
+            if len(best) == limit and best[0][0] >= sum(heads):
+                return self._results(query, best, terms)
+
+    def _results(self, query: str, best: List[Tuple[float, int]], terms: List[str]) -> dict:
+        return {
+            'query': query,
+            'results': [self._result(-neg_id, score, terms) for score, neg_id in sorted(best, reverse=True)]
+        }
+
+    def _result(self, doc_id: int, score: float, terms: List[str]) -> dict:
+        document = self.documents[doc_id]
+        result = {key: value for key, value in document.items() if key != 'fields'}
+        result['score'] = round(score, 4)
+        result['snippet'] = snippet(document['fields'], terms)
+        return result
+
+
+def snippet(fields: Dict[str, str], terms: List[str], length: int = SNIPPET_LENGTH) -> str:
+    """A window of the first field text containing a query term (prefixes included)."""
+    pattern = re.compile(r"\b(" + "|".join(re.escape(term) for term in terms) + ")", re.IGNORECASE)
+    texts = [text for field, text in fields.items() if text and field not in ('title', 'code')] or [fields.get('title') or '']
+    for text in texts:
+        match = pattern.search(text)
+        if match is None:
+            continue
+        start = max(0, match.start() - length // 4)
+        window = " ".join(text[start:start + length].split())
+        return ("…" if start > 0 else "") + window + ("…" if start + length < len(text) else "")
+    text = " ".join(texts[0][:length].split())
+    return text + ("…" if len(texts[0]) > length else "")
@@ -0,0 +1,198 @@
+"""
+Streaming readers for the curriculum and CCC data files.
+
+``json.load`` materializes the whole document before it is restructured,
+so peak memory is several times the file size. These readers walk the
+ijson token stream instead and only ever build one lesson or CCC item at a
+time, producing the same structures as the json-based readers in
+``curriculum``; the indexes built from those structures are unchanged. Dict keys and the short, highly repeated field values
+(grades, standard codes, content types, ...) are interned so every copy
+shares one string object.
+"""
+
+import logging
+import os
+import re
+import sys
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Field values repeated across many records; interned while loading
+INTERN_FIELDS = frozenset({
+    'grade', 'standard_code', 'standard_description', 'standard', 'lesson', 'lesson_id',
+    'content_type', 'type', 'difficulty', 'subject', 'interaction_type'
+})
+
+# Files at least this large are streamed when INCEPT_STREAMING_LOAD=auto
+STREAMING_THRESHOLD = 32 * 1024 * 1024
+
+_LESSON_PREFIX = re.compile(r'^(curriculum\.)?([^.]+)\.lessons\.item$')
+
+
+def streaming_available() -> bool:
+    try:
+        import ijson  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def use_streaming(path: str) -> bool:
+    """
+    Whether to stream path: INCEPT_STREAMING_LOAD=1 always, 0 never, and by
+    default (auto) for files over STREAMING_THRESHOLD when ijson is installed.
+    """
+    mode = os.getenv('INCEPT_STREAMING_LOAD', 'auto')
+    if mode == '0' or not streaming_available():
+        return False
+    if mode == '1':
+        return True
+    try:
+        return os.path.getsize(path) >= STREAMING_THRESHOLD
+    except OSError:
+        return False
+
+
+def intern_record(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Intern the repeated string values of a record in place."""
+    for field in INTERN_FIELDS.intersection(record):
+        value = record[field]
+        if type(value) is str:
+            record[field] = sys.intern(value)
+    return record
+
+
+def stream_objects(f, match: Callable[[str], Optional[Any]]) -> Iterator[Tuple[Any, Any]]:
+    """
+    Yield (tag, value) for every JSON object or array whose ijson
+    prefix satisfies match(prefix) (which returns a truthy tag). Only the
+    value being yielded is held in memory; keys are interned as they are read.
+    """
+    import ijson
+    from ijson.common import ObjectBuilder
+
+    builder = None
+    tag = None
+    depth = 0
+    for prefix, event, value in ijson.parse(f, use_float=True):
+        if builder is None:
+            if event in ('start_map', 'start_array'):
+                tag = match(prefix)
+                if tag:
+                    builder = ObjectBuilder()
+                    builder.event(event, value)
+                    depth = 1
+            continue
+
+        if event == 'map_key':
+            value = sys.intern(value)
+        elif event in ('start_map', 'start_array'):
+            depth += 1
+        elif event in ('end_map', 'end_array'):
+            depth -= 1
+        builder.event(event, value)
+        if depth == 0:
+            yield tag, builder.value
+            builder = None
+
+
+def stream_curriculum(path: str) -> Dict[str, Any]:
+    """Streaming equivalent of curriculum.read_curriculum_structure's parsing."""
+    # Lessons under a top-level "curriculum" key win over grades at the top level,
+    # as with the json reader; which layout the file uses is only known at the end
+    layouts = {True: {'lessons': [], 'standards': {}, 'counts': {}}, False: {'lessons': [], 'standards': {}, 'counts': {}}}
+
+    def match(prefix: str):
+        found = _LESSON_PREFIX.match(prefix)
+        if found is None:
+            return None
+        return (found.group(1) is not None, sys.intern(found.group(2)))
+
+    with open(path, 'rb') as f:
+        for (nested, grade), lesson in stream_objects(f, match):
+            if not isinstance(lesson, dict):
+                continue
+            layout = layouts[nested]
+            index = layout['counts'].get(grade, 0)
+            layout['counts'][grade] = index + 1
+
+            intern_record(lesson)
+            lesson['grade'] = grade
+            if 'id' not in lesson:
+                lesson['id'] = f"{grade}-lesson-{index}"
+            lesson['question_count'] = len(lesson['sample_questions']) if 'sample_questions' in lesson else 0
+            layout['lessons'].append(lesson)
+
+            standard_code = lesson.get('standard_code')
+            if standard_code and standard_code not in layout['standards']:
+                layout['standards'][standard_code] = {
+                    'code': standard_code,
+                    'description': lesson.get('standard_description'),
+                    'grade': grade
+                }
+
+    layout = layouts[True] if layouts[True]['counts'] else layouts[False]
+    logger.info(f"Streamed {len(layout['lessons'])} lessons and {len(layout['standards'])} standards from {path}")
+    return {
+        'standards': list(layout['standards'].values()),
+        'lessons': layout['lessons']
+    }
+
+
+def intern_keys(record: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    A copy of record with its keys and repeated string values interned, for
+    objects built by ijson.items (which does not intern keys).
+    """
+    intern = sys.intern
+    return {
+        intern(key): intern(value) if key in INTERN_FIELDS and type(value) is str else value
+        for key, value in record.items()
+    }
+
+
+def _ccc_prefix(f) -> Optional[str]:
+    """The prefix of the first top-level "items" or "content" array in f."""
+    import ijson
+
+    for prefix, event, _ in ijson.parse(f):
+        if event == 'start_array' and prefix in ('items', 'content'):
+            return f"{prefix}.item"
+    return None
+
+
+def stream_ccc(path: str) -> Dict[str, Any]:
+    """
+    Streaming equivalent of curriculum.read_ccc_structure's parsing. CCC
+    files have a single known array, so its items are built by ijson.items,
+    which runs in C with the yajl2_c backend, after a short scan for which
+    array comes first.
+    """
+    import ijson
+
+    with open(path, 'rb') as f:
+        prefix = _ccc_prefix(f)
+        if prefix is None:
+            return {'items': []}
+        f.seek(0)
+        items = []
+        for item in ijson.items(f, prefix, use_float=True):
+            if not isinstance(item, dict):
+                continue
+            item = intern_keys(item)
+            if prefix == 'items.item':
+                items.append(item)
+            else:
+                items.append({
+                    'id': item.get('id', ''),
+                    'title': item.get('source', 'Unnamed Item'),
+                    'type': item.get('content_type', 'article'),
+                    'standard_code': item.get('standard', ''),
+                    'lesson_id': item.get('lesson', ''),
+                    'content': item,
+                    'source': 'local'
+                })
+
+    logger.info(f"Streamed {len(items)} CCC items from {path}")
+    return {'items': items}
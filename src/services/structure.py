@@ -0,0 +1,168 @@
+"""
+Node/link graph of standards, lessons and CCC items for the visualization page.
+
+The graph is built once per data snapshot. Besides the full graph it serves
+a level-of-detail view: the collapsed standards first, then the
+neighbourhood of any node on demand, so the client only ever holds the part
+of a large curriculum the user has opened.
+"""
+
+import hashlib
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.services.ccc_store import ccc_item_grade
+from src.services.layout import compute_layout
+
+# Only these fields are copied into node data; full records are served by
+# /api/lessons/<id> and /api/ccc-item/<id>
+STANDARD_NODE_FIELDS = ('code', 'description', 'grade')
+LESSON_NODE_FIELDS = ('id', 'title', 'standard_code', 'grade', 'question_count', 'description', 'summary', 'objectives')
+ITEM_NODE_FIELDS = ('id', 'title', 'type', 'standard_code', 'source', 'grade')
+
+# Neighbours returned per expansion unless the client asks for more
+DEFAULT_NEIGHBOUR_LIMIT = 200
+
+
+def _summary(record: Dict[str, Any], fields) -> Dict[str, Any]:
+    return {field: record[field] for field in fields if record.get(field) is not None}
+
+
+def standard_node_id(code: str) -> str:
+    return code.replace('.', '_')
+
+
+def item_node_id(item_id: Any) -> str:
+    # Prefixed so CCC ids never collide with lesson ids
+    return f"ccc:{item_id}"
+
+
+class StructureGraph:
+    """Graph with an adjacency index, built from one data snapshot."""
+
+    def __init__(self):
+        self.nodes: Dict[str, Dict[str, Any]] = {}
+        self.links: List[Dict[str, str]] = []
+        self.adjacency: Dict[str, List[int]] = {}
+        # Precomputed coordinates, sent with every node so clients need not lay it out
+        self.positions: Dict[str, Tuple[float, float]] = {}
+
+    def add_node(self, node_id: str, node_type: str, data: Dict[str, Any]) -> None:
+        if node_id not in self.nodes:
+            self.nodes[node_id] = {'id': node_id, 'type': node_type, 'data': data}
+            self.adjacency[node_id] = []
+
+    def add_link(self, source: str, target: str, link_type: str) -> None:
+        if source not in self.nodes or target not in self.nodes:
+            return
+        index = len(self.links)
+        self.links.append({'source': source, 'target': target, 'type': link_type})
+        self.adjacency[source].append(index)
+        self.adjacency[target].append(index)
+
+    def topology_digest(self) -> str:
+        """
+        Hash of what the layout depends on (node ids and types, links), so a
+        layout can be reused while only node data changes.
+        """
+        digest = hashlib.sha256()
+        for node_id, node in self.nodes.items():
+            digest.update(f"{node_id}\x1f{node['type']}\x1e".encode())
+        digest.update(b"\x1d")
+        for link in self.links:
+            digest.update(f"{link['source']}\x1f{link['target']}\x1e".encode())
+        return digest.hexdigest()
+
+    def node_view(self, node_id: str) -> Dict[str, Any]:
+        """A node with its degree, so clients know whether it can be expanded, and its position."""
+        view = dict(self.nodes[node_id], degree=len(self.adjacency[node_id]))
+        position = self.positions.get(node_id)
+        if position is not None:
+            view['x'], view['y'] = position
+        return view
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The whole graph."""
+        return {
+            'nodes': [self.node_view(node_id) for node_id in self.nodes],
+            'links': self.links
+        }
+
+    def overview(self) -> Dict[str, Any]:
+        """Collapsed view: every standard and no links."""
+        return {
+            'nodes': [self.node_view(node_id) for node_id, node in self.nodes.items() if node['type'] == 'standard'],
+            'links': [],
+            'total_nodes': len(self.nodes),
+            'total_links': len(self.links)
+        }
+
+    def neighbourhood(self, node_id: str, limit: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        A node, up to limit of its neighbours and the links joining them,
+        or None if the node does not exist.
+        """
+        if node_id not in self.nodes:
+            return None
+        limit = DEFAULT_NEIGHBOUR_LIMIT if limit is None else max(0, limit)
+        link_indexes = self.adjacency[node_id]
+
+        nodes = []
+        links = []
+        for index in link_indexes[:limit]:
+            link = self.links[index]
+            other = link['target'] if link['source'] == node_id else link['source']
+            nodes.append(self.node_view(other))
+            links.append(link)
+        return {
+            'node': self.node_view(node_id),
+            'nodes': nodes,
+            'links': links,
+            'total': len(link_indexes)
+        }
+
+
+def build_structure(
+    curriculum_data,
+    ccc_data,
+    joins,
+    item_standard,
+    layout: Optional[Callable[[StructureGraph], Dict[str, Tuple[float, float]]]] = compute_layout
+) -> StructureGraph:
+    """
+    Build and lay out the visualization graph. CCC items link to the lessons
+    they are joined to, or to their standard (``item_standard(item)``) when
+    no lesson matches. With layout=None positions are left for the caller.
+    """
+    curriculum_data = curriculum_data or {}
+    ccc_data = ccc_data or {}
+    graph = StructureGraph()
+
+    for standard in curriculum_data.get('standards', []):
+        if standard.get('code'):
+            graph.add_node(standard_node_id(standard['code']), 'standard', _summary(standard, STANDARD_NODE_FIELDS))
+
+    for lesson in curriculum_data.get('lessons', []):
+        lesson_id = str(lesson['id'])
+        graph.add_node(lesson_id, 'lesson', _summary(lesson, LESSON_NODE_FIELDS))
+        if lesson.get('standard_code'):
+            graph.add_link(standard_node_id(lesson['standard_code']), lesson_id, 'standard-lesson')
+
+    item_lessons = (joins or {}).get('item_lessons', {})
+    for item in ccc_data.get('items', []):
+        item_id = item_node_id(item.get('id'))
+        data = _summary(item, ITEM_NODE_FIELDS)
+        grade = ccc_item_grade(item)
+        if grade is not None:
+            # Same key as standard and lesson nodes so clients can filter every node by grade
+            data['grade'] = grade
+        graph.add_node(item_id, item.get('type') or 'article', data)
+        lesson_ids = item_lessons.get(str(item.get('id')), [])
+        for lesson_id in lesson_ids:
+            graph.add_link(item_id, lesson_id, 'content-lesson')
+        standard_code = item_standard(item)
+        if not lesson_ids and standard_code:
+            graph.add_link(standard_node_id(standard_code), item_id, 'standard-content')
+
+    if layout is not None:
+        graph.positions = layout(graph)
+    return graph
@@ -0,0 +1,75 @@
+import hashlib
+import re
+import threading
+import time
+import unicodedata
+from typing import Any, Dict, Optional
+
+from src.services.cache import LRUCache
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Canonical form of a prompt: NFKC, case-folded, whitespace collapsed."""
+    prompt = unicodedata.normalize("NFKC", prompt)
+    return _WHITESPACE.sub(" ", prompt).strip().casefold()
+
+
+def prompt_fingerprint(prompt: str) -> str:
+    """Short stable hash of the normalized prompt."""
+    return hashlib.blake2b(normalize_prompt(prompt).encode("utf-8"), digest_size=16).hexdigest()
+
+
+class TagMemo:
+    """
+    In-process memo of tagging results keyed by normalized prompt fingerprint.
+
+    Entries are bounded by an LRU size and a TTL, and the whole memo is
+    dropped whenever the tagging corpus version changes.
+    """
+
+    def __init__(self, maxsize: int = 4096, ttl: float = 3600.0):
+        self.ttl = ttl
+        self.corpus_version: Optional[str] = None
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._entries = LRUCache(maxsize)
+        self._lock = threading.Lock()
+
+    def _check_version(self, corpus_version: str) -> None:
+        if corpus_version != self.corpus_version:
+            with self._lock:
+                if corpus_version != self.corpus_version:
+                    if self.corpus_version is not None:
+                        self.invalidations += 1
+                    self._entries.clear()
+                    self.corpus_version = corpus_version
+
+    def get(self, prompt: str, corpus_version: str) -> Optional[Dict[str, Any]]:
+        """Return memoized tags for prompt, counting the hit or miss."""
+        self._check_version(corpus_version)
+        entry = self._entries.get_entry(prompt_fingerprint(prompt))
+        if entry is not None and entry[1] > time.time():
+            self.hits += 1
+            return entry[0]
+        self.misses += 1
+        return None
+
+    def set(self, prompt: str, corpus_version: str, tags: Dict[str, Any]) -> None:
+        self._check_version(corpus_version)
+        self._entries.set(prompt_fingerprint(prompt), tags, self.ttl)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "size": len(self._entries),
+            "maxsize": self._entries.maxsize,
+            "ttl": self.ttl,
+            "corpus_version": self.corpus_version,
+            "invalidations": self.invalidations,
+        }
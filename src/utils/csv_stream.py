@@ -0,0 +1,125 @@
+"""
+Streaming CSV tokenizer for the curriculum and CCC exports.
+
+The exports are mostly standard CSV, but sample questions are ```markdown
+fenced blocks that are not always quoted, so they can carry bare commas
+and newlines. The tokenizer is a small state machine that reads one line
+at a time and keeps a row's fields as lists of slices joined once per field,
+so input of any size is tokenized in a single linear pass with memory
+bounded by the largest row:
+
+- a field starting with ``"`` runs to the closing quote, with ``""`` as an
+  escaped quote and newlines kept;
+- inside an unquoted field, three backticks open a fence that runs to the
+  next three backticks, with commas and newlines kept;
+- otherwise commas end fields and newlines end rows. Blank lines are skipped.
+"""
+
+import re
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+FENCE = '```'
+
+# Where an unquoted field can end or a fence can start
+_UNQUOTED_SPECIAL = re.compile(r',|\r\n|\n|\r|```')
+
+_START, _UNQUOTED, _QUOTED, _FENCED = range(4)
+
+
+class CSVFormatError(ValueError):
+    """The input ended inside a quoted field or a fence."""
+    pass
+
+
+def iter_rows(lines: Iterable[str], strict: bool = False) -> Iterator[List[str]]:
+    """
+    Rows of fields from lines (e.g. a file opened with newline=''). An
+    unterminated quote or fence at the end of input ends the last field,
+    or raises CSVFormatError with strict.
+    """
+    row: List[str] = []
+    field: List[str] = []
+    state = _START
+    for line in lines:
+        pos = 0
+        end = len(line)
+        while pos < end:
+            if state == _QUOTED:
+                quote = line.find('"', pos)
+                if quote < 0:
+                    field.append(line[pos:])
+                    break
+                field.append(line[pos:quote])
+                if line.startswith('"', quote + 1):
+                    field.append('"')
+                    pos = quote + 2
+                else:
+                    # Anything between the closing quote and the next comma is kept as is
+                    state = _UNQUOTED
+                    pos = quote + 1
+            elif state == _FENCED:
+                close = line.find(FENCE, pos)
+                if close < 0:
+                    field.append(line[pos:])
+                    break
+                field.append(line[pos:close + len(FENCE)])
+                state = _UNQUOTED
+                pos = close + len(FENCE)
+            else:
+                if state == _START and line[pos] == '"':
+                    state = _QUOTED
+                    pos += 1
+                    continue
+                state = _UNQUOTED
+                match = _UNQUOTED_SPECIAL.search(line, pos)
+                if match is None:
+                    field.append(line[pos:])
+                    break
+                token = match.group()
+                field.append(line[pos:match.start()])
+                pos = match.end()
+                if token == ',':
+                    row.append(''.join(field))
+                    field = []
+                    state = _START
+                elif token == FENCE:
+                    field.append(FENCE)
+                    state = _FENCED
+                else:
+                    value = ''.join(field)
+                    if row or value:
+                        row.append(value)
+                        yield row
+                    row = []
+                    field = []
+                    state = _START
+
+    if state in (_QUOTED, _FENCED):
+        if strict:
+            raise CSVFormatError("Input ended inside a quoted field" if state == _QUOTED else "Input ended inside a ``` fence")
+    value = ''.join(field)
+    if row or value or state != _START:
+        row.append(value)
+        yield row
+
+
+def split_header(lines: Iterable[str], strict: bool = False) -> Tuple[Optional[List[str]], Iterator[List[str]]]:
+    """The header row (None for empty input) and the rows under it, padded with '' to the header's width."""
+    rows = iter_rows(lines, strict)
+    header: Optional[List[str]] = next(rows, None)
+
+    def padded() -> Iterator[List[str]]:
+        width = len(header)
+        for row in rows:
+            if len(row) < width:
+                row = row + [''] * (width - len(row))
+            yield row
+
+    return header, padded() if header is not None else iter(())
+
+
+def iter_dict_rows(lines: Iterable[str], strict: bool = False) -> Iterator[Dict[str, str]]:
+    """Rows keyed by the header row, like csv.DictReader (missing fields are '', extra ones dropped)."""
+    header, rows = split_header(lines, strict)
+    for row in rows:
+        yield dict(zip(header, row))
@@ -0,0 +1,89 @@
+import gzip
+import hashlib
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# Brotli is optional; gzip is always available
+try:
+    import brotli
+except ImportError:  # pragma: no cover - depends on the environment
+    brotli = None
+
+# Bodies smaller than this are not worth compressing
+MIN_COMPRESS_SIZE = 1024
+
+# memo(key, builder) -> builder() result, possibly cached by the caller
+Memo = Callable[[str, Callable[[], Any]], Any]
+
+
+def _no_memo(key: str, builder: Callable[[], Any]) -> Any:
+    return builder()
+
+
+def make_etag(body: bytes) -> str:
+    """Strong ETag derived from the body's contents."""
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header matches etag (weak comparison)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    tags = [tag.strip() for tag in if_none_match.split(',')]
+    return any((tag[2:] if tag.startswith('W/') else tag) == etag for tag in tags)
+
+
+def choose_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Best content coding the client accepts: br when available, then gzip."""
+    if not accept_encoding:
+        return None
+    accepted = set()
+    for part in accept_encoding.split(','):
+        coding, _, params = part.strip().partition(';')
+        if params.replace(' ', '') in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+            continue
+        accepted.add(coding.strip().lower())
+    if brotli is not None and 'br' in accepted:
+        return 'br'
+    if 'gzip' in accepted:
+        return 'gzip'
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == 'br':
+        return brotli.compress(body, quality=5)
+    if encoding == 'gzip':
+        return gzip.compress(body, compresslevel=6)
+    raise ValueError(f"Unsupported content coding: {encoding}")
+
+
+def encode_json_body(
+    body: bytes,
+    accept_encoding: Optional[str],
+    if_none_match: Optional[str],
+    memo: Optional[Memo] = None
+) -> Tuple[int, Dict[str, str], bytes]:
+    """
+    Apply conditional-request and compression handling to an encoded JSON body.
+
+    Returns ``(status, headers, payload)``: 304 with an empty payload when the
+    client's If-None-Match still matches, otherwise 200 with the body,
+    compressed if the client accepts it. Each content coding gets its own
+    ETag. Pass memo to reuse ETags and compressed variants of cached bodies.
+    """
+    memo = memo or _no_memo
+    etag = memo('etag', lambda: make_etag(body))
+    encoding = choose_encoding(accept_encoding) if len(body) >= MIN_COMPRESS_SIZE else None
+    if encoding:
+        etag = f'{etag[:-1]}-{encoding}"'
+
+    headers = {'ETag': etag, 'Vary': 'Accept-Encoding', 'Cache-Control': 'no-cache'}
+    if etag_matches(if_none_match, etag):
+        return 304, headers, b''
+
+    if encoding:
+        headers['Content-Encoding'] = encoding
+        return 200, headers, memo(encoding, lambda: compress(body, encoding))
+    return 200, headers, body
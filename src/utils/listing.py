@@ -0,0 +1,64 @@
+import base64
+import json
+from typing import Any, Dict, Iterable, List, Optional
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+def encode_cursor(offset: int, version: Any) -> str:
+    """Opaque cursor for the page starting at offset within a data version."""
+    raw = json.dumps({'o': offset, 'v': version}, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str, version: Any) -> int:
+    """Offset stored in cursor. Raises ValueError for malformed or outdated cursors."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        offset = int(data['o'])
+    except (ValueError, KeyError, TypeError):
+        raise ValueError('Malformed cursor')
+    if data.get('v') != version:
+        raise ValueError('Cursor belongs to an older version of the data; restart from the first page')
+    if offset < 0:
+        raise ValueError('Malformed cursor')
+    return offset
+
+
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """'id,title' -> ['id', 'title']; None or empty means all fields."""
+    if not fields:
+        return None
+    return [field.strip() for field in fields.split(',') if field.strip()]
+
+
+def project(items: Iterable[Dict[str, Any]], fields: Optional[List[str]]) -> List[Dict[str, Any]]:
+    """Keep only the requested top-level fields of each item."""
+    if not fields:
+        return list(items)
+    return [{field: item[field] for field in fields if field in item} for item in items]
+
+
+def paginate(
+    items: List[Dict[str, Any]],
+    version: Any,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    fields: Optional[List[str]] = None
+) -> Dict[str, Any]:
+    """
+    One page of items with an opaque cursor to the next one.
+
+    The cursor is tied to the data version so a client never mixes pages
+    from two different snapshots.
+    """
+    offset = decode_cursor(cursor, version) if cursor else 0
+    limit = DEFAULT_PAGE_SIZE if limit is None else max(1, min(limit, MAX_PAGE_SIZE))
+    end = offset + limit
+    return {
+        'items': project(items[offset:end], fields),
+        'next_cursor': encode_cursor(end, version) if end < len(items) else None,
+        'total': len(items)
+    }
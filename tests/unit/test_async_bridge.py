@@ -0,0 +1,58 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.services.async_bridge import AsyncBridge, JobLimitError, JobRegistry
+
+
+@pytest.fixture
+def bridge():
+    bridge = AsyncBridge()
+    yield bridge
+    bridge.stop()
+
+
+def test_coroutines_share_one_loop_thread(bridge):
+    async def thread_name():
+        return threading.current_thread().name
+
+    assert bridge.run(thread_name()) == bridge.run(thread_name()) == "async-bridge"
+    assert bridge.shared("grader", object) is bridge.shared("grader", object)
+
+
+def test_timeout_cancels_the_coroutine(bridge):
+    cancelled = threading.Event()
+
+    async def slow():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    with pytest.raises(TimeoutError):
+        bridge.run(slow(), timeout=0.05)
+    assert cancelled.wait(1)
+
+
+def test_jobs_can_be_polled_and_cancelled(bridge):
+    jobs = JobRegistry(bridge, max_pending=1)
+
+    async def grade():
+        await asyncio.sleep(0.01)
+        return {"passed": True}
+
+    job_id = jobs.submit(grade())
+    deadline = time.time() + 2
+    while jobs.status(job_id)["status"] == "running" and time.time() < deadline:
+        time.sleep(0.01)
+    assert jobs.status(job_id)["result"] == {"passed": True}
+
+    slow_id = jobs.submit(asyncio.sleep(10))
+    with pytest.raises(JobLimitError):
+        jobs.submit(grade())
+    assert jobs.cancel(slow_id)
+    assert jobs.status(slow_id)["status"] == "cancelled"
+    assert jobs.status("unknown") is None
@@ -0,0 +1,85 @@
+import threading
+import time
+
+import pytest
+
+from src.services.cache import LRUCache, SQLiteCache, TieredCache, make_key
+
+
+@pytest.fixture
+def shared(tmp_path):
+    """Shared SQLite tier in a temporary directory."""
+    return SQLiteCache(str(tmp_path / "cache.sqlite3"))
+
+
+def test_make_key_is_stable():
+    assert make_key("a", {"x": 1, "y": 2}) == make_key("a", {"y": 2, "x": 1})
+    assert make_key("a") != make_key("b")
+
+
+def test_lru_evicts_oldest_and_expires():
+    cache = LRUCache(maxsize=2)
+    cache.set("a", 1, ttl=60)
+    cache.set("b", 2, ttl=60)
+    cache.get("a")
+    cache.set("c", 3, ttl=60)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+
+    cache.set("d", 4, ttl=-1)
+    assert cache.get("d") is None
+
+
+def test_workers_share_the_sqlite_tier(shared):
+    worker_a = TieredCache("ccc", shared=shared)
+    worker_b = TieredCache("ccc", shared=shared)
+
+    worker_a.set("standard", {"id": "123"}, ttl=60)
+
+    assert worker_b.get("standard") == {"id": "123"}
+    assert TieredCache("tag", shared=shared).get("standard") is None
+
+
+def test_only_one_worker_refreshes_an_expired_key(shared):
+    calls = []
+
+    def factory():
+        calls.append(1)
+        time.sleep(0.2)
+        return "fresh"
+
+    workers = [TieredCache("grade", shared=shared, poll_interval=0.01) for _ in range(5)]
+    results = []
+    threads = [
+        threading.Thread(target=lambda w=w: results.append(w.get_or_set("key", factory, ttl=60)))
+        for w in workers
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == ["fresh"] * 5
+
+
+def test_stale_value_is_served_while_another_worker_refreshes(shared):
+    worker = TieredCache("grade", shared=shared)
+    worker.set("key", "stale", ttl=-1)
+    assert shared.acquire_lock("grade:key", "other-worker")
+
+    assert worker.get_or_set("key", lambda: "fresh", ttl=60) == "stale"
+
+
+def test_expired_rows_are_purged_after_their_stale_window(tmp_path):
+    shared = SQLiteCache(str(tmp_path / "cache.sqlite3"), stale_ttl=0, purge_every=3)
+    shared.set("gone", "old", ttl=-1)
+    shared.set("fresh", "new", ttl=60)
+
+    assert shared.get_entry("gone") is not None
+
+    shared.set("other", "new", ttl=60)
+
+    assert shared.get_entry("gone") is None
+    assert shared.get("fresh") == "new"
@@ -0,0 +1,78 @@
+import asyncio
+
+import pytest
+
+from src.services import curriculum
+from src.services.cache import TieredCache
+from src.services.ccc_client import CCCClient, CCCError
+
+
+@pytest.fixture
+def client():
+    return CCCClient(cache=TieredCache("ccc-test"))
+
+
+@pytest.mark.asyncio
+async def test_misses_and_failures_are_cached(client, monkeypatch):
+    calls = []
+
+    async def fetch_standards(keyword):
+        calls.append(keyword)
+        if keyword == "broken":
+            raise CCCError("upstream down")
+        return []
+
+    monkeypatch.setattr(client, "_fetch_standards", fetch_standards)
+
+    assert await client.search_standards("MS-XX-9") == []
+    assert await client.search_standards("MS-XX-9") == []
+    for _ in range(2):
+        with pytest.raises(CCCError, match="upstream down"):
+            await client.search_standards("broken")
+    assert calls == ["MS-XX-9", "broken"]
+
+
+class FakeCCC:
+    """CCC client whose content requests take a configurable time."""
+
+    def __init__(self, delays):
+        self.delays = delays
+
+    async def search_standards(self, keyword):
+        return [{"id": standard_id} for standard_id in self.delays]
+
+    async def get_content_for_standard(self, cf_item_id):
+        await asyncio.sleep(self.delays[cf_item_id])
+        return [{"id": f"{cf_item_id}-1", "name": "Item", "type": "Question"}]
+
+
+@pytest.mark.asyncio
+async def test_fallback_fetches_concurrently_within_budget():
+    ccc = FakeCCC({"a": 0.05, "b": 0.05, "slow": 5})
+
+    items, partial = await curriculum.fetch_remote_ccc_items(ccc, "MS-PS2-9", budget=0.3)
+
+    assert [item["id"] for item in items] == ["a-1", "b-1"]
+    assert partial
+    assert (await curriculum.fetch_remote_ccc_items(FakeCCC({"a": 0}), "MS-PS2-9"))[1] is False
+
+
+@pytest.mark.asyncio
+async def test_client_from_another_loop_is_closed_when_replaced(client):
+    from src.services.async_bridge import AsyncBridge
+
+    bridge = AsyncBridge()
+
+    async def http_client():
+        return await client._client()
+
+    try:
+        old = bridge.run(http_client())
+        new = await client._client()
+
+        assert new is not old
+        assert old.is_closed
+        assert await client._client() is new
+    finally:
+        await client.aclose()
+        bridge.stop()
@@ -0,0 +1,47 @@
+import sqlite3
+
+import pytest
+
+from src.services.ccc_store import ItemQuery, item_columns, item_matches, write_ccc_database
+from src.utils.serialization import loads
+
+ITEMS = [
+    {"id": str(i), "content_type": "question" if i % 2 else "article", "source": f"Item {i}",
+     "subject": ["Science"], "grade": "8", "standard": f"MS-PS2-{i % 3}", "lesson": "Net force",
+     "difficulty": "easy" if i < 5 else "hard", "interaction_type": "choice"}
+    for i in range(10)
+]
+
+
+@pytest.fixture
+def items_db(tmp_path):
+    path = str(tmp_path / "ccc.sqlite3")
+    assert write_ccc_database(path, iter(ITEMS)) == len(ITEMS)
+    conn = sqlite3.connect(path)
+    yield lambda sql, params=(): conn.execute(sql, params).fetchall()
+    conn.close()
+
+
+def test_items_are_stored_in_typed_indexed_columns(items_db):
+    assert items_db("SELECT content_type, subject, difficulty FROM ccc_items WHERE id = '3'") == [("question", '["Science"]', "easy")]
+    indexes = {name for (name,) in items_db("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert {"ccc_items_standard", "ccc_items_lesson", "ccc_items_content_type", "ccc_items_difficulty",
+            "ccc_items_interaction_type"} <= indexes
+
+
+def test_item_query_filters_and_pages(items_db):
+    hard_questions = ItemQuery(items_db, loads, {"content_type": "question", "difficulty": "hard", "lesson": None})
+
+    assert len(hard_questions) == 3
+    assert [item["id"] for item in hard_questions[1:3]] == ["7", "9"]
+    assert [item["id"] for item in hard_questions] == ["5", "7", "9"]
+    assert hard_questions == [item for item in ITEMS if item_matches(item, hard_questions.filters)]
+    with pytest.raises(ValueError):
+        ItemQuery(items_db, loads, {"source": "Item 1"})
+
+
+def test_columns_of_loaded_items_come_from_their_content():
+    loaded = {"id": "3", "title": "Item 3", "type": "question", "standard_code": "MS-PS2-0", "lesson_id": "Net force",
+              "content": ITEMS[3], "source": "local"}
+
+    assert item_columns(loaded) == item_columns(ITEMS[3])
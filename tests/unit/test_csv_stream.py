@@ -0,0 +1,54 @@
+import csv
+import io
+import time
+
+import pytest
+
+from src.utils.csv_stream import CSVFormatError, iter_dict_rows, iter_rows
+
+
+def rows(text, **kwargs):
+    return list(iter_rows(io.StringIO(text, newline=''), **kwargs))
+
+
+@pytest.mark.parametrize("text", [
+    'a,b,c\r\n1,"x, y",3\r\n',
+    'a,b\n"multi\nline ""quoted""",2\n3,4',
+    'a,"b"c,d\nx,\n',
+    'a,b\r1,2\r'
+])
+def test_standard_csv_matches_the_csv_module(text):
+    expected = [row for row in csv.reader(io.StringIO(text, newline='')) if row]
+
+    assert rows(text) == expected
+
+
+def test_unquoted_markdown_fences_keep_commas_and_newlines():
+    text = 'Grade,Sample Question 1,Order\n8,```markdown\nWhat is 2, 3?\n\n- 5\n```,1\n'
+
+    assert rows(text) == [
+        ['Grade', 'Sample Question 1', 'Order'],
+        ['8', '```markdown\nWhat is 2, 3?\n\n- 5\n```', '1']
+    ]
+
+
+def test_unterminated_fields():
+    assert rows('a,"open\nstill open') == [['a', 'open\nstill open']]
+    with pytest.raises(CSVFormatError):
+        rows('a,```markdown\nnever closed', strict=True)
+
+
+def test_dict_rows_pad_short_rows():
+    assert list(iter_dict_rows(io.StringIO('a,b\n1\n'))) == [{'a': '1', 'b': ''}]
+
+
+def test_long_multiline_fields_parse_in_linear_time():
+    def timed(lines):
+        text = 'id,body\n1,"' + 'line, with comma\n' * lines + '"\n'
+        started = time.perf_counter()
+        assert len(rows(text)[1][1]) == lines * 17
+        return time.perf_counter() - started
+
+    small, large = timed(20000), timed(200000)
+    # Quadratic concatenation would take ~100x as long for 10x the lines
+    assert large < small * 30
@@ -0,0 +1,177 @@
+import json
+
+import pytest
+
+from src.services import curriculum
+
+
+@pytest.fixture
+def data_files(tmp_path, monkeypatch):
+    """Small curriculum and CCC files wired into the curriculum service."""
+    curriculum_file = tmp_path / "curriculum_structure.json"
+    curriculum_file.write_text(json.dumps({
+        "curriculum": {
+            "8": {
+                "lessons": [
+                    {
+                        "title": "Net force",
+                        "standard_code": "MS-PS2-2",
+                        "standard_description": "Plan an investigation of forces",
+                        "sample_questions": ["What is the net force?", "Which force is larger?"]
+                    },
+                    {
+                        "title": "Newton's third law",
+                        "standard_code": "MS-PS2-1",
+                        "standard_description": "Apply Newton's Third Law",
+                        "sample_questions": ["What is the reaction force?"]
+                    }
+                ]
+            }
+        }
+    }))
+    ccc_file = tmp_path / "ccc_structure.json"
+    ccc_file.write_text(json.dumps({
+        "content": [
+            {"id": "101", "content_type": "question", "source": "Net force quiz",
+             "standard": "MS-PS2-2", "lesson": "Net force", "grade": 8},
+            {"id": "102", "content_type": "article", "source": "Action and reaction",
+             "standard": "MS-PS2-1", "lesson": "Newton's third law"}
+        ]
+    }))
+    monkeypatch.setitem(curriculum.CONFIG, "curriculum", str(curriculum_file))
+    monkeypatch.setitem(curriculum.CONFIG, "ccc", str(ccc_file))
+    monkeypatch.setitem(curriculum.CONFIG, "snapshot", str(tmp_path / "snapshot.sqlite3"))
+    curriculum.data_store.reload()
+    yield tmp_path
+    curriculum.data_store.invalidate()
+
+
+def test_lessons_for_standard(data_files):
+    lessons = curriculum.lessons_for_standard("MS-PS2-2")
+
+    assert [lesson["title"] for lesson in lessons] == ["Net force"]
+    assert lessons[0]["question_count"] == 2
+
+
+def test_local_ccc_lookups(data_files):
+    assert [item["id"] for item in curriculum.find_local_ccc_items(standard_code="MS-PS2-1")] == ["102"]
+    assert curriculum.find_local_ccc_item("101")["title"] == "Net force quiz"
+    assert curriculum.find_local_ccc_item("999") is None
+
+
+def test_lessons_are_indexed_by_id_and_title(data_files):
+    data = curriculum.load_curriculum_structure()
+
+    assert curriculum.get_lesson("8-lesson-1")["title"] == "Newton's third law"
+    assert data["lessons_by_title"]["Net force"][0]["id"] == "8-lesson-0"
+    assert data["standards_by_code"]["MS-PS2-1"]["description"] == "Apply Newton's Third Law"
+
+
+def test_ccc_items_join_to_lessons_by_title(data_files):
+    assert [item["id"] for item in curriculum.ccc_items_for_lesson("8-lesson-0")] == ["101"]
+    assert [item["id"] for item in curriculum.find_local_ccc_items(lesson_id="8-lesson-1")] == ["102"]
+    assert curriculum.load_lesson_item_joins()["item_lessons"]["102"] == ["8-lesson-1"]
+
+
+def test_question_pool_draws_match_filters(data_files):
+    pool = curriculum.load_question_pool()
+
+    assert len(pool) == 3
+    assert curriculum.random_question(standard="MS-PS2-1")["question_text"] == "What is the reaction force?"
+    assert curriculum.random_question(standard="MS-PS2-1", lesson="Net force") is None
+    assert {q["question_text"] for q in curriculum.random_questions(10, lesson="Net force")} == {
+        "What is the net force?", "Which force is larger?"
+    }
+
+
+def test_question_filters_come_from_the_pool(data_files):
+    filters = curriculum.question_filters()
+
+    assert filters["standards"] == ["MS-PS2-1", "MS-PS2-2"]
+    assert filters["lessons"]["MS-PS2-2"] == [{"id": "Net force", "title": "Net force"}]
+
+
+def test_cached_json_memoizes_variants_per_snapshot(data_files):
+    build_lessons = lambda snapshot: snapshot["curriculum"]["lessons"]
+    body, memo = curriculum.cached_json("lessons", build_lessons)
+
+    assert json.loads(body)[0]["title"] == "Net force"
+    assert memo("etag", object) is memo("etag", object)
+
+    curriculum.data_store.reload()
+    _, new_memo = curriculum.cached_json("lessons", build_lessons)
+    assert new_memo("etag", object) is not memo("etag", object)
+
+
+def test_structure_joins_ccc_items_and_expands_on_demand(data_files):
+    graph = curriculum.load_structure()
+
+    full = graph.to_dict()
+    assert {"source": "ccc:101", "target": "8-lesson-0", "type": "content-lesson"} in full["links"]
+    assert "sample_questions" not in graph.nodes["8-lesson-0"]["data"]
+    # Content nodes carry the grade like lesson nodes do, for client-side filtering
+    assert graph.nodes["ccc:101"]["data"]["grade"] == graph.nodes["8-lesson-0"]["data"]["grade"] == "8"
+    assert "grade" not in graph.nodes["ccc:102"]["data"]
+    assert all("x" in node and "y" in node for node in full["nodes"])
+
+    overview = graph.overview()
+    assert [node["id"] for node in overview["nodes"]] == ["MS-PS2-2", "MS-PS2-1"]
+    assert overview["total_nodes"] == 6
+
+    lesson = graph.neighbourhood("8-lesson-0")
+    assert {node["id"] for node in lesson["nodes"]} == {"MS-PS2-2", "ccc:101"}
+    assert graph.neighbourhood("8-lesson-0", limit=1)["total"] == 2
+    assert graph.neighbourhood("missing") is None
+
+
+def test_search_ranks_prefix_matches_with_snippets(data_files):
+    results = curriculum.search("reaction fo")["results"]
+
+    assert [result["id"] for result in results] == ["8-lesson-1"]
+    assert "reaction force" in results[0]["snippet"]
+
+    assert curriculum.search("newton")["results"][0]["kind"] in ("standard", "lesson")
+    assert [r["id"] for r in curriculum.search("net", kinds=["ccc_item"])["results"]] == ["101"]
+    assert curriculum.search("  ")["results"] == []
+
+
+def lookups():
+    graph = curriculum.load_structure()
+    return {
+        "standards": json.loads(curriculum.cached_json("standards", lambda s: s["curriculum"]["standards"])[0]),
+        "lessons": curriculum.load_curriculum_structure()["lessons"],
+        "structure": json.loads(curriculum.cached_json("structure", lambda s: s["structure"].to_dict())[0]),
+        "overview": graph.overview(),
+        "neighbourhood": graph.neighbourhood("8-lesson-0", limit=1),
+        "by_standard": curriculum.lessons_for_standard("MS-PS2-2"),
+        "lesson": curriculum.get_lesson("8-lesson-1"),
+        "items": curriculum.find_local_ccc_items(standard_code="MS-PS2-1", lesson_id="8-lesson-0"),
+        "standard_items": list(curriculum.find_local_ccc_items(standard_code="MS-PS2-2")),
+        "questions": list(curriculum.find_local_ccc_items(content_type="question")),
+        "no_questions": list(curriculum.find_local_ccc_items(standard_code="MS-PS2-1", content_type="question")),
+        "item": curriculum.find_local_ccc_item("101"),
+        "joined": curriculum.ccc_items_for_lesson("8-lesson-0"),
+        "item_lessons": curriculum.load_lesson_item_joins()["item_lessons"]["102"],
+        "search": curriculum.search("reaction fo"),
+        "filters": curriculum.question_filters()
+    }
+
+
+def test_compiled_snapshot_answers_like_the_json_files(data_files):
+    expected = lookups()
+    curriculum.compile_snapshot()
+    curriculum.data_store.reload()
+
+    assert "compiled" in curriculum.data_store.snapshot().data
+    assert lookups() == expected
+    assert curriculum.get_lesson("missing") is None
+
+
+def test_stale_compiled_snapshot_falls_back_to_json(data_files):
+    curriculum.compile_snapshot()
+    ccc_file = data_files / "ccc_structure.json"
+    ccc_file.write_text(json.dumps({"content": [{"id": "103", "source": "Friction lab", "standard": "MS-PS2-2"}]}))
+    curriculum.data_store.reload()
+
+    assert "compiled" not in curriculum.data_store.snapshot().data
+    assert curriculum.find_local_ccc_item("103")["title"] == "Friction lab"
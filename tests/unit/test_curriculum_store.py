@@ -0,0 +1,82 @@
+import json
+import sys
+
+import pytest
+
+from src.services import curriculum
+from src.services.compiled_snapshot import CompiledSnapshot, write_compiled_snapshot
+from src.services.curriculum_store import Lesson
+from src.utils.serialization import dumps
+
+
+def test_lesson_reads_like_a_dict():
+    record = {"title": "Net force", "standard_code": "MS-PS2-2", "sample_questions": ["What is the net force?"],
+              "grade": "8", "id": "8-lesson-0", "question_count": 1, "unit": "Forces"}
+    lesson = Lesson(record)
+
+    assert lesson == record
+    assert lesson["unit"] == "Forces"
+    assert lesson.get("video_url") is None
+    assert "video_url" not in lesson
+    assert list(lesson) == list(record)
+    assert json.loads(dumps(lesson)) == record
+    assert sys.getsizeof(lesson) < sys.getsizeof(record)
+    with pytest.raises(AttributeError):
+        lesson.title = "Friction"
+
+
+@pytest.fixture
+def compiled_grades(tmp_path, monkeypatch):
+    """A compiled snapshot of three grades with two lessons each."""
+    curriculum_file = tmp_path / "curriculum_structure.json"
+    curriculum_file.write_text(json.dumps({"curriculum": {
+        grade: {"lessons": [
+            {"title": f"Lesson {grade}.{i}", "standard_code": f"MS-PS{i}-1", "sample_questions": ["Why?"]}
+            for i in range(2)
+        ]}
+        for grade in ("6", "7", "8")
+    }}))
+    monkeypatch.setitem(curriculum.CONFIG, "curriculum", str(curriculum_file))
+    monkeypatch.setitem(curriculum.CONFIG, "ccc", str(tmp_path / "missing.json"))
+    path = curriculum.compile_snapshot(str(tmp_path / "snapshot.sqlite3"))
+    return CompiledSnapshot.open(path)
+
+
+def test_partitions_load_on_first_use(compiled_grades):
+    data = compiled_grades.curriculum()
+    partitions = data["partitions"]
+
+    assert [(p["grade"], p["lessons"]) for p in partitions.partitions.values()] == [("6", 2), ("7", 2), ("8", 2)]
+    assert partitions.loaded() == []
+
+    assert data["lessons_by_id"]["7-lesson-1"]["title"] == "Lesson 7.1"
+    assert [p["grade"] for p in partitions.loaded()] == ["7"]
+    assert data["lessons_by_id"].get("9-lesson-0") is None
+
+
+def test_lookups_across_partitions_keep_file_order(compiled_grades):
+    data = compiled_grades.curriculum()
+
+    assert [lesson["id"] for lesson in data["lessons_by_standard"]["MS-PS1-1"]] == ["6-lesson-1", "7-lesson-1", "8-lesson-1"]
+    assert [lesson["id"] for lesson in data["lessons"][1:4]] == ["6-lesson-1", "7-lesson-0", "7-lesson-1"]
+    assert len(data["lessons"]) == 6
+
+
+def test_partition_cache_evicts_least_recently_used(compiled_grades):
+    data = compiled_grades.curriculum(max_bytes=1)
+    partitions = data["partitions"]
+
+    data["lessons_by_id"]["6-lesson-0"]
+    data["lessons_by_id"]["8-lesson-0"]
+
+    assert [p["grade"] for p in partitions.loaded()] == ["8"]
+    assert partitions.loads == 2
+
+
+def test_failed_compile_leaves_no_partial_file(tmp_path):
+    path = tmp_path / "snapshot.sqlite3"
+
+    with pytest.raises(KeyError):
+        write_compiled_snapshot(str(path), {"curriculum": {"lessons": [{"title": "No id"}]}}, {})
+
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,165 @@
+import json
+
+import pytest
+
+import build_data
+from src.services import curriculum, data_build
+from src.services.compiled_snapshot import CompiledSnapshot
+
+CURRICULUM_CSV = (
+    'Grade,Lesson,Standard Code,Standard Description,Sample Question 1\n'
+    '8,Net force,MS-PS2-2,"Plan an investigation, with forces","```markdown\nWhat is the net force?\n```"\n'
+    '7,Density,MS-PS1-1,Develop models,\n'
+    '8,Newton\'s third law,MS-PS2-1,Apply Newton\'s Third Law,\n'
+)
+
+CCC_CSV = (
+    'id,content type,source,subject,grade,standard,lesson,difficulty,interaction type\n'
+    '101,question,Net force quiz,"[\'Science\']",8,MS-PS2-2,Net force,easy,choice\n'
+    '102,article,Action and reaction,Science,8,MS-PS2-1,Newton\'s third law,,\n'
+)
+
+
+@pytest.fixture
+def build(tmp_path, monkeypatch):
+    """Runs build_data.py over CSVs in tmp_path; returns the data directory."""
+    (tmp_path / "IXL.csv").write_text(CURRICULUM_CSV)
+    (tmp_path / "ccc.csv").write_text(CCC_CSV)
+    data_dir = tmp_path / "data"
+    monkeypatch.delenv("INCEPT_SNAPSHOT_PATH", raising=False)
+    for key in ("curriculum", "ccc", "snapshot"):
+        monkeypatch.setitem(curriculum.CONFIG, key, curriculum.CONFIG[key])
+
+    def run(*extra):
+        build_data.main(["--curriculum", str(tmp_path / "IXL.csv"), "--ccc", str(tmp_path / "ccc.csv"),
+                         "--data-dir", str(data_dir), *extra])
+        return data_dir
+
+    yield run
+    curriculum.data_store.invalidate()
+
+
+def test_build_writes_json_manifest_and_snapshot(build, capsys):
+    data_dir = build()
+
+    lessons = json.loads((data_dir / "curriculum_structure.json").read_text())["curriculum"]
+    assert [lesson["title"] for lesson in lessons["8"]["lessons"]] == ["Net force", "Newton's third law"]
+    assert lessons["8"]["lessons"][0]["sample_questions"] == ["What is the net force?"]
+    items = json.loads((data_dir / "ccc_structure.json").read_text())["content"]
+    assert [item["subject"] for item in items] == [["Science"], "Science"]
+    manifest = json.loads((data_dir / "build_manifest.json").read_text())
+    assert len(manifest["stages"]["curriculum"]["files"][str(data_dir.parent / "IXL.csv")]["rows"]) == 3
+    assert CompiledSnapshot.open(str(data_dir / "snapshot.sqlite3")) is not None
+
+    capsys.readouterr()
+    build()
+    assert capsys.readouterr().out.splitlines() == ["curriculum: unchanged", "ccc: unchanged", "snapshot: unchanged"]
+
+
+def test_changed_row_is_the_only_one_converted(build, tmp_path, capsys):
+    data_dir = build()
+    (tmp_path / "IXL.csv").write_text(CURRICULUM_CSV.replace("Develop models", "Develop and use models"))
+    capsys.readouterr()
+
+    build()
+
+    assert "curriculum: 3 records (1 converted, 2 reused)" in capsys.readouterr().out
+    incremental = (data_dir / "curriculum_structure.json").read_bytes()
+    data_build.convert("curriculum", str(tmp_path / "IXL.csv"), str(tmp_path / "full.json"))
+    assert incremental == (tmp_path / "full.json").read_bytes()
+    assert json.loads(incremental)["curriculum"]["7"]["lessons"][0]["standard_description"] == "Develop and use models"
+
+
+def test_snapshot_reuses_layout_while_graph_shape_is_unchanged(build, tmp_path, monkeypatch):
+    data_dir = build()
+    snapshot_path = str(data_dir / "snapshot.sqlite3")
+    positions = CompiledSnapshot.open(snapshot_path).positions()
+    monkeypatch.setattr(curriculum, "compute_layout", lambda graph: pytest.fail("layout recomputed"))
+
+    # A description is not part of the graph's shape
+    (tmp_path / "IXL.csv").write_text(CURRICULUM_CSV.replace("Develop models", "Develop and use models"))
+    build()
+
+    rebuilt = CompiledSnapshot.open(snapshot_path)
+    assert rebuilt.source_digest("curriculum") == data_build.file_digest(str(data_dir / "curriculum_structure.json"))
+    assert rebuilt.positions() == positions
+
+
+def write_exports(directory, exports):
+    directory.mkdir(parents=True, exist_ok=True)
+    header = 'Grade,Lesson,IXL skill code,Standard Code,Standard Description\n'
+    for filename, rows in exports.items():
+        (directory / filename).write_text(header + ''.join(row + '\n' for row in rows))
+
+
+def standards(path):
+    return [lesson["standard_code"] for lesson in json.loads(path.read_text())["curriculum"]["8"]["lessons"]]
+
+
+def test_exports_merge_in_path_order_whatever_the_worker_count(tmp_path):
+    exports = tmp_path / "exports"
+    write_exports(exports / "grade7", {"science.csv": ["7,Density,D1,MS-PS1-1,Develop models"]})
+    write_exports(exports / "grade8", {
+        "physics.csv": ["8,Net force,F1,MS-PS2-2,Plan an investigation", "8,Newton's third law,F2,MS-PS2-1,Apply"],
+        "chemistry.csv": ["8,Atoms,C1,MS-PS1-1,Develop models"]
+    })
+
+    serial = data_build.convert("curriculum", str(exports), str(tmp_path / "serial.json"))
+    parallel = data_build.convert("curriculum", str(exports / "**" / "*.csv"), str(tmp_path / "parallel.json"), jobs=3)
+
+    assert (tmp_path / "serial.json").read_bytes() == (tmp_path / "parallel.json").read_bytes()
+    data = json.loads((tmp_path / "serial.json").read_text())["curriculum"]
+    assert list(data) == ["7", "8"]
+    assert [lesson["title"] for lesson in data["8"]["lessons"]] == ["Atoms", "Net force", "Newton's third law"]
+    assert [run["path"] for run in parallel["last_run"]["files"]] == serial["inputs"]
+    assert all(run["seconds"] >= 0 for run in parallel["last_run"]["files"])
+
+
+def test_duplicates_and_conflicts_across_exports(tmp_path):
+    exports = tmp_path / "exports"
+    write_exports(exports, {
+        "a.csv": ["8,Net force,F1,MS-PS2-2,Plan an investigation", "8,Mass,M1,MS-PS2-1,Apply"],
+        "b.csv": ["8,Net force,F1,MS-PS2-2,Plan an investigation", "8,Mass,M1,MS-PS2-3,Apply Newton"]
+    })
+
+    first = data_build.convert("curriculum", str(exports), str(tmp_path / "first.json"))
+    last = data_build.convert("curriculum", str(exports), str(tmp_path / "last.json"), on_conflict="last")
+
+    assert first["last_run"]["duplicates"] == 1
+    assert [(c["kind"], c["key"]) for c in first["last_run"]["conflict_examples"]] == [("lesson", "8/M1/Mass")]
+    assert standards(tmp_path / "first.json") == ["MS-PS2-2", "MS-PS2-1"]
+    assert standards(tmp_path / "last.json") == ["MS-PS2-2", "MS-PS2-3"]
+    assert last["last_run"]["conflicts"] == first["last_run"]["conflicts"] == 1
+    with pytest.raises(data_build.BuildConflict):
+        data_build.convert("curriculum", str(exports), str(tmp_path / "first.json"), on_conflict="error")
+    assert standards(tmp_path / "first.json") == ["MS-PS2-2", "MS-PS2-1"]
+
+    # Only the file that changed is read again
+    write_exports(exports, {"b.csv": ["8,Net force,F1,MS-PS2-2,Plan an investigation"]})
+    rebuilt = data_build.convert("curriculum", str(exports), str(tmp_path / "first.json"), previous=first)
+    assert [run["status"] for run in rebuilt["last_run"]["files"]] == ["unchanged", "built"]
+    assert rebuilt["last_run"]["conflicts"] == 0
+    assert standards(tmp_path / "first.json") == ["MS-PS2-2", "MS-PS2-1"]
+
+
+def test_standard_described_differently_is_reported(tmp_path):
+    exports = tmp_path / "exports"
+    write_exports(exports, {"a.csv": ["8,Mass,M1,MS-PS2-1,Apply"], "b.csv": ["8,Weight,W1,MS-PS2-1,Apply Newton"]})
+
+    entry = data_build.convert("curriculum", str(exports), str(tmp_path / "out.json"))
+
+    assert [(c["kind"], c["key"], c["kept"]) for c in entry["last_run"]["conflict_examples"]] == [("standard", "MS-PS2-1", None)]
+    assert entry["last_run"]["records"] == 2
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("['Science']", ["Science"]),
+    ('["Earth\'s Systems", \'Physics, Motion\']', ["Earth's Systems", "Physics, Motion"]),
+    ("[]", []),
+    ("Science", None),
+    ("[1, 2]", None),
+    ("['a' 'b']", None),
+    ("__import__('os')", None),
+])
+def test_parse_list_literal(text, expected):
+    assert data_build.parse_list_literal(text) == expected
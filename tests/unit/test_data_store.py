@@ -0,0 +1,75 @@
+import json
+import os
+
+import pytest
+
+from src.services.data_store import DataStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    """DataStore over a single JSON file with one derived entry."""
+    path = tmp_path / "data.json"
+    path.write_text(json.dumps({"lessons": ["Net force"]}))
+
+    def loader(strict):
+        with open(path) as f:
+            return {"raw": json.load(f)}
+
+    store = DataStore({"data": lambda: str(path)}, loader)
+    store.register_derived("count", lambda data: len(data["raw"]["lessons"]))
+    store.path = path
+    return store
+
+
+def test_first_snapshot_includes_derived_data(store):
+    snapshot = store.snapshot()
+
+    assert snapshot.version == 1
+    assert snapshot["count"] == 1
+    assert store.snapshot() is snapshot
+
+
+def test_touching_an_unchanged_file_does_not_rebuild(store):
+    store.snapshot()
+    stat = os.stat(store.path)
+    os.utime(store.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    assert store.check() is False
+    assert store.rebuilds == 1
+
+
+def test_changed_file_publishes_a_new_snapshot(store):
+    old = store.snapshot()
+    store.path.write_text(json.dumps({"lessons": ["Net force", "Friction"]}))
+
+    assert store.check() is True
+    assert store.snapshot().version == 2
+    assert store.snapshot()["count"] == 2
+    assert old["count"] == 1
+
+
+def test_broken_file_keeps_serving_the_previous_snapshot(store):
+    store.snapshot()
+    store.path.write_text('{"lessons": [')
+
+    assert store.check() is False
+    assert store.snapshot().version == 1
+    assert store.status()["last_error"]
+
+
+def test_failed_rebuild_is_not_retried_until_the_file_changes(store):
+    store.snapshot()
+    calls = []
+    loader = store.loader
+    store.loader = lambda strict: calls.append(strict) or loader(strict)
+    store.path.write_text('{"lessons": [')
+
+    assert store.check() is False
+    assert store.check() is False
+    assert len(calls) == 1
+
+    store.path.write_text(json.dumps({"lessons": ["Net force", "Friction", "Gravity"]}))
+    assert store.check() is True
+    assert store.snapshot()["count"] == 3
+    assert store.status()["last_error"] is None
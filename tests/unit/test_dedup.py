@@ -0,0 +1,80 @@
+import asyncio
+
+from src.services.dedup import DedupIndex, canonical_text, cluster_questions, grade_representatives, minhash, similarity
+
+
+def net_force(mass, push, friction, verb="pushes"):
+    return {
+        'prompt': f"A student {verb} a {mass} kg box across a rough floor with a constant force of {push} N. "
+                  f"If the force of friction is {friction} N, what is the net force on the box?",
+        'choices': [{'text': f"{push - friction} N"}, {'text': f"{push + friction} N"}, {'text': f"{push} N"}]
+    }
+
+
+PHOTOSYNTHESIS = {
+    'prompt': "Which gas do plants take in from the air to make sugar during photosynthesis?",
+    'choices': [{'text': "Carbon dioxide"}, {'text': "Oxygen"}, {'text': "Nitrogen"}]
+}
+
+
+def test_canonical_text_ignores_numbers_case_and_choice_order():
+    reordered = dict(net_force(10, 50, 30), choices=list(reversed(net_force(10, 50, 30)['choices'])))
+    assert canonical_text(net_force(10, 50, 30)) == canonical_text(net_force(4, 12, 7))
+    assert canonical_text(reordered) == canonical_text(net_force(10, 50, 30))
+    assert canonical_text({'prompt': "What is 2.5 + 3?", 'choices': ["5.5"]}) == "what is 0 0 | 0"
+
+
+def test_reworded_questions_cluster_and_distinct_ones_do_not():
+    questions = [net_force(10, 50, 30), PHOTOSYNTHESIS, net_force(4, 12, 7), net_force(8, 40, 10, verb="drags")]
+    index = cluster_questions(questions)
+
+    assert similarity(minhash(canonical_text(questions[0])), minhash(canonical_text(questions[3]))) >= index.threshold
+    assert index.clusters() == [[0, 2, 3], [1]]
+    assert index.representatives() == [0, 1]
+    assert index.stats()['exact_duplicates'] == 1
+
+
+def test_clusters_do_not_depend_on_batching_or_workers():
+    questions = [net_force(i, i * 5, i * 2) for i in range(1, 20)] + [PHOTOSYNTHESIS] * 3
+    reference = cluster_questions(questions).clusters()
+
+    assert cluster_questions(questions, batch_size=4).clusters() == reference
+    assert cluster_questions(questions, jobs=2, batch_size=7).clusters() == reference
+
+    index = DedupIndex()
+    for i, question in enumerate(questions):
+        index.add(question, key=f"q{i}")
+    assert index.clusters() == [[f"q{i}" for i in members] for members in reference]
+
+
+def test_grade_representatives_grades_each_cluster_once():
+    class Grader:
+        def __init__(self):
+            self.graded = []
+
+        async def grade_question(self, question):
+            self.graded.append(question['prompt'])
+            return {'passed': True, 'scorecard': {}}
+
+    grader = Grader()
+    questions = [net_force(10, 50, 30), PHOTOSYNTHESIS, net_force(4, 12, 7)]
+    results = asyncio.run(grade_representatives(grader, questions))
+
+    assert grader.graded == [questions[0]['prompt'], PHOTOSYNTHESIS['prompt']]
+    assert results[0] == results[1] == {'passed': True, 'scorecard': {}}
+    assert results[2] == {'passed': True, 'scorecard': {}, 'duplicate_of': 0}
+
+
+def test_grader_error_fails_only_its_cluster():
+    class Grader:
+        async def grade_question(self, question):
+            if question['prompt'] == PHOTOSYNTHESIS['prompt']:
+                raise RuntimeError("grader unavailable")
+            return {'passed': True, 'scorecard': {}}
+
+    questions = [net_force(10, 50, 30), PHOTOSYNTHESIS, PHOTOSYNTHESIS]
+    results = asyncio.run(grade_representatives(Grader(), questions))
+
+    assert results[0] == {'passed': True, 'scorecard': {}}
+    assert results[1] == {'passed': False, 'error': 'grader unavailable'}
+    assert results[2] == {'passed': False, 'error': 'grader unavailable', 'duplicate_of': 1}
@@ -0,0 +1,112 @@
+import asyncio
+import time
+
+import pytest
+
+from src.models.question import Choice, InteractionType, Question, Solution
+from src.services import generator as generator_module
+from src.services.generator import QuestionGenerator, check_question
+
+
+def make_question(prompt, correct="20 N", correct_choices=("20 N",)):
+    return Question(
+        prompt=prompt,
+        interaction_type=InteractionType.MULTIPLE_CHOICE,
+        choices=[
+            Choice(text="20 N", is_correct="20 N" in correct_choices, explanation="Push minus friction."),
+            Choice(text="80 N", is_correct=False, explanation="Adds the forces."),
+            Choice(text="50 N", is_correct=False, explanation="Ignores friction.")
+        ],
+        correct_answer=correct,
+        solution=Solution(steps=["Subtract friction from the push"], explanation="Opposing forces subtract."),
+        standard="MS-PS2-2",
+        difficulty=2
+    )
+
+
+TEMPLATE = make_question("A student pushes a 10 kg box with 50 N against 30 N of friction. What is the net force?")
+
+
+class FakeGrader:
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.graded = []
+
+    async def grade_question(self, question):
+        self.graded.append(question["prompt"])
+        await asyncio.sleep(self.delay)
+        return {"passed": "bad" not in question["prompt"], "feedback": "too vague", "scorecard": {}}
+
+
+@pytest.fixture(autouse=True)
+def no_curriculum(monkeypatch):
+    monkeypatch.setattr(generator_module, "generation_context", lambda template: {
+        "standard_description": None, "lessons": [], "sample_questions": []
+    })
+
+
+def drafts(monkeypatch, generator, plan):
+    """Make candidate i arrive after plan[i][0] seconds as plan[i][1]."""
+    cancelled = []
+
+    async def draft(template, context, index):
+        try:
+            await asyncio.sleep(plan[index][0])
+        except asyncio.CancelledError:
+            cancelled.append(index)
+            raise
+        return plan[index][1]
+
+    monkeypatch.setattr(generator, "_draft", draft)
+    return cancelled
+
+
+def test_checks_catch_structural_problems():
+    assert check_question(make_question("A cart rolls down a ramp. Which force slows it?"), TEMPLATE) == []
+    assert "correct_answer does not match the correct choice" in check_question(make_question("Which force slows the cart?", correct="80 N"))
+    assert "0 correct choices" in check_question(make_question("Which force slows the cart?", correct_choices=()))
+    assert "near-duplicate of the template" in check_question(TEMPLATE.model_copy(), TEMPLATE)
+
+
+@pytest.mark.asyncio
+async def test_first_passing_candidate_wins_and_the_rest_are_cancelled(monkeypatch):
+    grader = FakeGrader()
+    generator = QuestionGenerator(grader, candidates=4)
+    cancelled = drafts(monkeypatch, generator, [
+        (0.01, make_question("A bad question about a sled on snow?")),
+        (0.02, make_question("Which force slows the cart?", correct="80 N")),
+        (0.05, make_question("A cart rolls down a ramp. Which force slows it?")),
+        (5.0, make_question("Never finishes")),
+    ])
+
+    start = time.perf_counter()
+    result = await generator.generate(TEMPLATE)
+
+    assert time.perf_counter() - start < 1.0
+    assert result["question"].prompt == "A cart rolls down a ramp. Which force slows it?"
+    assert result["question"].standard == "MS-PS2-2"
+    assert [(r["index"], r["stage"]) for r in result["rejected"]] == [(0, "grader"), (1, "checks")]
+    assert cancelled == [3]
+    assert result["time_to_first_valid"] < 1.0
+    assert generator.stats()["successes"] == 1
+
+
+@pytest.mark.asyncio
+async def test_no_passing_candidate(monkeypatch):
+    generator = QuestionGenerator(FakeGrader(), candidates=2)
+    drafts(monkeypatch, generator, [(0.01, make_question("A bad question?")), (0.01, make_question("Another bad one?"))])
+
+    result = await generator.generate(TEMPLATE)
+
+    assert result["question"] is None
+    assert len(result["rejected"]) == 2
+    assert generator.stats()["success_rate"] == 0.0
+
+
+def test_idle_stats_have_the_full_schema():
+    stats = QuestionGenerator(grader=None, candidates=2).stats()
+
+    assert stats == {
+        "requests": 0, "successes": 0, "success_rate": 0.0, "candidates": 2,
+        "time_to_first_valid_p50": None, "time_to_first_valid_p95": None,
+    }
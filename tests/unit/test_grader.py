@@ -54,4 +54,28 @@ async def test_grader_precision(grader, good_question_example, bad_questions):
     
     # Calculate precision
     precision = results["true_positives"] / (results["true_positives"] + results["false_positives"])
-    assert precision >= 0.99, "Grader precision must be at least 99%" 
\ No newline at end of file
+    assert precision >= 0.99, "Grader precision must be at least 99%" 
+
+@pytest.mark.asyncio
+async def test_cached_verdicts_are_keyed_by_grader_version(monkeypatch, good_question_example):
+    """A new grader version grades again instead of serving cached verdicts."""
+    from src.services import grader as grader_module
+    from src.services.cache import TieredCache
+
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    grader = QuestionGrader(cache=TieredCache("grade-test"))
+    calls = []
+
+    async def grade(question):
+        calls.append(question)
+        return {"passed": True, "score": 1.0, "feedback": None, "scorecard": {}}
+
+    monkeypatch.setattr(grader, "_grade_question", grade)
+    await grader.grade_question(good_question_example)
+    await grader.grade_question(good_question_example)
+    assert len(calls) == 1
+
+    monkeypatch.setattr(grader_module, "GRADER_VERSION", grader_module.GRADER_VERSION + 1)
+    await grader.grade_question(good_question_example)
+    assert len(calls) == 2
+    await grader.aclose()
@@ -0,0 +1,21 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def loaded_modules(module: str) -> set:
+    """Import module in a fresh interpreter and return everything it pulled in."""
+    proc = subprocess.run(
+        [sys.executable, "-c", f"import sys, {module}; print(','.join(sys.modules))"],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    return set(proc.stdout.strip().split(","))
+
+
+def test_grader_defers_openai_and_httpx():
+    loaded = loaded_modules("src.services.grader")
+
+    assert "openai" not in loaded
+    assert "httpx" not in loaded
@@ -0,0 +1,42 @@
+import math
+
+import pytest
+
+from src.services import layout
+from src.services.structure import StructureGraph
+
+
+def make_graph(standards=3, lessons=12, items=60):
+    graph = StructureGraph()
+    for s in range(standards):
+        graph.add_node(f"S{s}", "standard", {})
+    for l in range(lessons):
+        graph.add_node(f"L{l}", "lesson", {})
+        graph.add_link(f"S{l % standards}", f"L{l}", "standard-lesson")
+    for i in range(items):
+        graph.add_node(f"ccc:{i}", "question", {})
+        graph.add_link(f"ccc:{i}", f"L{i % lessons}", "content-lesson")
+    graph.add_node("orphan", "article", {})
+    return graph
+
+
+def test_radial_layout_places_every_node_on_rings_by_depth():
+    graph = make_graph()
+    positions = layout.radial_layout(graph)
+
+    assert set(positions) == set(graph.nodes)
+    radius = lambda node_id: math.hypot(*positions[node_id])
+    assert radius("S0") < radius("L0") < radius("ccc:0")
+    # Nodes on the same ring never sit on top of each other
+    lesson_points = [positions[f"L{l}"] for l in range(12)]
+    assert min(math.dist(a, b) for a in lesson_points for b in lesson_points if a is not b) >= layout.NODE_SPACING
+
+
+def test_force_layout_keeps_every_node_and_separates_them():
+    pytest.importorskip("numpy")
+    graph = make_graph()
+    positions = layout.force_layout(graph, layout.radial_layout(graph), iterations=20)
+
+    assert set(positions) == set(graph.nodes)
+    points = list(positions.values())
+    assert min(math.dist(a, b) for a in points for b in points if a is not b) > 1.0
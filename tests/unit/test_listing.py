@@ -0,0 +1,51 @@
+import gzip
+
+import pytest
+
+from src.utils.http_cache import encode_json_body, etag_matches
+from src.utils.listing import paginate
+
+
+def test_pages_chain_through_cursors_and_project_fields():
+    items = [{"id": str(i), "title": f"Lesson {i}", "body": "x" * 10} for i in range(5)]
+
+    first = paginate(items, version=3, limit=2, fields=["id"])
+    assert first["items"] == [{"id": "0"}, {"id": "1"}]
+    assert first["total"] == 5
+
+    second = paginate(items, version=3, cursor=first["next_cursor"], limit=2)
+    third = paginate(items, version=3, cursor=second["next_cursor"], limit=2)
+    assert [item["id"] for item in second["items"] + third["items"]] == ["2", "3", "4"]
+    assert third["next_cursor"] is None
+
+
+def test_cursor_from_an_older_snapshot_is_rejected():
+    cursor = paginate([{"id": "0"}, {"id": "1"}], version=1, limit=1)["next_cursor"]
+
+    with pytest.raises(ValueError):
+        paginate([{"id": "0"}, {"id": "1"}], version=2, cursor=cursor)
+    with pytest.raises(ValueError):
+        paginate([], version=1, cursor="not-a-cursor")
+
+
+def test_large_bodies_are_gzipped_and_revalidate_with_304():
+    body = b'[' + b','.join(b'{"id":"%d"}' % i for i in range(500)) + b']'
+
+    status, headers, payload = encode_json_body(body, "gzip, deflate", None)
+    assert status == 200
+    assert headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(payload) == body
+
+    status, _, payload = encode_json_body(body, "gzip", headers["ETag"])
+    assert (status, payload) == (304, b"")
+
+    # The identity variant has its own ETag
+    status, plain_headers, payload = encode_json_body(body, None, headers["ETag"])
+    assert status == 200 and payload == body
+    assert "Content-Encoding" not in plain_headers
+
+
+def test_etag_matching_accepts_lists_and_weak_tags():
+    assert etag_matches('"a", W/"b"', '"b"')
+    assert etag_matches('*', '"b"')
+    assert not etag_matches('"a"', '"b"')
@@ -0,0 +1,29 @@
+import json
+
+import parse_curriculum
+
+CSV = (
+    'Grade,Lesson,Standard Code,Standard Description,Sample Question 1,Sample Question 2\n'
+    '8,Net force,MS-PS2-2,"Plan an investigation, with forces","```markdown\nWhat is the net force?\n```",'
+    '```markdown\nA 2, 3 and 5 N force act together.\n```\n'
+    '7,Density,MS-PS1-1,Develop models,,\n'
+    '8,Newton\'s third law,MS-PS2-1,Apply Newton\'s Third Law,,\n'
+    ',Missing grade,MS-PS2-1,,,\n'
+)
+
+
+def test_parse_curriculum_groups_lessons_by_grade(tmp_path):
+    source = tmp_path / "IXL.csv"
+    source.write_text(CSV)
+    output = tmp_path / "curriculum_structure.json"
+
+    counts = parse_curriculum.parse_curriculum(str(source), str(output))
+
+    assert counts == {"8": 2, "7": 1}
+    data = json.loads(output.read_text())["curriculum"]
+    assert [lesson["title"] for lesson in data["8"]["lessons"]] == ["Net force", "Newton's third law"]
+    assert data["8"]["lessons"][0]["sample_questions"] == ["What is the net force?", "A 2, 3 and 5 N force act together."]
+    assert data["8"]["lessons"][0]["standard_description"] == "Plan an investigation, with forces"
+    assert data["7"]["lessons"][0]["sample_questions"] == []
+    # The per-grade spool files are cleaned up
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["IXL.csv", "curriculum_structure.json"]
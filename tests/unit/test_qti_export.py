@@ -0,0 +1,116 @@
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from src.models.question import Choice, InteractionType, Question, Solution
+from src.services.qti_export import (
+    QTIUploader, StandInQTIServer, item_to_xml, iter_documents, question_to_item, render, write_documents
+)
+
+QTI = "{http://www.imsglobal.org/xsd/imsqtiasi_v3p0}"
+
+
+def make_question(i, stimuli="A cart rolls down a ramp.\n\nFriction slows it down."):
+    return Question(
+        prompt=f"What slows the cart down? (#{i})",
+        stimuli=stimuli,
+        interaction_type=InteractionType.MULTIPLE_CHOICE,
+        choices=[
+            Choice(text="Friction", is_correct=True, explanation="Friction opposes motion."),
+            Choice(text="Gravity & mass", is_correct=False, explanation="Gravity pulls it down the ramp.")
+        ],
+        correct_answer="Friction",
+        solution=Solution(steps=["Find the force opposing motion"], explanation="Friction acts against the motion."),
+        subject="science",
+        grade=8,
+        standard="MS-PS2-2",
+        difficulty=2
+    )
+
+
+def test_choice_question_becomes_a_qti_item():
+    item = question_to_item(make_question(1), stimulus_identifier="stimulus-1")
+
+    assert item["type"] == "choice"
+    assert item["responseDeclarations"][0]["correctResponse"] == {"value": ["A"]}
+    assert item["metadata"] == {"subject": "science", "grade": "8", "standard": "MS-PS2-2", "difficulty": "medium"}
+    assert item == question_to_item(make_question(1), stimulus_identifier="stimulus-1")
+
+    root = ET.fromstring(item_to_xml(item))
+    assert root.get("identifier") == item["identifier"]
+    choices = root.findall(f".//{QTI}qti-simple-choice")
+    assert [choice.text for choice in choices] == ["Friction", "Gravity & mass"]
+    assert root.find(f"{QTI}qti-assessment-stimulus-ref").get("identifier") == "stimulus-1"
+
+
+def test_xml_item_scores_and_shows_feedback():
+    root = ET.fromstring(item_to_xml(question_to_item(make_question(1))))
+
+    outcomes = {d.get("identifier"): d for d in root.findall(f"{QTI}qti-outcome-declaration")}
+    assert outcomes["SCORE"].get("base-type") == "float"
+    assert set(outcomes) == {"SCORE", "FEEDBACK", "FEEDBACK-INLINE"}
+
+    processing = root.find(f"{QTI}qti-response-processing")
+    assert processing.get("template") is None
+    branches = processing.find(f"{QTI}qti-response-condition")
+    match = branches.find(f"{QTI}qti-response-if/{QTI}qti-match")
+    assert [(child.tag, child.get("identifier")) for child in match] == [
+        (f"{QTI}qti-variable", "RESPONSE"), (f"{QTI}qti-correct", "RESPONSE")
+    ]
+
+    def outcomes_set(branch):
+        return {
+            setter.get("identifier"): setter.find(f"{QTI}qti-base-value").text
+            for setter in branches.find(f"{QTI}{branch}").findall(f"{QTI}qti-set-outcome-value")
+        }
+
+    assert outcomes_set("qti-response-if") == {"SCORE": "1", "FEEDBACK": "CORRECT"}
+    assert outcomes_set("qti-response-else") == {"SCORE": "0", "FEEDBACK": "INCORRECT"}
+    inline = processing.find(f"{QTI}qti-set-outcome-value")
+    assert inline.get("identifier") == "FEEDBACK-INLINE"
+    assert inline.find(f"{QTI}qti-variable").get("identifier") == "RESPONSE"
+
+    # Every feedback element shows on an identifier the processing can set
+    blocks = root.findall(f".//{QTI}qti-feedback-block")
+    assert {(b.get("outcome-identifier"), b.get("identifier")) for b in blocks} == {("FEEDBACK", "CORRECT"), ("FEEDBACK", "INCORRECT")}
+    assert [f.get("identifier") for f in root.findall(f".//{QTI}qti-feedback-inline")] == ["A", "B"]
+
+
+def test_free_response_becomes_text_entry():
+    question = Question(
+        prompt="Name the force that opposes motion.", interaction_type="free_response", correct_answer="friction",
+        solution=Solution(steps=[], explanation=""), grading_criteria="Names friction"
+    )
+    item = question_to_item(question)
+
+    assert item["type"] == "text-entry"
+    assert item["responseDeclarations"][0]["correctResponse"] == {"value": ["friction"]}
+    assert item["rubrics"][0]["view"] == "scorer"
+    root = ET.fromstring(item_to_xml(item))
+    assert {d.get("identifier") for d in root.findall(f"{QTI}qti-outcome-declaration")} == {"SCORE", "FEEDBACK"}
+    assert root.find(f"{QTI}qti-response-processing/{QTI}qti-response-condition") is not None
+
+
+def test_shared_stimulus_is_emitted_once_before_its_items(tmp_path):
+    documents = list(iter_documents(make_question(i) for i in range(3)))
+
+    assert [kind for kind, _, _ in documents] == ["stimulus", "item", "item", "item"]
+    assert {document["stimulus"]["identifier"] for _, _, document in documents[1:]} == {documents[0][1]}
+    ET.fromstring(render(*documents[0][::2], format="xml"))
+
+    counts = write_documents(iter(documents), str(tmp_path), "xml")
+    assert counts == {"stimulus": 1, "item": 3}
+    assert len(list((tmp_path / "item").iterdir())) == 3
+
+
+@pytest.mark.asyncio
+async def test_upload_retries_with_bounded_concurrency():
+    questions = [make_question(i, stimuli=f"Passage {i % 4}") for i in range(40)]
+    with StandInQTIServer(fail_first=3) as server:
+        counts = await QTIUploader(server.url, concurrency=4, backoff=0.01).upload(iter_documents(questions))
+
+    assert counts["item"] == 40 and counts["stimulus"] == 4
+    assert counts["failed"] == []
+    assert counts["retries"] == 3
+    assert server.max_in_flight <= 4
+    assert len(server.documents["item"]) == 40
@@ -0,0 +1,66 @@
+import io
+
+import pytest
+
+from src.models.question import Choice, Image, InteractionType, Question, Solution
+from src.models.records import QuestionRecord, decode, encode, iter_records, write_records
+
+
+@pytest.fixture
+def question():
+    return Question(
+        prompt="What is the net force on the box?",
+        stimuli="A 10 kg box is pushed with 50 N against 30 N of friction.",
+        images=[Image(url="https://example.com/box.png", alt_text="A box on a floor")],
+        interaction_type=InteractionType.MULTIPLE_CHOICE,
+        choices=[
+            Choice(text="20 N", is_correct=True, explanation="50 N - 30 N"),
+            Choice(text="80 N", is_correct=False, explanation="Adds the forces")
+        ],
+        correct_answer="20 N",
+        solution=Solution(steps=["Identify the forces", "Subtract friction"], explanation="Forces in opposite directions subtract."),
+        subject="science",
+        grade=8,
+        standard="MS-PS2-2",
+        difficulty=2
+    )
+
+
+def test_model_round_trip_shares_values(question):
+    record = QuestionRecord.from_model(question)
+    model = record.to_model()
+
+    assert model == question
+    assert model.model_dump_json() == question.model_dump_json()
+    assert record.to_dict() == question.model_dump(mode="json")
+    assert QuestionRecord.from_dict(question.model_dump()) == record
+    # from_model shares the field values; to_model validates into new lists
+    assert record.prompt is question.prompt
+    assert record.solution.steps is question.solution.steps
+    assert model.solution.steps is not record.solution.steps
+
+
+def test_binary_encoding_round_trips(question):
+    free_response = Question(
+        prompt="Explain inertia.", interaction_type="free_response", correct_answer="Resistance to change in motion",
+        solution=Solution(steps=[], explanation=""), grading_criteria="Mentions mass"
+    )
+    records = [QuestionRecord.from_model(question), QuestionRecord.from_model(free_response)]
+
+    assert decode(encode(records)) == records
+    assert [record.to_model() for record in decode(encode(records))] == [question, free_response]
+    with pytest.raises(ValueError):
+        decode(b'{"prompt": "not records"}')
+
+
+def test_framed_stream(question):
+    records = [QuestionRecord.from_model(question) for _ in range(5)]
+    stream = io.BytesIO()
+
+    assert write_records(stream, records, frame_records=2) == 5
+    stream.seek(0)
+    assert list(iter_records(stream)) == records
+
+    truncated = io.BytesIO(stream.getvalue()[:-3])
+    with pytest.raises(ValueError):
+        list(iter_records(truncated))
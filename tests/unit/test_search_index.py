@@ -0,0 +1,57 @@
+import random
+
+from src.services.search_index import SearchIndex
+
+
+def make_documents(count=300, seed=3):
+    rng = random.Random(seed)
+    words = ["force", "friction", "forces", "motion", "mass", "magnet", "gravity", "orbit", "energy", "field"]
+    return [
+        {
+            "kind": "lesson",
+            "id": str(i),
+            "title": " ".join(rng.choices(words, k=2)),
+            "fields": {"title": " ".join(rng.choices(words, k=2)), "body": " ".join(rng.choices(words, k=15))}
+        }
+        for i in range(count)
+    ]
+
+
+def brute_force(index, terms):
+    """Scores of every document, computed without the threshold algorithm."""
+    scores = {}
+    for doc_id in range(len(index)):
+        total = 0.0
+        for i, term in enumerate(terms):
+            candidates = index._expand(term) if i == len(terms) - 1 else [term]
+            best = max(
+                (index.postings[c].get(doc_id, 0.0) * index.idf[c] * (1.0 if c == term else 0.8)
+                 for c in candidates if c in index.postings),
+                default=0.0
+            )
+            if best == 0.0:
+                break
+            total += best
+        else:
+            scores[doc_id] = total
+    return scores
+
+
+def test_threshold_search_matches_brute_force_ranking():
+    index = SearchIndex(make_documents())
+
+    for query in ["fo", "force mag", "gravity orbit en", "friction motion mass f"]:
+        expected = sorted(brute_force(index, query.split()).values(), reverse=True)[:10]
+        got = [result["score"] for result in index.search(query, limit=10)["results"]]
+        assert got == [round(score, 4) for score in expected]
+
+
+def test_title_matches_outrank_body_matches():
+    index = SearchIndex([
+        {"kind": "lesson", "id": "body", "title": "Motion", "fields": {"title": "Motion", "body": "Friction slows things"}},
+        {"kind": "lesson", "id": "title", "title": "Friction", "fields": {"title": "Friction", "body": "Surfaces"}},
+    ])
+
+    results = index.search("fric")["results"]
+    assert [result["id"] for result in results] == ["title", "body"]
+    assert results[1]["snippet"] == "Friction slows things"
@@ -0,0 +1,9 @@
+import json
+
+from src.utils.serialization import dumps
+
+
+def test_dumps_matches_stdlib_output():
+    payload = {"nodes": [{"id": "MS-PS2-2", "data": {"grade": 8, "title": "Net force — intro"}}]}
+
+    assert json.loads(dumps(payload)) == payload
@@ -0,0 +1,63 @@
+import json
+
+import pytest
+
+pytest.importorskip("ijson")
+
+from src.services import curriculum
+from src.services.streaming_loader import stream_ccc, stream_curriculum
+
+LESSONS = [
+    {"title": "Net force", "standard_code": "MS-PS2-2", "standard_description": "Plan an investigation of forces",
+     "sample_questions": ["What is the net force?", "Which force is larger?"]},
+    {"title": "Newton's third law", "standard_code": "MS-PS2-1", "standard_description": "Apply Newton's Third Law",
+     "sample_questions": ["What is the reaction force?"]},
+    {"title": "Balanced forces", "standard_code": "MS-PS2-2", "standard_description": "Plan an investigation of forces"}
+]
+
+
+def read_both(monkeypatch, kind, path, reader):
+    monkeypatch.setitem(curriculum.CONFIG, kind, str(path))
+    monkeypatch.setenv("INCEPT_STREAMING_LOAD", "0")
+    expected = reader(strict=True)
+    monkeypatch.setenv("INCEPT_STREAMING_LOAD", "1")
+    return expected, reader(strict=True)
+
+
+@pytest.mark.parametrize("document", [
+    {"curriculum": {"8": {"lessons": LESSONS}, "7": {"lessons": LESSONS[:1]}}},
+    {"8": {"lessons": LESSONS}, "6": {"lessons": LESSONS[1:]}}
+])
+def test_stream_curriculum_matches_json_reader(tmp_path, monkeypatch, document):
+    path = tmp_path / "curriculum_structure.json"
+    path.write_text(json.dumps(document))
+
+    expected, streamed = read_both(monkeypatch, "curriculum", path, curriculum.read_curriculum_structure)
+
+    assert streamed == expected
+    assert streamed == stream_curriculum(str(path))
+
+
+@pytest.mark.parametrize("key", ["content", "items"])
+def test_stream_ccc_matches_json_reader(tmp_path, monkeypatch, key):
+    path = tmp_path / "ccc_structure.json"
+    path.write_text(json.dumps({key: [
+        {"id": "101", "content_type": "question", "source": "Net force quiz", "standard": "MS-PS2-2",
+         "lesson": "Net force", "difficulty": 0.5},
+        {"id": "102", "content_type": "article", "source": "Action and reaction", "standard": "MS-PS2-1"}
+    ]}))
+
+    expected, streamed = read_both(monkeypatch, "ccc", path, curriculum.read_ccc_structure)
+
+    assert streamed == expected
+    assert stream_ccc(str(path)) == expected
+
+
+def test_streamed_strings_are_interned(tmp_path):
+    path = tmp_path / "curriculum_structure.json"
+    path.write_text(json.dumps({"curriculum": {"8": {"lessons": LESSONS}}}))
+
+    lessons = stream_curriculum(str(path))["lessons"]
+
+    assert lessons[0]["standard_code"] is lessons[2]["standard_code"]
+    assert next(iter(lessons[0])) is next(iter(lessons[1]))
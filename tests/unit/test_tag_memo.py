@@ -0,0 +1,41 @@
+import time
+
+from src.services.tag_memo import TagMemo, normalize_prompt, prompt_fingerprint
+
+TAGS = {"subject": "science", "grade": 8, "standard": "MS-PS2-2", "lesson": "Net force", "difficulty": 2}
+
+
+def test_whitespace_and_case_changes_share_a_fingerprint():
+    assert normalize_prompt("  What is the NET force?\n") == "what is the net force?"
+    assert prompt_fingerprint("What is the net force?") == prompt_fingerprint("what  is the\tNET force? ")
+
+
+def test_repeat_tagging_hits_the_memo_quickly():
+    memo = TagMemo()
+    assert memo.get("What is the net force?", "v1") is None
+    memo.set("What is the net force?", "v1", TAGS)
+
+    start = time.perf_counter()
+    tags = memo.get("what is the  net force?", "v1")
+    elapsed = time.perf_counter() - start
+
+    assert tags == TAGS
+    assert elapsed < 0.001
+    assert memo.stats()["hits"] == 1
+    assert memo.stats()["misses"] == 1
+
+
+def test_corpus_version_change_invalidates_the_memo():
+    memo = TagMemo()
+    memo.set("What is the net force?", "v1", TAGS)
+
+    assert memo.get("What is the net force?", "v2") is None
+    assert memo.stats()["invalidations"] == 1
+    assert memo.stats()["size"] == 0
+
+
+def test_entries_expire_after_ttl():
+    memo = TagMemo(ttl=-1)
+    memo.set("What is the net force?", "v1", TAGS)
+
+    assert memo.get("What is the net force?", "v1") is None